@@ -0,0 +1,6 @@
+"""
+Benchmarks y servidores locales de prueba de rsi_mean_reversion_master (NUEVO v1.4).
+
+Fuera del script de producción: importan el script como módulo y se
+ejecutan con `python -m bench` desde la raíz del repositorio.
+"""
@@ -0,0 +1,52 @@
+"""CLI de benchmarks: python -m bench [--cases CASOS] [--out FILE] [--baseline FILE] [--http]."""
+
+import sys
+import json
+import argparse
+
+from rsi_mean_reversion_master import setup_logging
+from bench.benchmarks import Benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Benchmarks de RSI Mean Reversion Master')
+    parser.add_argument('--cases', default='', metavar='CASOS',
+                        help=f"Lista separada por comas (por defecto todos: {', '.join(Benchmarks.SUITE)})")
+    parser.add_argument('--out', metavar='FILE', help='Guardar el informe JSON (p. ej. como baseline)')
+    parser.add_argument('--baseline', metavar='FILE', help='Comparar contra un informe guardado (exit 1 si hay regresión)')
+    parser.add_argument('--http', action='store_true', help='Comparar latencia urlopen vs pool keep-alive (servidor local)')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help='Nivel de log')
+    args = parser.parse_args()
+    
+    setup_logging(args.log_level)
+    
+    if args.http:
+        results = Benchmarks.http_latency()
+        for name, summary in results.items():
+            print(f"{name:<8} mean={summary['mean_ms']:.3f}ms  p50={summary['p50_ms']:.3f}ms  p95={summary['p95_ms']:.3f}ms")
+        return
+    
+    names = [name.strip() for name in args.cases.split(',') if name.strip()]
+    unknown = [name for name in names if name not in Benchmarks.SUITE]
+    if unknown:
+        parser.error(f"benchmarks desconocidos: {', '.join(unknown)}")
+    report = Benchmarks.run(names or None)
+    for name, summary in report['results'].items():
+        print(f"{name:<14} min={summary['min_ms']:.4f}ms  p50={summary['p50_ms']:.4f}ms  p95={summary['p95_ms']:.4f}ms")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Informe guardado en {args.out}")
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            rows = Benchmarks.compare(report, json.load(f))
+        print()
+        for name, row in rows.items():
+            flag = "❌ REGRESIÓN" if row['regression'] else "✅"
+            print(f"{name:<14} {row['baseline_ms']:.4f}ms → {row['current_ms']:.4f}ms  x{row['ratio']:.2f}  {flag}")
+        if any(row['regression'] for row in rows.values()):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
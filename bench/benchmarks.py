@@ -0,0 +1,259 @@
+"""
+Suite de benchmarks del camino de la señal (NUEVO v1.4).
+
+Uso: python -m bench --help (desde la raíz del repositorio).
+"""
+
+import os
+import json
+import time
+import timeit
+import platform
+import tempfile
+import statistics
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Callable
+
+from rsi_mean_reversion_master import (
+    CONFIG, HAS_NUMPY, LOG, Candles, DataEngine, HTTPConnectionPool, Indicators,
+    JournalManager, Replay, RiskManager, RSIState, SignalDetector, config_override
+)
+from bench.standin import StandInBinanceServer
+
+
+class Benchmarks:
+    """
+    Mediciones de rendimiento reproducibles contra el servidor local.
+    
+    La suite (run) cubre el camino de la señal de punta a punta: parseo de
+    /klines, indicadores, SignalDetector.analyze contra StandInBinanceServer,
+    lecturas/escrituras del journal y una iteración del bucle nube (vía
+    Replay). Cada caso devuelve tiempos por llamada; el JSON resultante se
+    guarda como baseline y se compara con compare().
+    """
+    
+    SUITE = ('klines_parse', 'get_klines', 'rsi', 'rsi_history', 'ema', 'rsi_state',
+             'analyze', 'journal_read', 'journal_risk', 'journal_write', 'journal_flush', 'cloud_loop')
+    REGRESSION_TOLERANCE = 0.15     # p50 más de un 15% peor que el baseline
+    SYNTH_START_MS = 1_699_999_200_000  # Inicio fijo de las velas sintéticas
+    
+    @staticmethod
+    def _summary(samples: List[float]) -> Dict[str, float]:
+        ordered = sorted(samples)
+        return {
+            'n': len(ordered),
+            'min_ms': round(ordered[0] * 1000, 4),
+            'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+            'p50_ms': round(ordered[len(ordered) // 2] * 1000, 4),
+            'p95_ms': round(ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000, 4),
+        }
+    
+    @staticmethod
+    def _time(fn: Callable[[], Any], number: int, repeat: int,
+              setup: Optional[Callable[[], Any]] = None) -> List[float]:
+        """Segundos por llamada de cada repetición (timeit, gc desactivado)."""
+        timer = timeit.Timer(fn, setup=setup or (lambda: None))
+        return [total / number for total in timer.repeat(repeat, number)]
+    
+    @staticmethod
+    @contextmanager
+    def _local_api():
+        """DataEngine apuntando a un StandInBinanceServer durante el bloque."""
+        with StandInBinanceServer() as server:
+            previous = DataEngine.BASE_URL, DataEngine.MIRROR_URLS
+            DataEngine.BASE_URL, DataEngine.MIRROR_URLS = server.base_url, []
+            try:
+                yield server
+            finally:
+                DataEngine.BASE_URL, DataEngine.MIRROR_URLS = previous
+    
+    @staticmethod
+    def _raw_klines(server: StandInBinanceServer, interval: str, limit: int) -> bytes:
+        rows = server.handle('/klines', {'interval': interval, 'limit': str(limit),
+                                         'startTime': str(Benchmarks.SYNTH_START_MS)})
+        return json.dumps(rows).encode('utf-8')
+    
+    @staticmethod
+    def _candles(interval: str, limit: int) -> Candles:
+        with StandInBinanceServer() as server:
+            return Candles.from_binance(json.loads(Benchmarks._raw_klines(server, interval, limit)))
+    
+    # ─── Micro: datos e indicadores ───────────────────────────────────────────
+    
+    @staticmethod
+    def bench_klines_parse(repeat: int) -> List[float]:
+        """json.loads + Candles.from_binance de 1000 velas (sin red)."""
+        with StandInBinanceServer() as server:
+            body = Benchmarks._raw_klines(server, '15m', 1000)
+        return Benchmarks._time(lambda: Candles.from_binance(json.loads(body)), 20, repeat)
+    
+    @staticmethod
+    def bench_get_klines(repeat: int) -> List[float]:
+        """DataEngine.get_klines(limit=500) contra el servidor local (HTTP + gzip + parseo)."""
+        with Benchmarks._local_api():
+            fetch = lambda: DataEngine.get_klines(CONFIG.SYMBOL, CONFIG.TIMEFRAME, 500)
+            fetch()     # Abrir la conexión keep-alive
+            return Benchmarks._time(fetch, 10, repeat)
+    
+    @staticmethod
+    def bench_rsi(repeat: int) -> List[float]:
+        candles = Benchmarks._candles('15m', SignalDetector.RSI_SEED_CANDLES)
+        return Benchmarks._time(lambda: Indicators.rsi(candles, CONFIG.RSI_PERIOD), 50, repeat)
+    
+    @staticmethod
+    def bench_rsi_history(repeat: int) -> List[float]:
+        candles = Benchmarks._candles('15m', SignalDetector.RSI_SEED_CANDLES)
+        return Benchmarks._time(lambda: Indicators.rsi_history(candles, CONFIG.RSI_PERIOD), 50, repeat)
+    
+    @staticmethod
+    def bench_ema(repeat: int) -> List[float]:
+        candles = Benchmarks._candles('1h', SignalDetector.EMA_SEED_CANDLES)
+        return Benchmarks._time(lambda: Indicators.ema(candles, CONFIG.EMA_PERIOD), 50, repeat)
+    
+    @staticmethod
+    def bench_rsi_state(repeat: int) -> List[float]:
+        """RSIState.peek: el RSI en vivo de cada ciclo."""
+        candles = Benchmarks._candles('15m', SignalDetector.RSI_SEED_CANDLES)
+        state = RSIState.from_candles(candles[:-1], CONFIG.RSI_PERIOD)
+        price = candles.close[-1]
+        return Benchmarks._time(lambda: state.peek(price), 10000, repeat)
+    
+    # ─── Macro: detector, journal y bucle nube ────────────────────────────────
+    
+    @staticmethod
+    def bench_analyze(repeat: int) -> List[float]:
+        """SignalDetector.analyze en régimen estable (estado sembrado, delta fetch)."""
+        with Benchmarks._local_api():
+            detector = SignalDetector()
+            detector.ema_state_path = None      # No tocar el estado EMA real
+            detector.analyze()
+            return Benchmarks._time(detector.analyze, 10, repeat)
+    
+    @staticmethod
+    @contextmanager
+    def _journal(signals: int = 50):
+        """Journal (backend de CONFIG) sobre un directorio temporal con un día ya poblado."""
+        with tempfile.TemporaryDirectory() as directory, config_override({'JOURNAL_DIR': directory}):
+            journal = JournalManager.create()
+            data = journal._empty_day()
+            data['signals_detected'] = [{'type': 'LONG', 'rsi': 19.5, 'price': 95000.0, 'ema_200': 94000.0,
+                                         'mode': 'CLOUD', 'timestamp': 0.0, 'time': '00:00:00'}] * signals
+            journal.save(data)
+            snapshot = json.dumps(data)
+            try:
+                yield journal, lambda: journal.save(json.loads(snapshot))
+            finally:
+                journal.close()
+    
+    @staticmethod
+    def bench_journal_read(repeat: int) -> List[float]:
+        with Benchmarks._journal() as (journal, _):
+            return Benchmarks._time(journal.get_stats, 100, repeat)
+    
+    @staticmethod
+    def bench_journal_risk(repeat: int) -> List[float]:
+        """RiskManager.can_trade: las lecturas del journal de cada ciclo."""
+        with Benchmarks._journal() as (journal, _):
+            risk = RiskManager(journal)
+            return Benchmarks._time(risk.can_trade, 100, repeat)
+    
+    @staticmethod
+    def bench_journal_write(repeat: int) -> List[float]:
+        with Benchmarks._journal() as (journal, reset):
+            signal = {'type': 'SHORT', 'rsi': 80.5, 'price': 95000.0, 'ema_200': 96000.0, 'mode': 'CLOUD'}
+            return Benchmarks._time(lambda: journal.log_signal(dict(signal)), 20, repeat, setup=reset)
+    
+    @staticmethod
+    def bench_journal_flush(repeat: int) -> List[float]:
+        """Señal + persistencia inmediata (coste de cada lote del write-behind)."""
+        with Benchmarks._journal() as (journal, reset):
+            signal = {'type': 'SHORT', 'rsi': 80.5, 'price': 95000.0, 'ema_200': 96000.0, 'mode': 'CLOUD'}
+            
+            def write():
+                journal.log_signal(dict(signal))
+                journal.flush()
+            return Benchmarks._time(write, 20, repeat, setup=reset)
+    
+    @staticmethod
+    def bench_cloud_loop(repeat: int) -> List[float]:
+        """Iteración completa de run_cloud_mode (Replay de 2 días con reloj virtual)."""
+        warmup_hours = CONFIG.EMA_PERIOD + 24
+        interval_ms = DataEngine.INTERVAL_MS[CONFIG.TIMEFRAME]
+        candles = Benchmarks._candles(CONFIG.TIMEFRAME, warmup_hours * 3_600_000 // interval_ms + 2 * 96)
+        samples = []
+        for _ in range(repeat):
+            report = Replay(candles, days=2).run()
+            samples.append(report['real_sec'] / max(1, report['cycles']))
+        return samples
+    
+    # ─── Suite, baseline y comparación ────────────────────────────────────────
+    
+    @staticmethod
+    def run(names: Optional[List[str]] = None, repeat: int = 7) -> Dict[str, Any]:
+        """Ejecuta la suite (o los casos indicados) y devuelve el informe JSON."""
+        names = names or list(Benchmarks.SUITE)
+        unknown = [name for name in names if name not in Benchmarks.SUITE]
+        if unknown:
+            raise ValueError(f"Benchmarks desconocidos: {', '.join(unknown)}")
+        
+        results = {}
+        for name in names:
+            LOG.info("Benchmark %s...", name)
+            samples = getattr(Benchmarks, f"bench_{name}")(repeat if name != 'cloud_loop' else 3)
+            results[name] = Benchmarks._summary(samples)
+        return {
+            'meta': {
+                'version': '1.4',
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'numpy': HAS_NUMPY,
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+            },
+            'results': results,
+        }
+    
+    @staticmethod
+    def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+                tolerance: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Compara p50 por caso contra un baseline; ratio > 1 + tolerance es regresión."""
+        tolerance = Benchmarks.REGRESSION_TOLERANCE if tolerance is None else tolerance
+        rows = {}
+        for name, current in report['results'].items():
+            previous = baseline.get('results', {}).get(name)
+            if not previous or not previous.get('p50_ms'):
+                continue
+            ratio = current['p50_ms'] / previous['p50_ms']
+            rows[name] = {'baseline_ms': previous['p50_ms'], 'current_ms': current['p50_ms'],
+                          'ratio': round(ratio, 3), 'regression': ratio > 1 + tolerance}
+        return rows
+    
+    @staticmethod
+    def http_latency(n: int = 200) -> Dict[str, Dict[str, float]]:
+        """Compara latencia de urlopen (conexión nueva por request) vs el pool keep-alive."""
+        with StandInBinanceServer() as server:
+            url = f"{server.base_url}/premiumIndex?symbol=BTCUSDT"
+            
+            urlopen_samples = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                req = urllib.request.Request(url, headers=DataEngine.HEADERS)
+                with urllib.request.urlopen(req, timeout=10) as response:
+                    json.loads(response.read().decode('utf-8'))
+                urlopen_samples.append(time.perf_counter() - t0)
+            
+            pool = HTTPConnectionPool()
+            pool_samples = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                _, _, data = pool.request(url, headers=DataEngine.HEADERS)
+                json.loads(data.decode('utf-8'))
+                pool_samples.append(time.perf_counter() - t0)
+            pool.close_all()
+        
+        return {
+            'urlopen': Benchmarks._summary(urlopen_samples),
+            'pool': Benchmarks._summary(pool_samples)
+        }
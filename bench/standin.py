@@ -0,0 +1,274 @@
+"""
+Servidores locales que imitan la API de Binance Futures (NUEVO v1.4).
+
+Solo para benchmarks y tests: sirven datos sintéticos deterministas por
+REST y WebSocket sin tocar la API real.
+"""
+
+import json
+import gzip
+import time
+import asyncio
+import threading
+import http.server
+import urllib.parse
+from typing import Dict, List, Optional, Tuple, Any
+
+from rsi_mean_reversion_master import DataEngine, WebSocketClient, WeightScheduler
+
+
+class StandInBinanceServer:
+    """
+    Servidor HTTP/1.1 local que imita los endpoints REST de Binance Futures.
+    
+    Sirve datos sintéticos deterministas para medir latencias y probar
+    DataEngine sin tocar la API real.
+    """
+    
+    INTERVAL_MS = {'1m': 60_000, '5m': 300_000, '15m': 900_000, '1h': 3_600_000, '4h': 14_400_000}
+    
+    def __init__(self, base_price: float = 95000.0, gzip_enabled: bool = True):
+        self.base_price = base_price
+        self.gzip_enabled = gzip_enabled
+        self.requests_served = 0
+        self._weight_minute = 0
+        self._weight_used = 0
+        self._weight_lock = threading.Lock()
+        server = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def do_GET(self):
+                parts = urllib.parse.urlsplit(self.path)
+                query = dict(urllib.parse.parse_qsl(parts.query))
+                payload = server.handle(parts.path, query)
+                status = 200 if payload is not None else 404
+                body = json.dumps(payload if payload is not None else {'code': -1, 'msg': 'not found'}).encode('utf-8')
+                
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('X-MBX-USED-WEIGHT-1M', str(server.used_weight(self.path)))
+                if server.gzip_enabled and 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/fapi/v1"
+    
+    def start(self) -> 'StandInBinanceServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+    
+    def __enter__(self) -> 'StandInBinanceServer':
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def used_weight(self, path: str) -> int:
+        """Peso acumulado en el minuto actual, como X-MBX-USED-WEIGHT-1M."""
+        minute = int(time.time() // 60)
+        with self._weight_lock:
+            if minute != self._weight_minute:
+                self._weight_minute = minute
+                self._weight_used = 0
+            self._weight_used += WeightScheduler.weight_for(path)[1]
+            return self._weight_used
+    
+    def _price_at(self, open_time_ms: int) -> float:
+        """Precio sintético determinista (oscilación suave alrededor de base_price)."""
+        step = open_time_ms // 60_000
+        return self.base_price * (1 + 0.01 * ((step * 7919) % 1000 - 500) / 500)
+    
+    def handle(self, path: str, query: Dict[str, str]) -> Optional[Any]:
+        self.requests_served += 1
+        if path.endswith('/premiumIndex'):
+            now_ms = int(time.time() * 1000)
+            price = self._price_at(now_ms)
+            return {
+                'symbol': query.get('symbol', 'BTCUSDT'),
+                'markPrice': f"{price:.2f}",
+                'indexPrice': f"{price * 0.9999:.2f}",
+                'lastFundingRate': "0.00010000",
+                'nextFundingTime': now_ms + 3_600_000,
+                'time': now_ms
+            }
+        if path.endswith('/klines'):
+            interval_ms = DataEngine.INTERVAL_MS.get(query.get('interval', '15m'), 900_000)
+            limit = min(int(query.get('limit', 500)), 1500)
+            now_ms = int(time.time() * 1000)
+            last_open = now_ms - now_ms % interval_ms
+            if 'startTime' in query:
+                start = int(query['startTime'])
+                first_open = start + (-start) % interval_ms
+            else:
+                first_open = last_open - (limit - 1) * interval_ms
+            rows = []
+            t = first_open
+            while t <= last_open and len(rows) < limit:
+                o = self._price_at(t)
+                c = self._price_at(t + interval_ms)
+                rows.append([t, f"{o:.2f}", f"{max(o, c) * 1.001:.2f}", f"{min(o, c) * 0.999:.2f}",
+                             f"{c:.2f}", "123.456", t + interval_ms - 1, "0", 100, "0", "0", "0"])
+                t += interval_ms
+            return rows
+        return None
+
+
+class StandInWebSocketServer:
+    """
+    Servidor WebSocket local con el formato de streams combinados de Binance.
+    
+    Emite eventos kline y markPriceUpdate coherentes con StandInBinanceServer
+    y permite cortar conexiones para probar reconexión y gap-fill.
+    """
+    
+    def __init__(self, rest: StandInBinanceServer, symbol: str = 'BTCUSDT',
+                 intervals: Tuple[str, ...] = ('15m', '1h'), tick_sec: float = 0.05):
+        self.rest = rest
+        self.symbol = symbol
+        self.intervals = intervals
+        self.tick_sec = tick_sec
+        self.connections = 0
+        self._writers: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._port = 0
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        streams = [f"{self.symbol.lower()}@kline_{i}" for i in self.intervals] + [f"{self.symbol.lower()}@markPrice@1s"]
+        return f"ws://127.0.0.1:{self._port}/stream?streams={'/'.join(streams)}"
+    
+    def start(self) -> 'StandInWebSocketServer':
+        self._thread = threading.Thread(target=self._thread_main, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+    
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(5)
+    
+    def __enter__(self) -> 'StandInWebSocketServer':
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def drop_connections(self):
+        """Corta abruptamente todas las conexiones (simula caída de red)."""
+        def _abort():
+            for writer in list(self._writers):
+                writer.transport.abort()
+        self._loop.call_soon_threadsafe(_abort)
+    
+    def send(self, event: Any):
+        """Envía un mensaje arbitrario (dict o texto) a todas las conexiones."""
+        text = event if isinstance(event, str) else json.dumps(event)
+        frame = WebSocketClient.encode_frame(WebSocketClient.OP_TEXT, text.encode(), mask=False)
+        
+        def _send():
+            for writer in list(self._writers):
+                writer.write(frame)
+        self._loop.call_soon_threadsafe(_send)
+    
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, '127.0.0.1', 0)
+        )
+        self._port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+    
+    def _events(self) -> List[Dict]:
+        now_ms = int(time.time() * 1000)
+        events = []
+        for interval in self.intervals:
+            interval_ms = DataEngine.INTERVAL_MS[interval]
+            t = now_ms - now_ms % interval_ms
+            o, c = self.rest._price_at(t), self.rest._price_at(t + interval_ms)
+            events.append({
+                'stream': f"{self.symbol.lower()}@kline_{interval}",
+                'data': {'e': 'kline', 'E': now_ms, 's': self.symbol, 'k': {
+                    't': t, 'T': t + interval_ms - 1, 'i': interval, 'x': False,
+                    'o': f"{o:.2f}", 'h': f"{max(o, c) * 1.001:.2f}", 'l': f"{min(o, c) * 0.999:.2f}",
+                    'c': f"{c:.2f}", 'v': "123.456"
+                }}
+            })
+        price = self.rest._price_at(now_ms)
+        events.append({
+            'stream': f"{self.symbol.lower()}@markPrice@1s",
+            'data': {'e': 'markPriceUpdate', 'E': now_ms, 's': self.symbol,
+                     'p': f"{price:.2f}", 'i': f"{price * 0.9999:.2f}", 'r': "0.00010000"}
+        })
+        return events
+    
+    async def _emit(self, writer: asyncio.StreamWriter):
+        while True:
+            for event in self._events():
+                writer.write(WebSocketClient.encode_frame(WebSocketClient.OP_TEXT, json.dumps(event).encode(), mask=False))
+            await writer.drain()
+            await asyncio.sleep(self.tick_sec)
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        headers = {}
+        await reader.readline()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {WebSocketClient.accept_key(headers.get('sec-websocket-key', ''))}\r\n\r\n"
+        ).encode())
+        self.connections += 1
+        self._writers.add(writer)
+        sender = asyncio.get_running_loop().create_task(self._emit(writer))
+        try:
+            while True:
+                _, opcode, payload = await WebSocketClient.read_frame(reader)
+                if opcode == WebSocketClient.OP_PING:
+                    writer.write(WebSocketClient.encode_frame(WebSocketClient.OP_PONG, payload, mask=False))
+                elif opcode == WebSocketClient.OP_CLOSE:
+                    writer.write(WebSocketClient.encode_frame(WebSocketClient.OP_CLOSE, payload[:2], mask=False))
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            sender.cancel()
+            self._writers.discard(writer)
+            writer.close()
@@ -31,21 +31,61 @@ CHANGELOG:
     - HUD profesional con alertas
     - Journal con persistencia
     - Cálculo preciso de fees y R:R neto
+  v1.4: Motor de datos, estado incremental, backtest y journal SQLite
+    - RSI en vivo: misma ventana de 50 velas que v1.3 (valores idénticos)
+    - RSI_CONVERGED=True: RSI incremental sembrado con 500 velas. NO validado:
+      difiere del RSI de 50 velas ~1.2 pts de mediana (p90 ~2.9, máx ~5) y
+      puede cruzar 20/80 en velas distintas
+    - EMA 200 H1 en vivo: misma ventana de 250 velas que v1.3 (valores idénticos)
+    - EMA_CONVERGED=True: EMA incremental sembrada con 1000 velas. NO validada:
+      difiere de la EMA de 250 velas ~$71 de mediana (p90 ~$177, máx ~$440 con
+      BTC ~$40k) y el lado precio/EMA cambia en ~4% de las lecturas
 """
 
 import os
 import sys
+import ssl
+import copy
+import gzip
 import json
 import time
+import queue
+import atexit
+import logging
+import logging.handlers
+import struct
+import sqlite3
+import base64
+import asyncio
+import hashlib
 import threading
 import argparse
+import mmap
+import bisect
+import random
+import itertools
+import statistics
+import http.client
 import urllib.request
 import urllib.error
+import urllib.parse
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, Optional, Tuple, Any, Union, Callable
+from array import array
+from collections import deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+# NumPy es opcional: solo acelera cálculos de series completas (NUEVO v1.4)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
 # ══════════════════════════════════════════════════════════════════════════════
 # ⚙️  SECCIÓN 1: CONFIGURACIÓN Y PERSISTENCIA (MEJORADO)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -107,6 +147,10 @@ class ValidatedConfig:
     RSI_PERIOD: int = 21                    # NO usar 14 ni 2
     RSI_OVERSOLD: int = 20                  # Señal LONG
     RSI_OVERBOUGHT: int = 80                # Señal SHORT
+    RSI_WINDOW: int = 50                    # RSI sobre las últimas 50 velas (como v1.3)
+    RSI_CONVERGED: bool = False             # True: RSI incremental sembrado con 500 velas
+                                            # (v1.4, NO validado: difiere ~1.2 pts de mediana,
+                                            # p90 ~2.9, máx ~5 del RSI de 50 velas)
     
     # Timeframe - ÚNICO que pasó validación
     TIMEFRAME: str = "15m"                  # NO usar 5m, 1h, 4h
@@ -150,6 +194,10 @@ class ValidatedConfig:
     # Filtro EMA - OBLIGATORIO
     EMA_PERIOD: int = 200                   # EMA 200 en H1
     EMA_TIMEFRAME: str = "1h"
+    EMA_WINDOW: int = 250                   # EMA sobre las últimas 250 velas (como v1.3)
+    EMA_CONVERGED: bool = False             # True: EMA incremental sembrada con 1000 velas
+                                            # (v1.4, NO validada: difiere ~$71 de mediana,
+                                            # p90 ~$177; cambia el lado precio/EMA en ~4%)
     
     # ═══════════════════════════════════════════════════════════════════════
     # HORARIOS ÓPTIMOS (UTC+5 Ekaterinburg)
@@ -178,10 +226,13 @@ class ValidatedConfig:
     # Paths
     BASE_DIR: str = ""
     JOURNAL_DIR: str = ""
+    HISTORY_DIR: str = ""
+    JOURNAL_BACKEND: str = "json"           # "json" (un archivo por día) o "sqlite" (v1.4, --migrate-journal)
     
     def __post_init__(self):
         self.BASE_DIR = os.path.dirname(os.path.abspath(__file__))
         self.JOURNAL_DIR = os.path.join(self.BASE_DIR, "rsi_journal")
+        self.HISTORY_DIR = os.path.join(self.BASE_DIR, "rsi_history")
         self.USER_TZ = timezone(timedelta(hours=self.USER_TZ_OFFSET))
         
         # Cargar configuración personalizada
@@ -212,7 +263,8 @@ class ValidatedConfig:
             "RISK_PER_TRADE_PCT": self.RISK_PER_TRADE_PCT,
             "TELEGRAM_BOT_TOKEN": self.TELEGRAM_BOT_TOKEN,
             "TELEGRAM_CHAT_ID": self.TELEGRAM_CHAT_ID,
-            "SOUND_ENABLED": self.SOUND_ENABLED
+            "SOUND_ENABLED": self.SOUND_ENABLED,
+            "JOURNAL_BACKEND": self.JOURNAL_BACKEND
         }
         ConfigManager.save_config(data)
 
@@ -220,82 +272,1418 @@ class ValidatedConfig:
 # Instancia global de configuración
 CONFIG = ValidatedConfig()
 
+# ══════════════════════════════════════════════════════════════════════════════
+# 📝  SECCIÓN 1.5: LOGGING ESTRUCTURADO (NUEVO v1.4)
+# ══════════════════════════════════════════════════════════════════════════════
+
+LOG = logging.getLogger("rsi_master")
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Una línea JSON por evento; los campos `extra=` se incluyen tal cual."""
+    
+    _STANDARD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'sample_key'}
+    
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in self._STANDARD:
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Limita los mensajes DEBUG a `max_per_window` por clave y ventana.
+    
+    La clave es `extra={'sample_key': ...}` o la plantilla del mensaje. Al
+    abrirse una ventana nueva, el primer registro lleva `suppressed=N`.
+    """
+    
+    def __init__(self, max_per_window: int = 5, window_sec: float = 60.0):
+        super().__init__()
+        self.max_per_window = max_per_window
+        self.window_sec = window_sec
+        self._windows: Dict[str, List[float]] = {}   # clave -> [inicio, emitidos, suprimidos]
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        key = getattr(record, 'sample_key', None) or str(record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_sec:
+                suppressed = int(window[2]) if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.max_per_window:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+_LOG_LISTENER: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_log_listener():
+    """Vacía la cola y detiene el thread de logging (también al salir)."""
+    global _LOG_LISTENER
+    if _LOG_LISTENER is not None:
+        _LOG_LISTENER.stop()
+        _LOG_LISTENER = None
+
+
+def setup_logging(level: str = "INFO", json_lines: bool = False) -> logging.handlers.QueueListener:
+    """
+    Configura LOG con un QueueHandler: el hilo de análisis solo encola y un
+    thread aparte formatea y escribe a stdout. Llamarla otra vez detiene el
+    listener anterior antes de crear el nuevo (sin threads huérfanos).
+    """
+    global _LOG_LISTENER
+    _stop_log_listener()
+    
+    handler = logging.StreamHandler(sys.stdout)
+    if json_lines:
+        handler.setFormatter(JSONLinesFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(message)s", "%Y-%m-%d %H:%M:%S"))
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+    
+    LOG.handlers[:] = [queue_handler]
+    LOG.setLevel(level.upper())
+    LOG.propagate = False
+    
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    _LOG_LISTENER = listener
+    atexit.unregister(_stop_log_listener)      # Un solo registro aunque se llame varias veces
+    atexit.register(_stop_log_listener)
+    return listener
+
 # ══════════════════════════════════════════════════════════════════════════════
 # 🌐  SECCIÓN 2: MOTOR DE DATOS
 # ══════════════════════════════════════════════════════════════════════════════
 
+class HTTPConnectionPool:
+    """
+    Pool de conexiones HTTP(S) keep-alive por host (NUEVO v1.4).
+    
+    Reutiliza el socket TCP + sesión TLS entre requests, de modo que en
+    régimen estable cada request cuesta un solo round trip. Si un socket
+    reutilizado resultó estar cerrado por el servidor, reconecta una vez.
+    """
+    
+    IDLE_TIMEOUT = 50.0     # Segundos antes de descartar un socket inactivo
+    
+    def __init__(self, max_per_host: int = 4):
+        self.max_per_host = max_per_host
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+    
+    def _new_connection(self, key: Tuple[str, str, int], timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+    
+    def _acquire(self, key: Tuple[str, str, int], timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """Devuelve (conexión, reutilizada)."""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used < self.IDLE_TIMEOUT:
+                    return conn, True
+                conn.close()
+        return self._new_connection(key, timeout), False
+    
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+    
+    def close_all(self):
+        """Cierra todas las conexiones inactivas."""
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+    
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10,
+                method: str = 'GET', body: Optional[bytes] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Ejecuta un request sobre una conexión del pool.
+        
+        Returns: (status, headers en minúsculas, body descomprimido)
+        """
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        
+        request_headers = {'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'}
+        if headers:
+            request_headers.update(headers)
+        
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.request(method, path, body=body, headers=request_headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                # Socket reutilizado cerrado por el servidor -> reconectar una vez
+                if reused and attempt == 0 and not isinstance(e, TimeoutError):
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            
+            if (response.getheader('Content-Encoding') or '').lower() == 'gzip':
+                data = gzip.decompress(data)
+            
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            
+            return response.status, {k.lower(): v for k, v in response.getheaders()}, data
+        
+        raise ConnectionError(f"No se pudo reconectar a {parts.hostname}")
+
+
+class TTLCache:
+    """
+    Cache de respuestas con TTL corto y coalescing single-flight (NUEVO v1.4).
+    
+    Si varios threads piden la misma clave a la vez, solo uno ejecuta el
+    fetch y los demás esperan su resultado. Las respuestas None no se cachean.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def get_or_fetch(self, key: str, ttl: float, fetch: Callable[[], Any],
+                     timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] < ttl:
+                return entry[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not leader:
+            try:
+                return future.result(timeout=timeout)
+            except Exception:
+                return None
+        
+        value = None
+        try:
+            value = fetch()
+        finally:
+            with self._lock:
+                if value is not None:
+                    self._entries[key] = (self._clock(), value)
+                del self._inflight[key]
+            future.set_result(value)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Candles:
+    """
+    Velas en formato columnar (struct-of-arrays) (NUEVO v1.4).
+    
+    Cada columna es una vista (memoryview) sobre un array('d') de precios y
+    volumen o un array('q') de timestamps en ms. El slicing devuelve vistas
+    que comparten memoria con el original (sin copiar); indexar una posición
+    devuelve un dict con las mismas claves que el formato anterior, para el
+    código de UI.
+    """
+    
+    COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time')
+    TYPECODES = ('q', 'd', 'd', 'd', 'd', 'd', 'q')
+    
+    __slots__ = COLUMNS
+    
+    def __init__(self, timestamp, open, high, low, close, volume, close_time):
+        self.timestamp = Candles._view(timestamp)
+        self.open = Candles._view(open)
+        self.high = Candles._view(high)
+        self.low = Candles._view(low)
+        self.close = Candles._view(close)
+        self.volume = Candles._view(volume)
+        self.close_time = Candles._view(close_time)
+    
+    @staticmethod
+    def _view(column):
+        return memoryview(column) if isinstance(column, array) else column
+    
+    @staticmethod
+    def _as_bytes(column, typecode: str) -> Union[bytes, memoryview]:
+        if isinstance(column, memoryview):
+            return column.cast('B') if column.c_contiguous else column.tobytes()
+        return array(typecode, column).tobytes()
+    
+    @classmethod
+    def from_binance(cls, rows: List[List]) -> 'Candles':
+        """Construye desde la respuesta cruda de /klines."""
+        if not rows:
+            return cls(*(array(code) for code in cls.TYPECODES))
+        # Transponer filas -> columnas en C y convertir cada columna de una vez
+        cols = list(zip(*rows))
+        return cls(
+            array('q', cols[0]),
+            array('d', map(float, cols[1])),
+            array('d', map(float, cols[2])),
+            array('d', map(float, cols[3])),
+            array('d', map(float, cols[4])),
+            array('d', map(float, cols[5])),
+            array('q', cols[6])
+        )
+    
+    @classmethod
+    def from_dicts(cls, rows: List[Dict]) -> 'Candles':
+        """Construye desde el formato anterior (lista de dicts)."""
+        return cls(*(array(code, [r[name] for r in rows])
+                     for name, code in zip(cls.COLUMNS, cls.TYPECODES)))
+    
+    @classmethod
+    def concat(cls, parts: List['Candles']) -> 'Candles':
+        """Concatena varias series en columnas nuevas (copia con memcpy)."""
+        columns = []
+        for name, code in zip(cls.COLUMNS, cls.TYPECODES):
+            column = array(code)
+            for part in parts:
+                column.frombytes(cls._as_bytes(getattr(part, name), code))
+            columns.append(column)
+        return cls(*columns)
+    
+    def __len__(self) -> int:
+        return len(self.timestamp)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Candles(*(getattr(self, name)[index] for name in self.COLUMNS))
+        return {name: getattr(self, name)[index] for name in self.COLUMNS}
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Candles, list)):
+            return self.to_dicts() == list(other)
+        return NotImplemented
+    
+    def __reduce__(self):
+        return (Candles, tuple(array(code, getattr(self, name))
+                               for name, code in zip(self.COLUMNS, self.TYPECODES)))
+    
+    def __repr__(self) -> str:
+        return f"Candles(n={len(self)})"
+    
+    def to_dicts(self) -> List[Dict]:
+        return list(self)
+    
+    def index_of(self, timestamp: int) -> int:
+        """Primera posición con open time >= timestamp (búsqueda binaria)."""
+        return bisect.bisect_left(self.timestamp, timestamp)
+
+
+class RequestPriority(Enum):
+    CRITICAL = 0    # Velas al cierre - detección de señales
+    NORMAL = 1      # Precio mark, monitor de trade
+    LOW = 2         # Cosmético: tests de conexión, backfill, heartbeat
+
+
+class WeightScheduler:
+    """
+    Limitador token-bucket del peso de requests de Binance (NUEVO v1.4).
+    
+    - Estima el peso de cada endpoint antes de enviarlo
+    - Se resincroniza con la cabecera X-MBX-USED-WEIGHT-1M
+    - Respeta Retry-After en 429 (rate limit) y 418 (ban de IP)
+    - Reserva presupuesto: LOW solo usa hasta el 50%, NORMAL hasta el 90%,
+      y un request no pasa mientras espera otro de mayor prioridad
+    """
+    
+    WEIGHT_LIMIT_1M = 2400
+    PRIORITY_SHARE = {
+        RequestPriority.CRITICAL: 1.0,
+        RequestPriority.NORMAL: 0.9,
+        RequestPriority.LOW: 0.5
+    }
+    DEFAULT_BAN_SEC = 60.0
+    
+    def __init__(self, limit: int = WEIGHT_LIMIT_1M, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit
+        self.tokens = float(limit)
+        self.blocked_until = 0.0
+        self.used_weight_1m = 0
+        self.spent_by_endpoint: Dict[str, int] = {}
+        self._clock = clock
+        self._last_refill = clock()
+        self._waiting = {p: 0 for p in RequestPriority}
+        self._cond = threading.Condition()
+    
+    @staticmethod
+    def weight_for(url: str) -> Tuple[str, int]:
+        """Devuelve (endpoint, peso) según la tabla de Binance Futures (URL o ruta)."""
+        parts = urllib.parse.urlsplit(url)
+        endpoint = parts.path.rsplit('/', 1)[-1]
+        query = dict(urllib.parse.parse_qsl(parts.query))
+        
+        if endpoint == 'klines':
+            limit = int(query.get('limit', 500))
+            if limit < 100:
+                return endpoint, 1
+            if limit < 500:
+                return endpoint, 2
+            if limit <= 1000:
+                return endpoint, 5
+            return endpoint, 10
+        if endpoint == 'premiumIndex':
+            return endpoint, 1 if 'symbol' in query else 10
+        return endpoint, 1
+    
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self.tokens = min(float(self.limit), self.tokens + elapsed * self.limit / 60.0)
+    
+    def _higher_priority_waiting(self, priority: RequestPriority) -> bool:
+        return any(self._waiting[p] for p in RequestPriority if p.value < priority.value)
+    
+    def acquire(self, url: str, priority: RequestPriority = RequestPriority.NORMAL,
+                deadline: Optional[float] = None) -> bool:
+        """Bloquea hasta tener presupuesto para `url`. False si vence el deadline."""
+        endpoint, weight = self.weight_for(url)
+        floor = self.limit * (1 - self.PRIORITY_SHARE[priority])
+        
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = self._clock()
+                    self._refill(now)
+                    
+                    if now >= self.blocked_until and not self._higher_priority_waiting(priority):
+                        if self.tokens - weight >= floor:
+                            self.tokens -= weight
+                            self.spent_by_endpoint[endpoint] = self.spent_by_endpoint.get(endpoint, 0) + weight
+                            return True
+                        delay = (weight + floor - self.tokens) * 60.0 / self.limit
+                    else:
+                        delay = max(self.blocked_until - now, 0.05)
+                    
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        delay = min(delay, remaining)
+                    self._cond.wait(delay)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+    
+    def update_from_response(self, status: int, headers: Dict[str, str]):
+        """Ajusta el presupuesto con las cabeceras de Binance y aplica Retry-After."""
+        with self._cond:
+            used = headers.get('x-mbx-used-weight-1m')
+            if used is not None and used.isdigit():
+                self.used_weight_1m = int(used)
+                self.tokens = min(self.tokens, float(self.limit - self.used_weight_1m))
+            
+            if status in (418, 429):
+                retry_after = headers.get('retry-after')
+                ban_sec = float(retry_after) if retry_after and retry_after.isdigit() else self.DEFAULT_BAN_SEC
+                self.blocked_until = max(self.blocked_until, self._clock() + ban_sec)
+                self.tokens = 0.0
+            self._cond.notify_all()
+    
+    def is_blocked(self) -> bool:
+        return self._clock() < self.blocked_until
+
+
+class CircuitState(Enum):
+    CLOSED = "CLOSED"        # Operativo
+    OPEN = "OPEN"            # Host descartado temporalmente
+    HALF_OPEN = "HALF_OPEN"  # Probando con un único request
+
+
+class CircuitBreaker:
+    """Circuit breaker por host: se abre tras N fallos seguidos (NUEVO v1.4)."""
+    
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._clock = clock
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def available(self) -> bool:
+        """True si allow() aceptaría un request. No cambia el estado (para filtrar hosts)."""
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                return self._clock() - self._opened_at >= self.reset_timeout
+            return not self._trial_in_flight
+    
+    def allow(self) -> bool:
+        """
+        True si se puede enviar un request a este host ahora. En HALF_OPEN
+        reserva el único request de prueba: llamar solo al enviarlo de verdad.
+        """
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self) -> bool:
+        """Registra un fallo. Devuelve True si el circuito acaba de abrirse."""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+                opened = self.state != CircuitState.OPEN
+                self.state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                return opened
+            return False
+
+
+class LatencyTracker:
+    """Ventana de latencias recientes para derivar el umbral de hedging (p95)."""
+    
+    MIN_SAMPLES = 20
+    
+    def __init__(self, window: int = 200, default: float = 1.0, floor: float = 0.05):
+        self.default = default
+        self.floor = floor
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def p95(self) -> float:
+        with self._lock:
+            if len(self._samples) < self.MIN_SAMPLES:
+                return self.default
+            ordered = sorted(self._samples)
+        return max(self.floor, ordered[int(len(ordered) * 0.95) - 1])
+
+
 class DataEngine:
     """Motor de obtención de datos de Binance Futures."""
     
     BASE_URL = "https://fapi.binance.com/fapi/v1"
     
+    # Hosts equivalentes para hedging y failover (NUEVO v1.4)
+    MIRROR_URLS = [
+        "https://fapi1.binance.com/fapi/v1",
+        "https://fapi2.binance.com/fapi/v1",
+        "https://fapi3.binance.com/fapi/v1"
+    ]
+    
+    INTERVAL_MS = {'1m': 60_000, '5m': 300_000, '15m': 900_000, '1h': 3_600_000, '4h': 14_400_000}
+    
+    # Pool compartido de conexiones keep-alive (NUEVO v1.4)
+    POOL = HTTPConnectionPool()
+    
+    # Threads para lanzar requests en paralelo (NUEVO v1.4)
+    EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="data")
+    CONCURRENT = True   # Con I/O de red: el ciclo reparte las llamadas en EXECUTOR
+    
+    # Reloj de las esperas de backoff; el replay inyecta su VirtualClock
+    CLOCK = None
+    HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+    
+    # Presupuesto de peso de requests compartido (NUEVO v1.4)
+    SCHEDULER = WeightScheduler()
+    
+    # Hedging y circuit breakers por host (NUEVO v1.4)
+    LATENCY = LatencyTracker()
+    BREAKERS: Dict[str, CircuitBreaker] = {}
+    
+    # premiumIndex compartido por precio mark, index y funding (NUEVO v1.4)
+    CACHE = TTLCache()
+    PREMIUM_TTL_SEC = 1.0
+    
+    # User-Agent de navegador real para evitar bloqueos
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    }
+    
+    @staticmethod
+    def _breaker(host: str) -> CircuitBreaker:
+        breaker = DataEngine.BREAKERS.get(host)
+        if breaker is None:
+            breaker = DataEngine.BREAKERS.setdefault(host, CircuitBreaker())
+        return breaker
+    
+    @staticmethod
+    def _available_hosts() -> List[str]:
+        """Hosts con el circuito cerrado (o en prueba), en orden de preferencia."""
+        return [h for h in [DataEngine.BASE_URL] + DataEngine.MIRROR_URLS if DataEngine._breaker(h).available()]
+    
+    @staticmethod
+    def _fetch_host(host: str, path: str, timeout: float) -> Tuple[int, Dict[str, str], bytes]:
+        """Un request a un host concreto, alimentando latencias y circuit breaker."""
+        breaker = DataEngine._breaker(host)
+        start = time.monotonic()
+        try:
+            status, headers, data = DataEngine.POOL.request(host + path, headers=DataEngine.HEADERS, timeout=timeout)
+        except Exception:
+            if breaker.record_failure():
+                LOG.warning("Circuit breaker ABIERTO para %s", host)
+            raise
+        
+        if status >= 500:
+            if breaker.record_failure():
+                LOG.warning("Circuit breaker ABIERTO para %s", host)
+        else:
+            breaker.record_success()
+            DataEngine.LATENCY.record(time.monotonic() - start)
+        return status, headers, data
+    
+    @staticmethod
+    def _hedged_fetch(path: str, timeout: float, priority: RequestPriority) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Envía el request al host preferido y, si tarda más que el p95 reciente,
+        lanza un duplicado al siguiente host. Si un host falla rápido pasa al
+        siguiente sin esperar. Gana la primera respuesta no-5xx.
+        """
+        hosts = DataEngine._available_hosts()
+        if not hosts:
+            raise ConnectionError("Todos los hosts con circuito abierto")
+        
+        end = time.monotonic() + timeout
+        hedge_delay = min(DataEngine.LATENCY.p95(), timeout)
+        pending = set()
+        next_host = 0
+        hedged = False
+        last_error: Optional[BaseException] = None
+        last_response = None
+        
+        def launch() -> bool:
+            # El request de prueba de un circuito HALF_OPEN se reserva aquí, al
+            # enviarlo: un host filtrado pero no contactado no queda bloqueado
+            nonlocal next_host
+            while next_host < len(hosts):
+                host = hosts[next_host]
+                next_host += 1
+                if DataEngine._breaker(host).allow():
+                    pending.add(DataEngine.HEDGE_EXECUTOR.submit(
+                        DataEngine._fetch_host, host, path, max(0.001, end - time.monotonic())
+                    ))
+                    return True
+            return False
+        
+        if not launch():
+            raise ConnectionError("Todos los hosts con circuito abierto")
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            can_hedge = not hedged and next_host < len(hosts)
+            done, pending = wait(pending, timeout=min(hedge_delay, remaining) if can_hedge else remaining,
+                                 return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if response[0] < 500:
+                    return response
+                last_response = response
+            
+            if next_host >= len(hosts):
+                continue
+            if done and not pending:
+                # Fallo rápido -> failover al siguiente host, también dentro del
+                # presupuesto de peso (puede esperar hasta el fin del request)
+                if not DataEngine.SCHEDULER.acquire(path, priority, end):
+                    LOG.warning("Sin presupuesto de peso para failover: %s", path[:60])
+                    break
+                launch()
+            elif not done and can_hedge and DataEngine.SCHEDULER.acquire(path, priority, time.monotonic()):
+                # El duplicado también consume peso: solo si hay presupuesto inmediato
+                hedged = True
+                if launch():
+                    LOG.debug("Hedge: request tarda > %.0fms, duplicando en %s", hedge_delay * 1000,
+                              hosts[next_host - 1], extra={'sample_key': 'hedge'})
+        
+        if last_response is not None:
+            return last_response
+        raise last_error or TimeoutError(f"Sin respuesta en {timeout:.1f}s")
+    
     @staticmethod
-    def _request(url: str, timeout: int = 10, retries: int = 3) -> Optional[Any]:
-        """Request HTTP con Retry y Backoff Exponencial."""
+    def _request(path: str, timeout: int = 10, retries: int = 3, deadline: Optional[float] = None,
+                 priority: RequestPriority = RequestPriority.NORMAL) -> Optional[Any]:
+        """
+        Request HTTP con Retry y Backoff Exponencial (conexión keep-alive del pool).
+        
+        Args:
+            path: Ruta relativa al host (p.ej. "/klines?symbol=BTCUSDT&...").
+            deadline: Instante límite (time.monotonic()) compartido por el ciclo;
+                      acota timeout, reintentos y esperas de backoff.
+            priority: Prioridad ante el limitador de peso de Binance.
+        """
         for attempt in range(retries):
+            if not DataEngine.SCHEDULER.acquire(path, priority, deadline):
+                LOG.warning("Sin presupuesto de peso (%s) para: %s", priority.name, path[:60])
+                break
+            
+            request_timeout = timeout
+            if deadline is not None:
+                request_timeout = min(timeout, deadline - time.monotonic())
+                if request_timeout <= 0:
+                    break
             try:
-                print(f"[LOG] Intento {attempt + 1}/{retries}: Conectando a {url[:60]}...")
+                LOG.debug("Intento %d/%d: %s...", attempt + 1, retries, path[:60],
+                          extra={'sample_key': 'request'})
                 
-                # User-Agent de navegador real para evitar bloqueos
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                }
+                status, headers, data = DataEngine._hedged_fetch(path, request_timeout, priority)
+                DataEngine.SCHEDULER.update_from_response(status, headers)
                 
-                req = urllib.request.Request(url, headers=headers)
+                if status == 418:
+                    LOG.error("HTTP 418: IP baneada por Binance (Retry-After %ss)", headers.get('retry-after', '?'))
+                    break
+                if status == 429:
+                    # El scheduler bloquea hasta Retry-After; el siguiente acquire espera
+                    LOG.warning("HTTP 429: Rate limit (Retry-After %ss)", headers.get('retry-after', '?'))
+                    continue
+                if status >= 400:
+                    LOG.warning("HTTP Error %d: %s", status, path[:60])
+                    DataEngine._backoff(attempt, deadline)
+                    continue
                 
-                with urllib.request.urlopen(req, timeout=timeout) as response:
-                    print(f"[LOG] ✅ Respuesta OK ({response.status})")
-                    data = response.read()
-                    return json.loads(data.decode('utf-8'))
+                LOG.debug("Respuesta OK (%d)", status, extra={'sample_key': 'response'})
+                return json.loads(data.decode('utf-8'))
                     
-            except urllib.error.HTTPError as e:
-                print(f"[LOG] ❌ HTTP Error {e.code}: {e.reason}")
-                time.sleep(2 ** attempt)
             except Exception as e:
-                print(f"[LOG] ❌ Connection Error: {e}")
-                sleep_time = (2 ** attempt)
-                time.sleep(sleep_time)
-        print(f"[LOG] ⚠️ Fallaron todos los intentos para: {url[:60]}")
+                LOG.warning("Connection Error: %s", e or type(e).__name__)
+                DataEngine._backoff(attempt, deadline)
+        LOG.error("Fallaron todos los intentos para: %s", path[:60])
         return None
     
     @staticmethod
-    def get_klines(symbol: str, interval: str, limit: int = 100) -> Optional[List[Dict]]:
-        """Obtiene velas de Binance Futures."""
-        url = f"{DataEngine.BASE_URL}/klines?symbol={symbol}&interval={interval}&limit={limit}"
-        data = DataEngine._request(url)
-        if not data:
+    def _backoff(attempt: int, deadline: Optional[float] = None):
+        """Espera exponencial sin sobrepasar el deadline."""
+        sleep_time = 2 ** attempt
+        if deadline is not None:
+            sleep_time = min(sleep_time, max(0.0, deadline - time.monotonic()))
+        if DataEngine.CLOCK is not None:
+            DataEngine.CLOCK.sleep(sleep_time)
+        else:
+            time.sleep(sleep_time)
+    
+    @staticmethod
+    def get_klines(symbol: str, interval: str, limit: int = 100, start_time: Optional[int] = None,
+                   deadline: Optional[float] = None,
+                   priority: RequestPriority = RequestPriority.CRITICAL) -> Optional[Candles]:
+        """Obtiene velas de Binance Futures (opcionalmente desde start_time en ms)."""
+        path = f"/klines?symbol={symbol}&interval={interval}&limit={limit}"
+        if start_time is not None:
+            path += f"&startTime={start_time}"
+        data = DataEngine._request(path, deadline=deadline, priority=priority)
+        if data is None:
             return None
         
-        candles = []
-        for c in data:
-            candles.append({
-                'timestamp': c[0],
-                'open': float(c[1]),
-                'high': float(c[2]),
-                'low': float(c[3]),
-                'close': float(c[4]),
-                'volume': float(c[5]),
-                'close_time': c[6]
-            })
-        return candles
+        return Candles.from_binance(data)   # [] -> Candles vacío (hueco en el histórico)
+    
+    @staticmethod
+    def get_premium_index(symbol: str, deadline: Optional[float] = None,
+                          priority: RequestPriority = RequestPriority.NORMAL) -> Optional[Dict]:
+        """premiumIndex con cache TTL: una respuesta sirve a todos los consumidores."""
+        path = f"/premiumIndex?symbol={symbol}"
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        return DataEngine.CACHE.get_or_fetch(
+            path, DataEngine.PREMIUM_TTL_SEC,
+            lambda: DataEngine._request(path, deadline=deadline, priority=priority),
+            timeout=timeout
+        )
     
     @staticmethod
-    def get_current_price(symbol: str) -> Optional[float]:
+    def get_current_price(symbol: str, deadline: Optional[float] = None,
+                          priority: RequestPriority = RequestPriority.NORMAL) -> Optional[float]:
         """Obtiene precio mark de Futures."""
-        url = f"{DataEngine.BASE_URL}/premiumIndex?symbol={symbol}"
-        data = DataEngine._request(url)
+        data = DataEngine.get_premium_index(symbol, deadline, priority)
         if data and 'markPrice' in data:
             return float(data['markPrice'])
         return None
     
     @staticmethod
-    def get_funding_rate(symbol: str) -> Optional[float]:
+    def get_index_price(symbol: str, deadline: Optional[float] = None,
+                        priority: RequestPriority = RequestPriority.NORMAL) -> Optional[float]:
+        """Obtiene precio índice (spot ponderado)."""
+        data = DataEngine.get_premium_index(symbol, deadline, priority)
+        if data and 'indexPrice' in data:
+            return float(data['indexPrice'])
+        return None
+    
+    @staticmethod
+    def get_funding_rate(symbol: str, deadline: Optional[float] = None,
+                         priority: RequestPriority = RequestPriority.LOW) -> Optional[float]:
         """Obtiene funding rate actual."""
-        url = f"{DataEngine.BASE_URL}/premiumIndex?symbol={symbol}"
-        data = DataEngine._request(url)
+        data = DataEngine.get_premium_index(symbol, deadline, priority)
         if data and 'lastFundingRate' in data:
             return float(data['lastFundingRate']) * 100
         return None
+
+class KlineCache:
+    """
+    Cache incremental de velas por (símbolo, intervalo) (NUEVO v1.4).
+    
+    Guarda un anillo acotado de velas y en cada consulta pide solo las velas
+    desde la última vela conocida (la que aún se estaba formando), que se
+    reemplaza; las velas cerradas nunca se vuelven a descargar. Si el delta
+    falla se sirve la cache solo mientras se actualizó hace menos de un
+    intervalo; después get() devuelve None, como un fetch fallido.
+    """
+    
+    CAPACITY = 1000         # Velas máximas por serie
+    DELTA_LIMIT = 99        # limit < 100 -> peso 1 en Binance
+    
+    def __init__(self, capacity: int = CAPACITY, data=None,
+                 clock: Callable[[], float] = time.time):
+        self.capacity = capacity
+        self.data = data or DataEngine     # Fuente de velas (replay usa otra, v1.4)
+        self._clock = clock
+        self._series: Dict[Tuple[str, str], Candles] = {}
+        self._updated_at: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+    
+    def _full_fetch(self, key: Tuple[str, str], limit: int,
+                    deadline: Optional[float] = None) -> Optional[Candles]:
+        candles = self.data.get_klines(key[0], key[1], limit, deadline=deadline)
+        if not candles:
+            return None
+        with self._lock:
+            self._series[key] = candles
+            self._updated_at[key] = self._clock()
+        return candles
+    
+    def get(self, symbol: str, interval: str, limit: int,
+            deadline: Optional[float] = None) -> Optional[Candles]:
+        """
+        Devuelve las últimas `limit` velas, descargando solo el delta.
+        
+        La red se usa fuera del lock (no bloquea a otros hilos ni a apply()
+        desde el loop del stream); el resultado se fusiona bajo el lock.
+        """
+        key = (symbol, interval)
+        with self._lock:
+            series = self._series.get(key)
+        if series is None or len(series) < limit:
+            return self._full_fetch(key, limit, deadline)
+        
+        delta = self.data.get_klines(symbol, interval, self.DELTA_LIMIT,
+                                     start_time=series.timestamp[-1], deadline=deadline)
+        if not delta:
+            # La vela en formación de la cache está atrasada: vale como mucho un intervalo
+            with self._lock:
+                age = self._clock() - self._updated_at.get(key, float('-inf'))
+            if age >= DataEngine.INTERVAL_MS[interval] / 1000:
+                LOG.warning("Delta de velas %s %s fallido y cache de hace %.0fs: sin datos",
+                            symbol, interval, age)
+                return None
+            LOG.warning("Delta de velas %s %s fallido: sirviendo cache de hace %.0fs",
+                        symbol, interval, age)
+            return series[-limit:]
+        
+        # Hueco mayor que el delta (p.ej. tras una caída larga) -> recarga completa
+        if len(delta) >= self.DELTA_LIMIT:
+            return self._full_fetch(key, limit, deadline)
+        
+        with self._lock:
+            current = self._series.get(key, series)
+            # Si mientras tanto el stream u otro hilo avanzó la serie, se conserva
+            if current.timestamp[-1] <= delta.timestamp[-1]:
+                current = self._merge(current, delta, max(self.capacity, len(current)))
+                self._series[key] = current
+            self._updated_at[key] = self._clock()
+            return current[-limit:]
+    
+    @staticmethod
+    def _merge(series: Candles, delta: Candles, capacity: int) -> Candles:
+        """Reemplaza la vela en formación, añade las nuevas y recorta al anillo."""
+        keep = series.index_of(delta.timestamp[0])
+        start = max(0, keep + len(delta) - capacity)
+        return Candles.concat([series[start:keep], delta])
+    
+    def apply(self, symbol: str, interval: str, candle: Dict):
+        """Aplica una vela recibida por stream (reemplaza la vela en formación)."""
+        key = (symbol, interval)
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series[key] = self._merge(series, Candles.from_dicts([candle]),
+                                                max(self.capacity, len(series)))
+                self._updated_at[key] = self._clock()
+    
+    def snapshot(self, symbol: str, interval: str, limit: int) -> Optional[Candles]:
+        """Últimas `limit` velas en memoria, sin red. None si no hay suficientes."""
+        with self._lock:
+            series = self._series.get((symbol, interval))
+            if series is None or len(series) < limit:
+                return None
+            return series[-limit:]
+    
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._updated_at.clear()
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🗄️  SECCIÓN 2.2: HISTÓRICO LOCAL DE VELAS (NUEVO v1.4)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class KlineStore:
+    """
+    Histórico de velas en disco: un archivo binario append-only por serie.
+    
+    Registros de ancho fijo (56 bytes, little-endian):
+        open_time:int64 | open | high | low | close | volume :float64 | close_time:int64
+    
+    Ordenados por open_time, por lo que se indexan con búsqueda binaria. La
+    lectura mapea el archivo con mmap y devuelve Candles cuyas columnas son
+    vistas con stride sobre el propio archivo (sin copiar). El mapa se
+    reutiliza entre lecturas y se libera con close() (o usando el store
+    como context manager); las velas leídas no deben usarse después.
+    En hosts big-endian las columnas se decodifican a arrays (copia).
+    """
+    
+    RECORD = struct.Struct('<q5dq')
+    FIELDS = 7                  # RECORD.size // 8
+    CHUNK_CANDLES = 1000        # limit=1000 -> peso 5 (mejor ratio peso/vela)
+    
+    def __init__(self, symbol: str, interval: str, directory: Optional[str] = None,
+                 path: Optional[str] = None):
+        self.symbol = symbol
+        self.interval = interval
+        self.interval_ms = DataEngine.INTERVAL_MS[interval]
+        self.directory = directory or (os.path.dirname(path) if path else CONFIG.HISTORY_DIR)
+        self.path = path or os.path.join(self.directory, f"{symbol}_{interval}.bin")
+        self._lock = threading.Lock()
+        self._maps: List[mmap.mmap] = []        # El último cubre el archivo actual
+        self._mapped_count = 0
+    
+    def __enter__(self) -> 'KlineStore':
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Libera los mapas; si aún hay vistas vivas se liberan al recolectarlas."""
+        with self._lock:
+            for mm in self._maps:
+                try:
+                    mm.close()
+                except BufferError:
+                    pass
+            self._maps = []
+            self._mapped_count = 0
+    
+    def __len__(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) // self.RECORD.size
+    
+    def last_open_time(self) -> Optional[int]:
+        count = len(self)
+        if count == 0:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek((count - 1) * self.RECORD.size)
+            return self.RECORD.unpack(f.read(self.RECORD.size))[0]
+    
+    def append(self, candles: Candles) -> int:
+        """Añade velas posteriores a la última guardada. Devuelve cuántas añadió."""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            last = self.last_open_time()
+            start = 0 if last is None else candles.index_of(last + 1)
+            if start >= len(candles):
+                return 0
+            
+            pack = self.RECORD.pack
+            rows = zip(candles.timestamp[start:], candles.open[start:], candles.high[start:],
+                       candles.low[start:], candles.close[start:], candles.volume[start:],
+                       candles.close_time[start:])
+            buf = b''.join(pack(*row) for row in rows)
+            
+            with open(self.path, 'ab') as f:
+                # Descartar un registro parcial de una escritura interrumpida
+                f.truncate(len(self) * self.RECORD.size)
+                f.write(buf)
+            return len(candles) - start
+    
+    def read(self, start_time: Optional[int] = None, end_time: Optional[int] = None) -> Candles:
+        """Velas con start_time <= open_time < end_time, como vistas sobre el mmap."""
+        count = len(self)
+        if count == 0:
+            return Candles.from_binance([])
+        
+        with self._lock:
+            if count != self._mapped_count:
+                # El archivo creció (append/backfill): un mapa nuevo; los anteriores
+                # siguen vivos para las velas ya entregadas hasta close()
+                with open(self.path, 'rb') as f:
+                    self._maps.append(mmap.mmap(f.fileno(), count * self.RECORD.size,
+                                                access=mmap.ACCESS_READ))
+                self._mapped_count = count
+            raw = memoryview(self._maps[-1])[:count * self.RECORD.size]
+        
+        n = self.FIELDS
+        if sys.byteorder == 'little':
+            as_int = raw.cast('q')
+            as_float = raw.cast('d')
+            candles = Candles(as_int[0::n], as_float[1::n], as_float[2::n], as_float[3::n],
+                              as_float[4::n], as_float[5::n], as_int[6::n])
+        else:
+            # El archivo es little-endian ('<'): decodificar y voltear bytes
+            columns = []
+            for k, code in enumerate(Candles.TYPECODES):
+                column = array(code, raw.cast(code)[k::n])
+                column.byteswap()
+                columns.append(column)
+            candles = Candles(*columns)
+        
+        lo = 0 if start_time is None else candles.index_of(start_time)
+        hi = count if end_time is None else candles.index_of(end_time)
+        return candles[lo:hi]
+    
+    def backfill(self, days: int, workers: int = 4) -> int:
+        """
+        Descarga el histórico faltante paginando /klines con startTime.
+        
+        Los bloques se piden en paralelo con prioridad LOW (el WeightScheduler
+        los frena antes que a las velas en vivo) y se escriben en orden. Un
+        bloque vacío (p.ej. mantenimiento del exchange) se salta; si un bloque
+        falla se detiene ahí y la siguiente ejecución continúa.
+        """
+        now_ms = int(time.time() * 1000)
+        end = now_ms - now_ms % self.interval_ms      # Excluir la vela en formación
+        last = self.last_open_time()
+        start = last + self.interval_ms if last is not None else end - days * 86_400_000
+        if start >= end:
+            return 0
+        
+        chunk_ms = self.CHUNK_CANDLES * self.interval_ms
+        starts = list(range(start, end, chunk_ms))
+        
+        def fetch(chunk_start: int) -> Optional[Candles]:
+            candles = DataEngine.get_klines(self.symbol, self.interval, self.CHUNK_CANDLES,
+                                            start_time=chunk_start, priority=RequestPriority.LOW)
+            if candles is None:
+                return None
+            return candles[:candles.index_of(min(chunk_start + chunk_ms, end))]
+        
+        added = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as executor:
+            for i, candles in enumerate(executor.map(fetch, starts)):
+                if candles is None:
+                    LOG.warning("Backfill interrumpido en bloque %d/%d", i + 1, len(starts))
+                    break
+                if not len(candles):
+                    LOG.info("Backfill %s %s: bloque %d/%d sin velas (hueco), se salta",
+                             self.symbol, self.interval, i + 1, len(starts))
+                    continue
+                added += self.append(candles)
+                LOG.info("Backfill %s %s: bloque %d/%d (+%d)", self.symbol, self.interval, i + 1, len(starts), len(candles))
+        return added
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📡  SECCIÓN 2.1: STREAM WEBSOCKET DE MERCADO (NUEVO v1.4)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class WebSocketClient:
+    """Cliente WebSocket mínimo (RFC 6455) sobre asyncio, solo stdlib."""
+    
+    GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+    
+    OP_CONT = 0x0
+    OP_TEXT = 0x1
+    OP_BINARY = 0x2
+    OP_CLOSE = 0x8
+    OP_PING = 0x9
+    OP_PONG = 0xA
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+        self.last_pong = time.monotonic()
+    
+    @staticmethod
+    def accept_key(key: str) -> str:
+        return base64.b64encode(hashlib.sha1((key + WebSocketClient.GUID).encode()).digest()).decode()
+    
+    @classmethod
+    async def connect(cls, url: str, timeout: float = 10) -> 'WebSocketClient':
+        """Abre la conexión TCP/TLS y realiza el handshake HTTP Upgrade."""
+        parts = urllib.parse.urlsplit(url)
+        secure = parts.scheme == 'wss'
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl.create_default_context() if secure else None),
+            timeout
+        )
+        
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            f"Upgrade: websocket\r\n"
+            f"Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            f"Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        await writer.drain()
+        
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        if b' 101 ' not in status_line or headers.get('sec-websocket-accept') != cls.accept_key(key):
+            writer.close()
+            raise ConnectionError(f"Handshake WebSocket rechazado: {status_line.decode('latin-1').strip()}")
+        
+        return cls(reader, writer)
+    
+    @staticmethod
+    def _mask(data: bytes, key: bytes) -> bytes:
+        """XOR del payload con la máscara de 4 bytes."""
+        n = len(data)
+        if n == 0:
+            return b''
+        mask = (key * (n // 4 + 1))[:n]
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(mask, 'big')).to_bytes(n, 'big')
+    
+    @staticmethod
+    def encode_frame(opcode: int, payload: bytes, mask: bool = True) -> bytes:
+        """Codifica un frame final (FIN=1). Los clientes DEBEN enmascarar."""
+        header = bytearray([0x80 | opcode])
+        mask_bit = 0x80 if mask else 0
+        n = len(payload)
+        if n < 126:
+            header.append(mask_bit | n)
+        elif n < 65536:
+            header.append(mask_bit | 126)
+            header += struct.pack('!H', n)
+        else:
+            header.append(mask_bit | 127)
+            header += struct.pack('!Q', n)
+        if mask:
+            key = os.urandom(4)
+            header += key
+            payload = WebSocketClient._mask(payload, key)
+        return bytes(header) + payload
+    
+    @staticmethod
+    async def read_frame(reader: asyncio.StreamReader) -> Tuple[bool, int, bytes]:
+        """Lee un frame. Returns: (fin, opcode, payload)"""
+        b1, b2 = await reader.readexactly(2)
+        n = b2 & 0x7F
+        if n == 126:
+            n = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack('!Q', await reader.readexactly(8))[0]
+        key = await reader.readexactly(4) if b2 & 0x80 else None
+        payload = await reader.readexactly(n)
+        if key:
+            payload = WebSocketClient._mask(payload, key)
+        return bool(b1 & 0x80), b1 & 0x0F, payload
+    
+    async def _send(self, opcode: int, payload: bytes = b''):
+        self.writer.write(self.encode_frame(opcode, payload))
+        await self.writer.drain()
+    
+    async def send_text(self, text: str):
+        await self._send(self.OP_TEXT, text.encode('utf-8'))
+    
+    async def ping(self, payload: bytes = b''):
+        await self._send(self.OP_PING, payload)
+    
+    async def recv(self) -> Optional[str]:
+        """
+        Siguiente mensaje de datos (reensambla fragmentos).
+        
+        Responde PING con PONG de forma transparente. Devuelve None si el
+        servidor cerró la conexión.
+        """
+        fragments: List[bytes] = []
+        while True:
+            fin, opcode, payload = await self.read_frame(self.reader)
+            
+            if opcode == self.OP_PING:
+                await self._send(self.OP_PONG, payload)
+                continue
+            if opcode == self.OP_PONG:
+                self.last_pong = time.monotonic()
+                continue
+            if opcode == self.OP_CLOSE:
+                if not self.closed:
+                    self.closed = True
+                    try:
+                        await self._send(self.OP_CLOSE, payload[:2])
+                    except Exception:
+                        pass
+                return None
+            
+            if opcode in (self.OP_TEXT, self.OP_BINARY):
+                fragments = [payload]
+            else:
+                fragments.append(payload)
+            
+            if fin:
+                return b''.join(fragments).decode('utf-8')
+    
+    async def close(self, code: int = 1000):
+        if not self.closed:
+            self.closed = True
+            try:
+                await self._send(self.OP_CLOSE, struct.pack('!H', code))
+            except Exception:
+                pass
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+
+class BinanceMarketStream:
+    """
+    Stream push de Binance Futures: kline_15m, kline_1h y markPrice@1s.
+    
+    Corre en un thread propio con su event loop. Mantiene KlineCache y el
+    mark price al día, reconecta automáticamente con backoff y rellena por
+    REST las velas perdidas durante la desconexión.
+    """
+    
+    BASE_URL = "wss://fstream.binance.com"
+    STALE_AFTER = 10.0          # Sin mensajes en 10s -> conexión muerta
+    PING_INTERVAL = 30.0
+    MAX_BACKOFF = 30.0
+    MIN_CYCLE_SEC = 1.0         # Mínimo entre ciclos de análisis push
+    GAP_FILL_LIMITS = {'15m': 50, '1h': 250}
+    
+    def __init__(self, cache: KlineCache, symbol: str, intervals: List[str], url: Optional[str] = None):
+        self.cache = cache
+        self.symbol = symbol
+        self.intervals = intervals
+        streams = [f"{symbol.lower()}@kline_{i}" for i in intervals] + [f"{symbol.lower()}@markPrice@1s"]
+        self.url = url or f"{self.BASE_URL}/stream?streams={'/'.join(streams)}"
+        
+        self.mark_price: Optional[float] = None
+        self.index_price: Optional[float] = None
+        self.funding_rate: Optional[float] = None
+        self.connected = False
+        self.reconnects = 0
+        self.last_message = 0.0
+        
+        self._updated = threading.Event()
+        self._stop = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    # ─── API pública (thread-safe) ─────────────────────────────────────────
+    
+    def start(self) -> 'BinanceMarketStream':
+        self._thread = threading.Thread(target=self._thread_main, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout: float = 5.0):
+        self._stop = True
+        if self._loop and self._task:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def is_live(self) -> bool:
+        """True si el stream está conectado y recibiendo datos frescos."""
+        return (self.connected and self.mark_price is not None
+                and time.monotonic() - self.last_message < self.STALE_AFTER)
+    
+    def wait_for_update(self, timeout: float) -> bool:
+        """Bloquea hasta el próximo mensaje (o timeout)."""
+        updated = self._updated.wait(timeout)
+        self._updated.clear()
+        return updated
+    
+    # ─── Internos (thread del stream) ──────────────────────────────────────
+    
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._run())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+    
+    def _gap_fill(self):
+        """Rellena por REST las velas perdidas (delta desde la última conocida)."""
+        for interval in self.intervals:
+            self.cache.get(self.symbol, interval, self.GAP_FILL_LIMITS.get(interval, 50))
+    
+    async def _keepalive(self, ws: WebSocketClient):
+        while True:
+            await asyncio.sleep(self.PING_INTERVAL)
+            await ws.ping()
+    
+    async def _run(self):
+        backoff = 1.0
+        loop = asyncio.get_running_loop()
+        
+        while not self._stop:
+            try:
+                ws = await WebSocketClient.connect(self.url)
+            except Exception as e:
+                LOG.warning("WebSocket: conexión fallida (%s). Reintento en %.0fs", e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.MAX_BACKOFF)
+                continue
+            
+            backoff = 1.0
+            keepalive = None
+            LOG.info("WebSocket conectado: %s", self.url[:60])
+            try:
+                await loop.run_in_executor(None, self._gap_fill)
+                self.connected = True
+                self.last_message = time.monotonic()
+                keepalive = loop.create_task(self._keepalive(ws))
+                
+                while not self._stop:
+                    message = await asyncio.wait_for(ws.recv(), timeout=self.STALE_AFTER)
+                    if message is None:
+                        LOG.warning("WebSocket cerrado por el servidor")
+                        break
+                    try:
+                        self._handle(message)
+                    except Exception:
+                        # Payload inesperado (frame de error, cambio de esquema):
+                        # se descarta sin matar el stream
+                        LOG.exception("WebSocket: mensaje descartado: %s", message[:200])
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+                LOG.warning("WebSocket desconectado: %s", e or type(e).__name__)
+            finally:
+                self.connected = False
+                if keepalive:
+                    keepalive.cancel()
+                await ws.close()
+            
+            if not self._stop:
+                self.reconnects += 1
+    
+    def _handle(self, message: str):
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            return
+        data = payload.get('data', payload)
+        event = data.get('e')
+        
+        if event == 'kline':
+            k = data['k']
+            self.cache.apply(self.symbol, k['i'], {
+                'timestamp': k['t'],
+                'open': float(k['o']),
+                'high': float(k['h']),
+                'low': float(k['l']),
+                'close': float(k['c']),
+                'volume': float(k['v']),
+                'close_time': k['T']
+            })
+        elif event == 'markPriceUpdate':
+            self.mark_price = float(data['p'])
+            if data.get('i'):
+                self.index_price = float(data['i'])
+            if data.get('r'):
+                self.funding_rate = float(data['r']) * 100
+        else:
+            return
+        
+        self.last_message = time.monotonic()
+        self._updated.set()
+
 # ══════════════════════════════════════════════════════════════════════════════
 # 🔊  SECCIÓN 2.5: GESTORES DE SONIDO Y NOTIFICACIONES (NUEVO v1.1)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -341,10 +1729,14 @@ class NotificationManager:
                     
                 data = json.dumps(payload).encode('utf-8')
                 
-                req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
-                urllib.request.urlopen(req, timeout=5)
+                status, _, _ = DataEngine.POOL.request(url, method='POST', body=data,
+                                                       headers={'Content-Type': 'application/json'}, timeout=5)
+                if status >= 400:
+                    LOG.warning("Telegram: HTTP %d al enviar mensaje", status)
+                else:
+                    LOG.debug("Telegram: mensaje enviado", extra={'sample_key': 'telegram'})
             except Exception as e:
-                pass
+                LOG.warning("Telegram: envío fallido: %s", e)
         
         threading.Thread(target=_send, daemon=True).start()
 
@@ -402,11 +1794,70 @@ class NotificationManager:
 # 📊  SECCIÓN 3: INDICADORES TÉCNICOS
 # ══════════════════════════════════════════════════════════════════════════════
 
+class IndicatorMemo:
+    """
+    Memo LRU acotado para indicadores sobre velas cerradas (NUEVO v1.4).
+    
+    Una serie de velas no se modifica una vez construida, así que su valor
+    se calcula una sola vez. La clave incluye la identidad del objeto de
+    datos, no sus timestamps: datos corregidos o re-descargados con los
+    mismos timestamps son otro objeto y no reciben un valor obsoleto.
+    """
+    
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Tuple, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any], data: Any = None) -> Any:
+        """
+        Valor memoizado de `key`. Con `data` la clave incluye id(data) y la
+        entrada guarda una referencia, para que ese id no se reutilice
+        mientras siga en el memo.
+        """
+        if data is not None:
+            key = key + (id(data),)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][1]
+            self.misses += 1
+        
+        value = compute()
+        
+        with self._lock:
+            self._entries[key] = (data, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
 class Indicators:
     """Calculadora de indicadores técnicos con precisión validada."""
     
+    MEMO = IndicatorMemo()
+    
     @staticmethod
-    def rsi(candles: List[Dict], period: int = 21) -> Optional[float]:
+    def _closes(candles: Union[Candles, List[Dict]]):
+        """Columna de cierres: vista directa si es Candles, lista si son dicts."""
+        if isinstance(candles, Candles):
+            return candles.close
+        return [c['close'] for c in candles]
+    
+    @staticmethod
+    def rsi(candles: Union[Candles, List[Dict]], period: int = 21) -> Optional[float]:
         """
         RSI con período validado.
         
@@ -416,7 +1867,7 @@ class Indicators:
         if len(candles) < period + 1:
             return None
         
-        closes = [c['close'] for c in candles]
+        closes = Indicators._closes(candles)
         deltas = [closes[i] - closes[i-1] for i in range(1, len(closes))]
         
         gains = [d if d > 0 else 0 for d in deltas]
@@ -441,12 +1892,12 @@ class Indicators:
         return None
     
     @staticmethod
-    def ema(candles: List[Dict], period: int) -> Optional[float]:
+    def ema(candles: Union[Candles, List[Dict]], period: int) -> Optional[float]:
         """Exponential Moving Average."""
         if len(candles) < period:
             return None
         
-        closes = [c['close'] for c in candles]
+        closes = Indicators._closes(candles)
         multiplier = 2 / (period + 1)
         
         # SMA inicial
@@ -459,42 +1910,414 @@ class Indicators:
         return round(ema_value, 2)
     
     @staticmethod
-    def rsi_history(candles: List[Dict], period: int = 21, lookback: int = 10) -> List[float]:
+    def rsi_series(candles: Union[Candles, List[Dict]], period: int = 21,
+                   use_numpy: bool = HAS_NUMPY) -> List[Optional[float]]:
+        """
+        Serie completa de RSI en una sola pasada (NUEVO v1.4).
+        
+        Alineada con las velas: None en el calentamiento (índices < period);
+        el valor i es idéntico a Indicators.rsi(candles[:i+1]). Con NumPy se
+        vectorizan deltas y la fórmula final; el suavizado de Wilder es una
+        recursión y sigue siendo secuencial, por eso el resultado es el mismo.
+        """
+        n = len(candles)
+        series: List[Optional[float]] = [None] * n
+        if n < period + 1:
+            return series
+        
+        closes = Indicators._closes(candles)
+        if use_numpy and np is not None:
+            deltas = np.diff(np.asarray(closes, dtype=np.float64))
+            gains = np.where(deltas > 0, deltas, 0.0).tolist()
+            losses = np.where(deltas < 0, -deltas, 0.0).tolist()
+        else:
+            deltas = [closes[i] - closes[i-1] for i in range(1, n)]
+            gains = [d if d > 0 else 0 for d in deltas]
+            losses = [-d if d < 0 else 0 for d in deltas]
+        
+        # Medias de Wilder tras cada delta (misma aritmética que rsi())
+        avg_gain = sum(gains[:period]) / period
+        avg_loss = sum(losses[:period]) / period
+        avg_gains = [avg_gain]
+        avg_losses = [avg_loss]
+        for i in range(period, len(gains)):
+            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+            avg_gains.append(avg_gain)
+            avg_losses.append(avg_loss)
+        
+        if use_numpy and np is not None:
+            ag = np.array(avg_gains)
+            al = np.array(avg_losses)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = 100 - (100 / (1 + ag / al))
+            values[al == 0] = 100.0
+            series[period:] = values.tolist()
+        else:
+            series[period:] = [100.0 if al == 0 else 100 - (100 / (1 + ag / al))
+                               for ag, al in zip(avg_gains, avg_losses)]
+        return series
+    
+    @staticmethod
+    def ema_series(candles: Union[Candles, List[Dict]], period: int) -> List[Optional[float]]:
+        """
+        Serie completa de EMA en una sola pasada (NUEVO v1.4).
+        
+        Alineada con las velas: None para índices < period - 1; el valor i es
+        idéntico a Indicators.ema(candles[:i+1]) (redondeado a 2 decimales).
+        La recursión es secuencial, así que no hay ruta NumPy.
+        """
+        n = len(candles)
+        series: List[Optional[float]] = [None] * n
+        if n < period:
+            return series
+        
+        closes = Indicators._closes(candles)
+        multiplier = 2 / (period + 1)
+        
+        ema_value = sum(closes[:period]) / period
+        series[period - 1] = round(ema_value, 2)
+        for i in range(period, n):
+            ema_value = (closes[i] - ema_value) * multiplier + ema_value
+            series[i] = round(ema_value, 2)
+        return series
+    
+    @staticmethod
+    def closed(kind: str, symbol: str, interval: str,
+               candles: Union[Candles, List[Dict]], period: int) -> Any:
+        """
+        Indicador memoizado sobre velas CERRADAS (NUEVO v1.4).
+        
+        kind: 'rsi', 'ema', 'rsi_series' o 'ema_series'. La clave es
+        (symbol, interval, período) y la identidad de `candles`: el mismo
+        objeto de velas da el mismo valor. Las series se devuelven como tupla
+        para que nadie mute el valor compartido.
+        """
+        if not len(candles):
+            return None
+        key = (kind, symbol, interval, period)
+        compute = getattr(Indicators, kind)
+        if kind.endswith('_series'):
+            return Indicators.MEMO.get_or_compute(key, lambda: tuple(compute(candles, period)), candles)
+        return Indicators.MEMO.get_or_compute(key, lambda: compute(candles, period), candles)
+    
+    @staticmethod
+    def rsi_history(candles: Union[Candles, List[Dict]], period: int = 21, lookback: int = 10) -> List[float]:
         """Obtiene historial de RSI para detectar cruces."""
         if len(candles) < period + lookback:
             return []
         
-        rsi_values = []
-        for i in range(lookback):
-            end_idx = len(candles) - lookback + i + 1
-            subset = candles[:end_idx]
-            rsi = Indicators.rsi(subset, period)
-            if rsi is not None:
-                rsi_values.append(rsi)
+        # v1.4: Una sola pasada en lugar de recalcular cada prefijo
+        return Indicators.rsi_series(candles, period)[-lookback:]
+    
+    RESYNC_EVERY = 1024     # Recalcular exacto cada N velas (acota la deriva float)
+    
+    @staticmethod
+    def rsi_window_series(candles: Union[Candles, List[Dict]], period: int = 21,
+                          window: int = 50) -> List[Optional[float]]:
+        """
+        RSI de cada vela calculado solo sobre las `window` velas que terminan
+        en ella: valor[i] == rsi(candles[i-window+1:i+1]) (NUEVO v1.4).
+        
+        Es el RSI del modo en vivo (ventana fija de velas, siembra SMA al
+        inicio de la ventana). Con ventana fija el Wilder es un filtro finito:
+        suma de siembra y suma exponencial se deslizan en O(1) por vela y se
+        recalculan exactas cada RESYNC_EVERY velas (error ~1e-12).
+        """
+        closes = Indicators._closes(candles)
+        n = len(closes)
+        out: List[Optional[float]] = [None] * n
+        deltas = window - 1
+        steps = deltas - period             # Pasos de Wilder tras la siembra
+        if steps < 0 or n < window:
+            return out
+        
+        gains = [0.0] * n
+        losses = [0.0] * n
+        for k in range(1, n):
+            d = closes[k] - closes[k - 1]
+            if d > 0:
+                gains[k] = d
+            elif d < 0:
+                losses[k] = -d
+        
+        r = (period - 1) / period
+        decay = r ** steps
+        for i in range(deltas, n):
+            first = i - deltas + 1          # Primer delta de la ventana
+            if (i - deltas) % Indicators.RESYNC_EVERY == 0:
+                seed_gain = sum(gains[first:first + period])
+                seed_loss = sum(losses[first:first + period])
+                exp_gain = exp_loss = 0.0
+                for k in range(first + period, i + 1):
+                    exp_gain = exp_gain * r + gains[k]
+                    exp_loss = exp_loss * r + losses[k]
+                loss_count = sum(1 for k in range(first, i + 1) if losses[k] > 0)
+            else:
+                seed_gain += gains[first + period - 1] - gains[first - 1]
+                seed_loss += losses[first + period - 1] - losses[first - 1]
+                exp_gain = exp_gain * r + gains[i] - decay * gains[i - steps]
+                exp_loss = exp_loss * r + losses[i] - decay * losses[i - steps]
+                loss_count += (losses[i] > 0) - (losses[first - 1] > 0)
+            
+            if loss_count == 0:
+                out[i] = 100.0
+                continue
+            # avg = (r^steps * siembra + suma exponencial) / period; period se cancela
+            rs = (decay * seed_gain + exp_gain) / (decay * seed_loss + exp_loss)
+            out[i] = 100 - (100 / (1 + rs))
+        return out
+    
+    @staticmethod
+    def ema_window_series(closes: List[float], period: int = 200, window: int = 249) -> List[Optional[float]]:
+        """
+        EMA (sin redondear) de cada posición calculada solo sobre los `window`
+        cierres que terminan en ella: valor[i] ==
+        EMAState.from_candles(velas[i-window+1:i+1], period).value (NUEVO v1.4).
+        
+        Misma técnica que rsi_window_series: la SMA de siembra y la suma
+        exponencial de los pasos posteriores se deslizan en O(1) y se
+        recalculan exactas cada RESYNC_EVERY posiciones.
+        """
+        n = len(closes)
+        out: List[Optional[float]] = [None] * n
+        steps = window - period             # Pasos de EMA tras la siembra
+        if steps < 0 or n < window:
+            return out
+        
+        alpha = 2 / (period + 1)
+        b = 1 - alpha
+        decay = b ** steps
+        for i in range(window - 1, n):
+            first = i - window + 1
+            if (i - window + 1) % Indicators.RESYNC_EVERY == 0:
+                seed = sum(closes[first:first + period])
+                expo = 0.0
+                for k in range(first + period, i + 1):
+                    expo = expo * b + alpha * closes[k]
+            else:
+                seed += closes[first + period - 1] - closes[first - 1]
+                expo = expo * b + alpha * (closes[i] - decay * closes[i - steps])
+            out[i] = decay * seed / period + expo
+        return out
+
+class RSIState:
+    """
+    Estado incremental del RSI de Wilder (NUEVO v1.4).
+    
+    Se siembra una vez con el histórico (misma aritmética que Indicators.rsi,
+    resultado idéntico) y luego avanza en O(1) con cada vela cerrada. peek()
+    da el valor provisional de la vela en formación sin modificar el estado.
+    """
+    
+    __slots__ = ('period', 'avg_gain', 'avg_loss', 'last_close', 'last_timestamp')
+    
+    def __init__(self, period: int, avg_gain: float, avg_loss: float,
+                 last_close: float, last_timestamp: Optional[int] = None):
+        self.period = period
+        self.avg_gain = avg_gain
+        self.avg_loss = avg_loss
+        self.last_close = last_close
+        self.last_timestamp = last_timestamp
+    
+    @classmethod
+    def from_candles(cls, candles: Union[Candles, List[Dict]], period: int = 21) -> Optional['RSIState']:
+        """Siembra con todas las velas dadas (deben estar cerradas)."""
+        if len(candles) < period + 1:
+            return None
+        closes = Indicators._closes(candles)
+        
+        avg_gain = 0
+        avg_loss = 0
+        for i in range(1, period + 1):
+            d = closes[i] - closes[i - 1]
+            avg_gain += d if d > 0 else 0
+            avg_loss += -d if d < 0 else 0
+        state = cls(period, avg_gain / period, avg_loss / period, closes[period])
+        
+        for i in range(period + 1, len(closes)):
+            state.update(closes[i])
+        
+        last = candles[-1]
+        state.last_timestamp = last['timestamp']
+        return state
+    
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+    
+    def update(self, close: float, timestamp: Optional[int] = None):
+        """Incorpora una vela cerrada (O(1))."""
+        d = close - self.last_close
+        period = self.period
+        self.avg_gain = (self.avg_gain * (period - 1) + (d if d > 0 else 0)) / period
+        self.avg_loss = (self.avg_loss * (period - 1) + (-d if d < 0 else 0)) / period
+        self.last_close = close
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+    
+    def value(self) -> float:
+        """RSI al cierre de la última vela incorporada."""
+        return self._rsi(self.avg_gain, self.avg_loss)
+    
+    def peek(self, close: float) -> float:
+        """RSI provisional si la vela en formación cerrara en `close` (sin mutar)."""
+        d = close - self.last_close
+        period = self.period
+        avg_gain = (self.avg_gain * (period - 1) + (d if d > 0 else 0)) / period
+        avg_loss = (self.avg_loss * (period - 1) + (-d if d < 0 else 0)) / period
+        return self._rsi(avg_gain, avg_loss)
+    
+    def price_at(self, level: float) -> Optional[float]:
+        """
+        Cierre de la vela en formación con el que el RSI valdría exactamente `level`.
+        
+        Inversa cerrada de peek(): con t = level / (100 - level) y n = period,
+        subir g desde last_close exige g = t·L·(n-1) - A·(n-1); bajar l exige
+        l = A·(n-1)/t - L·(n-1). peek() es monótono en el precio, así que
+        cruzar el nivel equivale a cruzar este precio. None si es inalcanzable.
+        """
+        if not 0 < level < 100:
+            return None
+        n1 = self.period - 1
+        t = level / (100 - level)
+        current = self.peek(self.last_close)
         
-        return rsi_values
+        if level > current:
+            price = self.last_close + (t * self.avg_loss * n1 - self.avg_gain * n1)
+        elif level < current:
+            price = self.last_close - (self.avg_gain * n1 / t - self.avg_loss * n1)
+        else:
+            price = self.last_close
+        return price if price > 0 else None
+
+class EMAState:
+    """
+    Estado incremental de la EMA persistido en disco (NUEVO v1.4).
+    
+    Avanza una vez por vela cerrada; peek() da el valor provisional con el
+    precio actual (equivale a la vela en formación). Se guarda en JSON para
+    que un reinicio no tenga que volver a sembrar.
+    """
+    
+    __slots__ = ('period', 'value', 'last_timestamp')
+    
+    def __init__(self, period: int, value: float, last_timestamp: int):
+        self.period = period
+        self.value = value
+        self.last_timestamp = last_timestamp
+    
+    @classmethod
+    def from_candles(cls, candles: Union[Candles, List[Dict]], period: int) -> Optional['EMAState']:
+        """Siembra con SMA + EMA iterativa (misma aritmética que Indicators.ema)."""
+        if len(candles) < period:
+            return None
+        closes = Indicators._closes(candles)
+        state = cls(period, sum(closes[:period]) / period, candles[period - 1]['timestamp'])
+        for i in range(period, len(closes)):
+            state.update(closes[i])
+        state.last_timestamp = candles[-1]['timestamp']
+        return state
+    
+    def update(self, close: float, timestamp: Optional[int] = None):
+        """Incorpora una vela cerrada (O(1))."""
+        self.value = (close - self.value) * (2 / (self.period + 1)) + self.value
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+    
+    def peek(self, price: float) -> float:
+        """EMA provisional si la vela en formación cerrara en `price` (sin mutar)."""
+        return round((price - self.value) * (2 / (self.period + 1)) + self.value, 2)
+    
+    def save(self, path: str):
+        """Escritura atómica (tmp + rename) para no dejar JSON truncado."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'period': self.period, 'value': self.value,
+                       'last_timestamp': self.last_timestamp}, f)
+        os.replace(tmp, path)
+    
+    @classmethod
+    def load(cls, path: str, period: int) -> Optional['EMAState']:
+        """Carga el estado si existe y corresponde al mismo período."""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data['period'] != period:
+                return None
+            return cls(period, float(data['value']), int(data['last_timestamp']))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
 
 # ══════════════════════════════════════════════════════════════════════════════
 # ⏰  SECCIÓN 4: GESTIÓN DE TIEMPO Y SESIONES
 # ══════════════════════════════════════════════════════════════════════════════
 
+class SystemClock:
+    """Reloj real: time.time / time.sleep / datetime.now (NUEVO v1.4)."""
+    
+    def time(self) -> float:
+        return time.time()
+    
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+    
+    def now(self) -> datetime:
+        return datetime.now(CONFIG.USER_TZ)
+
+class ReplayFinished(Exception):
+    """El reloj virtual llegó al final de los datos grabados."""
+
+class VirtualClock(SystemClock):
+    """
+    Reloj virtual para replay (NUEVO v1.4).
+    
+    sleep() avanza el tiempo al instante en lugar de bloquear; al pasar de
+    `end` lanza ReplayFinished para cortar el bucle infinito del modo nube.
+    """
+    
+    def __init__(self, start: float, end: Optional[float] = None):
+        self._now = start
+        self.end = end
+        self._lock = threading.Lock()
+    
+    def time(self) -> float:
+        with self._lock:
+            return self._now
+    
+    def sleep(self, seconds: float):
+        with self._lock:
+            self._now += max(0.0, seconds)
+            finished = self.end is not None and self._now > self.end
+        if finished:
+            raise ReplayFinished()
+    
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time(), CONFIG.USER_TZ)
+
 class SessionManager:
     """Gestiona horarios y calidad de sesiones para mean reversion."""
     
-    def __init__(self):
+    def __init__(self, clock: Optional[Callable[[], datetime]] = None):
         self.tz = CONFIG.USER_TZ
+        self.clock = clock      # Reloj inyectable para backtest/replay (v1.4)
     
     def now(self) -> datetime:
         """Hora actual en timezone del usuario."""
+        if self.clock is not None:
+            return self.clock()
         return datetime.now(self.tz)
     
-    def get_session_quality(self) -> Tuple[SessionQuality, str, str]:
+    def get_session_quality(self, when: Optional[datetime] = None) -> Tuple[SessionQuality, str, str]:
         """
-        Determina la calidad de la sesión actual para mean reversion.
+        Determina la calidad de la sesión actual (o de `when`) para mean reversion.
         
         Returns: (quality, message, recommendation)
         """
-        hour = self.now().hour
+        hour = (when or self.now()).hour
         
         # Sesión Asiática - ÓPTIMA
         if CONFIG.ASIA_START <= hour < CONFIG.ASIA_END:
@@ -550,14 +2373,14 @@ class SessionManager:
         
         return "En sesión óptima"
     
-    def can_trade_now(self, strict: bool = True) -> Tuple[bool, str]:
+    def can_trade_now(self, strict: bool = True, when: Optional[datetime] = None) -> Tuple[bool, str]:
         """
-        Verifica si se puede operar ahora.
+        Verifica si se puede operar ahora (o en `when`).
         
         Args:
             strict: Si True, solo permite en sesiones OPTIMAL/GOOD
         """
-        quality, msg, _ = self.get_session_quality()
+        quality, msg, _ = self.get_session_quality(when)
         
         if strict:
             if quality in [SessionQuality.OPTIMAL, SessionQuality.GOOD]:
@@ -583,19 +2406,198 @@ class SignalDetector:
     - Filtro EMA 200 H1 obligatorio
     """
     
-    def __init__(self):
+    CYCLE_DEADLINE_SEC = 15.0   # Tope de tiempo para los datos de un ciclo
+    RSI_SEED_CANDLES = 500      # Histórico para sembrar RSIState (CONFIG.RSI_CONVERGED)
+    EMA_SEED_CANDLES = 1000     # Histórico para sembrar EMAState (CONFIG.EMA_CONVERGED)
+    
+    def __init__(self, stream: Optional['BinanceMarketStream'] = None,
+                 clock: Optional[SystemClock] = None, data=None):
+        self.clock = clock or SystemClock()     # Inyectables para replay (v1.4)
+        self.data = data or DataEngine
+        self.cycles = 0
         self.last_signal_time: Optional[datetime] = None
         self.last_rsi: Optional[float] = None
         self.prev_rsi: Optional[float] = None  # Para crossover v1.2
         self.last_ema: Optional[float] = None
         self.last_price: Optional[float] = None
+        self.klines = KlineCache(data=self.data, clock=self.clock.time)    # Delta fetch de velas (NUEVO v1.4)
+        self.stream = stream        # Datos push por WebSocket (NUEVO v1.4)
+        self.rsi_state: Optional[RSIState] = None   # RSI incremental (NUEVO v1.4)
+        self._rsi_window_key: Optional[Tuple[int, int, int]] = None  # Ventana de rsi_state
+        self.ema_state: Optional[EMAState] = None   # EMA H1 incremental (NUEVO v1.4)
+        self._ema_window_key: Optional[Tuple[int, int]] = None  # Ventana de ema_state
+        self.ema_state_path: Optional[str] = os.path.join(
+            CONFIG.HISTORY_DIR, f"ema_{CONFIG.SYMBOL}_{CONFIG.EMA_TIMEFRAME}_{CONFIG.EMA_PERIOD}.json"
+        ) if data is None else None     # En replay no se persiste
+    
+    def _advance_ema_state(self, deadline: Optional[float] = None) -> Optional[EMAState]:
+        """
+        EMAState de las velas 1H cerradas. Mientras no cierre una vela nueva
+        no toca la red.
+        
+        Por defecto se reconstruye al cerrar cada vela sobre la ventana de
+        CONFIG.EMA_WINDOW velas (delta fetch vía KlineCache): con peek() del
+        cierre en formación es exactamente la EMA de v1.3. Con
+        CONFIG.EMA_CONVERGED se avanza en O(1) con el delta (startTime) y se
+        persiste; sin estado o con un hueco mayor que el delta vuelve a
+        sembrar con EMA_SEED_CANDLES velas.
+        """
+        interval_ms = DataEngine.INTERVAL_MS[CONFIG.EMA_TIMEFRAME]
+        now_ms = int(self.clock.time() * 1000)
+        
+        if not CONFIG.EMA_CONVERGED:
+            key = (CONFIG.EMA_WINDOW, CONFIG.EMA_PERIOD)
+            state = self.ema_state
+            # La vela siguiente a la última incorporada aún no ha cerrado
+            if state is not None and key == self._ema_window_key and now_ms < state.last_timestamp + 2 * interval_ms:
+                return state
+            candles_1h = self.klines.get(CONFIG.SYMBOL, CONFIG.EMA_TIMEFRAME, CONFIG.EMA_WINDOW, deadline)
+            if not candles_1h:
+                return None
+            state = EMAState.from_candles(candles_1h[-CONFIG.EMA_WINDOW:-1], CONFIG.EMA_PERIOD)
+            self.ema_state = state
+            self._ema_window_key = key if state is not None else None
+            return state
+        
+        if self._ema_window_key is not None:
+            self.ema_state = self._ema_window_key = None    # El estado de ventana no sirve aquí
+        state = self.ema_state
+        if state is None and self.ema_state_path:
+            state = EMAState.load(self.ema_state_path, CONFIG.EMA_PERIOD)
+        
+        # La vela siguiente a la última incorporada aún no ha cerrado
+        if state is not None and now_ms < state.last_timestamp + 2 * interval_ms:
+            self.ema_state = state
+            return state
+        
+        if state is not None and (now_ms - state.last_timestamp) // interval_ms < KlineCache.DELTA_LIMIT:
+            delta = self.data.get_klines(
+                CONFIG.SYMBOL, CONFIG.EMA_TIMEFRAME, KlineCache.DELTA_LIMIT,
+                start_time=state.last_timestamp + interval_ms, deadline=deadline
+            )
+            if not delta:
+                self.ema_state = state      # Se reintenta en el próximo ciclo
+                return state
+            if len(delta) and delta.timestamp[0] == state.last_timestamp + interval_ms:
+                for i in range(len(delta) - 1):     # La última está en formación
+                    state.update(delta.close[i], delta.timestamp[i])
+            else:
+                state = None
+        else:
+            state = None
+        
+        if state is None:
+            history = self.data.get_klines(
+                CONFIG.SYMBOL, CONFIG.EMA_TIMEFRAME, self.EMA_SEED_CANDLES, deadline=deadline
+            )
+            if not history:
+                return None
+            state = EMAState.from_candles(history[:-1], CONFIG.EMA_PERIOD)
+            if state is None:
+                return None
+        
+        if self.ema_state_path:
+            try:
+                state.save(self.ema_state_path)
+            except OSError as e:
+                LOG.warning("No se pudo guardar el estado EMA: %s", e)
+        self.ema_state = state
+        return state
+    
+    def _advance_rsi_state(self, candles_15m: Candles) -> Optional[RSIState]:
+        """
+        RSIState de las velas cerradas (todas menos la última).
+        
+        Por defecto se reconstruye cada ciclo sobre la ventana de
+        CONFIG.RSI_WINDOW velas: prev/curr son exactamente los RSI de v1.3
+        (rsi de las 49 cerradas y de las 50 con la vela en formación). La
+        ventana solo cambia al cerrar una vela, así que entre cierres se
+        reutiliza el mismo estado. Con CONFIG.RSI_CONVERGED se siembra una vez con RSI_SEED_CANDLES velas
+        y se avanza en O(1); solo se vuelve a sembrar si aparece un hueco.
+        """
+        if not CONFIG.RSI_CONVERGED:
+            if len(candles_15m) < 2:
+                return None
+            key = (candles_15m.timestamp[-2], CONFIG.RSI_WINDOW, CONFIG.RSI_PERIOD)
+            if self.rsi_state is None or key != self._rsi_window_key:
+                self.rsi_state = RSIState.from_candles(
+                    candles_15m[-CONFIG.RSI_WINDOW:-1], CONFIG.RSI_PERIOD)
+                self._rsi_window_key = key if self.rsi_state is not None else None
+            return self.rsi_state
+        
+        self._rsi_window_key = None
+        closed = candles_15m[:-1]
+        state = self.rsi_state
+        
+        if state is not None:
+            start = closed.index_of(state.last_timestamp + 1)
+            if start == 0 and closed.timestamp[0] - state.last_timestamp != DataEngine.INTERVAL_MS[CONFIG.TIMEFRAME]:
+                state = None    # Hueco: el estado quedó atrás de la ventana
+            else:
+                for i in range(start, len(closed)):
+                    state.update(closed.close[i], closed.timestamp[i])
+        
+        if state is None:
+            history = self.klines.get(CONFIG.SYMBOL, CONFIG.TIMEFRAME, self.RSI_SEED_CANDLES)
+            if history and history.timestamp[-1] == candles_15m.timestamp[-1]:
+                state = RSIState.from_candles(history[:-1], CONFIG.RSI_PERIOD)
+            else:
+                state = RSIState.from_candles(closed, CONFIG.RSI_PERIOD)
+        
+        self.rsi_state = state
+        return state
+    
+    def _fetch_market_data(self) -> Tuple[Optional[Candles], Optional[EMAState], Optional[float]]:
+        """
+        Obtiene velas 15m, estado EMA 1H y mark price.
+        
+        Con stream WebSocket activo se sirven desde memoria sin tocar la red;
+        si no, por REST (delta fetch vía KlineCache). La EMA 1H solo pide
+        datos cuando cierra una vela horaria (v1.4).
+        """
+        deadline = time.monotonic() + self.CYCLE_DEADLINE_SEC
+        if self.stream is not None and self.stream.is_live():
+            candles_15m = self.klines.snapshot(CONFIG.SYMBOL, CONFIG.TIMEFRAME, CONFIG.RSI_WINDOW)
+            if candles_15m:
+                return candles_15m, self._advance_ema_state(deadline), self.stream.mark_price
+        
+        # Fuentes en memoria (replay): sin I/O que solapar, el fan-out a
+        # threads solo añadiría cambios de contexto
+        if not getattr(self.data, 'CONCURRENT', True):
+            return (self.klines.get(CONFIG.SYMBOL, CONFIG.TIMEFRAME, CONFIG.RSI_WINDOW, deadline),
+                    self._advance_ema_state(deadline),
+                    self.data.get_current_price(CONFIG.SYMBOL, deadline))
+        
+        # Las llamadas REST en paralelo con un deadline común: la latencia
+        # del ciclo es la del request más lento, no la suma (v1.4)
+        futures = [
+            DataEngine.EXECUTOR.submit(self.klines.get, CONFIG.SYMBOL, CONFIG.TIMEFRAME, CONFIG.RSI_WINDOW, deadline),
+            DataEngine.EXECUTOR.submit(self._advance_ema_state, deadline),
+            DataEngine.EXECUTOR.submit(self.data.get_current_price, CONFIG.SYMBOL, deadline),
+        ]
+        done, _ = wait(futures, timeout=self.CYCLE_DEADLINE_SEC)
+        
+        results = []
+        for future in futures:
+            if future in done and future.exception() is None:
+                results.append(future.result())
+            else:
+                results.append(None)
+        return results[0], results[1], results[2]
     
     def analyze(self) -> Dict:
         """
         Analiza el mercado y detecta señales.
         
-        Returns: Dict con análisis completo
+        Returns: Dict con análisis completo. cycle_ms es el tiempo del ciclo
+        completo (datos + indicadores + reglas) y fetch_ms solo el de los datos.
         """
+        cycle_start = time.perf_counter()
+        result = self._analyze()
+        result['cycle_ms'] = round((time.perf_counter() - cycle_start) * 1000, 1)
+        return result
+    
+    def _analyze(self) -> Dict:
         result = {
             'signal': SignalType.NONE,
             'rsi': None,
@@ -606,39 +2608,48 @@ class SignalDetector:
             'signal_strength': 0,
             'can_trade': False,
             'reasons': [],
-            'warnings': []
+            'warnings': [],
+            'cycle_ms': None,
+            'fetch_ms': None,
+            'trigger_long': None,       # Precio que dispara el cruce LONG (v1.4)
+            'trigger_short': None,      # Precio que dispara el cruce SHORT (v1.4)
+            'trigger_until': None       # Cierre (ms) de la vela para la que valen
         }
         
-        # Obtener datos 15m para RSI
-        candles_15m = DataEngine.get_klines(CONFIG.SYMBOL, CONFIG.TIMEFRAME, 50)
+        # Velas 15m (RSI), estado EMA 200 1H y Precio Mark en Tiempo Real (Mejora v1.2)
+        fetch_start = time.perf_counter()
+        self.cycles += 1
+        candles_15m, ema_state, real_price = self._fetch_market_data()
+        result['fetch_ms'] = round((time.perf_counter() - fetch_start) * 1000, 1)
+        
         if not candles_15m or len(candles_15m) < CONFIG.RSI_PERIOD + 2:
             result['reasons'].append("Error obteniendo datos 15m")
             return result
         
-        # Obtener datos 1H para EMA 200
-        candles_1h = DataEngine.get_klines(CONFIG.SYMBOL, CONFIG.EMA_TIMEFRAME, 250)
-        if not candles_1h or len(candles_1h) < CONFIG.EMA_PERIOD:
+        if ema_state is None:
             result['reasons'].append("Error obteniendo datos 1H")
             return result
         
-        # Obtener Precio Mark en Tiempo Real (Mejora v1.2)
-        real_price = DataEngine.get_current_price(CONFIG.SYMBOL)
-        current_candle_close = candles_15m[-1]['close']
+        current_candle_close = candles_15m.close[-1]
         
         # Usar Mark Price si está disponible, sino cierre de vela
         current_price = real_price if real_price else current_candle_close
         
         # Calcular indicadores
         # v1.2: Necesitamos historial para Crossover
-        rsi_values = Indicators.rsi_history(candles_15m, CONFIG.RSI_PERIOD, lookback=2)
-        ema_200 = Indicators.ema(candles_1h, CONFIG.EMA_PERIOD)
+        # v1.4: RSI incremental - prev = cierre de la última vela cerrada,
+        #       curr = valor provisional de la vela en formación
+        # v1.4: EMA incremental - provisional con el cierre en formación (el
+        #       último precio, que es el cierre de la vela 1H de v1.3)
+        rsi_state = self._advance_rsi_state(candles_15m)
+        ema_200 = ema_state.peek(current_candle_close)
         
-        if not rsi_values or len(rsi_values) < 2 or ema_200 is None:
+        if rsi_state is None:
             result['reasons'].append("Error calculando indicadores")
             return result
             
-        curr_rsi = rsi_values[-1]
-        prev_rsi = rsi_values[-2]
+        curr_rsi = rsi_state.peek(current_candle_close)
+        prev_rsi = rsi_state.value()
         
         # Guardar valores
         result['rsi'] = curr_rsi
@@ -651,6 +2662,25 @@ class SignalDetector:
         self.last_ema = ema_200
         self.last_price = current_price
         
+        # v1.4: Precios de disparo para la vela en formación (RSI inverso)
+        result['trigger_long'], result['trigger_short'] = self.trigger_prices(rsi_state)
+        result['trigger_until'] = candles_15m.close_time[-1]
+        
+        return self.evaluate(prev_rsi, curr_rsi, current_price, ema_200, result)
+    
+    @staticmethod
+    def evaluate(prev_rsi: float, curr_rsi: float, current_price: float, ema_200: float,
+                 result: Optional[Dict] = None) -> Dict:
+        """
+        Reglas de señal puras: cruce RSI + filtro EMA 200 (NUEVO v1.4).
+        
+        Sin I/O: la usan tanto analyze() como el backtest, así ambos aplican
+        exactamente la misma lógica. Rellena y devuelve `result`.
+        """
+        if result is None:
+            result = {'signal': SignalType.NONE, 'ema_aligned': False, 'signal_strength': 0,
+                      'can_trade': False, 'reasons': [], 'warnings': []}
+        
         # Detectar señal RSI (Crossover Logic v1.2)
         # LONG: Cruce de abajo hacia arriba en nivel OVERSOLD
         # SHORT: Cruce de arriba hacia abajo en nivel OVERBOUGHT
@@ -706,6 +2736,31 @@ class SignalDetector:
         
         return result
     
+    @staticmethod
+    def trigger_prices(rsi_state: RSIState) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Precios de cierre que completarían el cruce en la vela en formación.
+        
+        LONG solo es posible si el RSI cerrado está bajo OVERSOLD (se dispara
+        con precio >= trigger_long); SHORT si está sobre OVERBOUGHT (precio <=
+        trigger_short). El bucle compara cada tick con estos dos números.
+        """
+        prev_rsi = rsi_state.value()
+        trigger_long = rsi_state.price_at(CONFIG.RSI_OVERSOLD) if prev_rsi < CONFIG.RSI_OVERSOLD else None
+        trigger_short = rsi_state.price_at(CONFIG.RSI_OVERBOUGHT) if prev_rsi > CONFIG.RSI_OVERBOUGHT else None
+        return trigger_long, trigger_short
+    
+    @staticmethod
+    def trigger_hit(analysis: Dict, price: Optional[float]) -> bool:
+        """True si `price` cruza alguno de los precios de disparo del análisis."""
+        if price is None:
+            return False
+        if analysis.get('trigger_long') is not None and price >= analysis['trigger_long']:
+            return True
+        if analysis.get('trigger_short') is not None and price <= analysis['trigger_short']:
+            return True
+        return False
+    
     def get_rsi_zone(self, rsi: float) -> Tuple[str, str]:
         """Describe la zona actual del RSI."""
         if rsi <= 10:
@@ -819,99 +2874,440 @@ class PositionCalculator:
 # ══════════════════════════════════════════════════════════════════════════════
 
 class JournalManager:
-    """Gestiona persistencia de trades y estadísticas."""
+    """
+    Gestiona persistencia de trades y estadísticas.
     
-    def __init__(self):
+    v1.4: el día actual vive en memoria y todas las lecturas salen de ahí
+    (cero lecturas de disco por ciclo). Los cambios se acumulan y se
+    persisten con write-behind: varias señales dentro de WRITE_BEHIND_SEC
+    se escriben juntas; abrir/cerrar un trade y close() escriben al
+    instante. Supone un único proceso escritor por journal.
+    """
+    
+    WRITE_BEHIND_SEC: Optional[float] = 2.0     # None: solo flush explícito
+    
+    def __init__(self, clock: Optional[Callable[[], datetime]] = None):
+        self.clock = clock      # Reloj inyectable para backtest/replay (v1.4)
+        self._lock = threading.RLock()
+        self._day: Optional[Dict] = None        # Día actual en memoria (v1.4)
+        self._changes: List[Tuple] = []         # Cambios pendientes de persistir
+        self._timer: Optional[threading.Timer] = None
         self._ensure_dir()
     
+    @staticmethod
+    def create(clock: Optional[Callable[[], datetime]] = None) -> 'JournalManager':
+        """
+        Journal según CONFIG.JOURNAL_BACKEND (v1.4).
+        
+        Al crear la base SQLite por primera vez importa los JSON existentes.
+        Registra close() en atexit para no perder el write-behind pendiente;
+        close() lo desregistra.
+        """
+        if CONFIG.JOURNAL_BACKEND != 'sqlite':
+            journal = JournalManager(clock)
+        else:
+            path = os.path.join(CONFIG.JOURNAL_DIR, SQLiteJournalManager.DB_NAME)
+            is_new = not os.path.exists(path)
+            journal = SQLiteJournalManager(clock, path)
+            if is_new:
+                imported = journal.migrate_json()
+                if imported:
+                    LOG.info("📔 Journal migrado a SQLite: %d días desde JSON", imported)
+        atexit.register(journal.close)
+        return journal
+    
+    def now(self) -> datetime:
+        if self.clock is not None:
+            return self.clock()
+        return datetime.now(CONFIG.USER_TZ)
+    
     def _ensure_dir(self):
         if not os.path.exists(CONFIG.JOURNAL_DIR):
             os.makedirs(CONFIG.JOURNAL_DIR)
     
-    def _get_file_path(self) -> str:
-        date_str = datetime.now(CONFIG.USER_TZ).strftime('%Y-%m-%d')
+    def _get_file_path(self, date_str: Optional[str] = None) -> str:
+        date_str = date_str or self.now().strftime('%Y-%m-%d')
         return os.path.join(CONFIG.JOURNAL_DIR, f"journal_{date_str}.json")
     
-    def load(self) -> Dict:
-        path = self._get_file_path()
-        if not os.path.exists(path):
-            return {
-                "date": datetime.now(CONFIG.USER_TZ).strftime('%Y-%m-%d'),
-                "trades": [],
-                "signals_detected": [],
-                "stats": {
-                    "total_trades": 0,
-                    "wins": 0,
-                    "losses": 0,
-                    "total_pnl": 0.0,
-                    "consecutive_losses": 0,
-                    "signals_ignored": 0
-                }
+    def _empty_day(self) -> Dict:
+        return {
+            "date": self.now().strftime('%Y-%m-%d'),
+            "trades": [],
+            "signals_detected": [],
+            "stats": {
+                "total_trades": 0,
+                "wins": 0,
+                "losses": 0,
+                "total_pnl": 0.0,
+                "consecutive_losses": 0,
+                "signals_ignored": 0
             }
+        }
+    
+    # ─── Almacenamiento (lo sustituyen los otros backends) ────────────────────
+    
+    def _read_day(self, date_str: str) -> Dict:
+        path = self._get_file_path(date_str)
+        if not os.path.exists(path):
+            return self._empty_day()
         with open(path, 'r') as f:
             return json.load(f)
     
-    def save(self, data: Dict):
-        with open(self._get_file_path(), 'w') as f:
+    def _persist(self, data: Dict, changes: List[Tuple]):
+        """Escribe el día completo (atómico); los cambios individuales no importan aquí."""
+        path = self._get_file_path(data['date'])
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
             json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    
+    # ─── Estado en memoria y write-behind (v1.4) ──────────────────────────────
+    
+    def _current(self) -> Dict:
+        """Día actual desde memoria; al cambiar de fecha persiste el anterior y carga el nuevo."""
+        date_str = self.now().strftime('%Y-%m-%d')
+        if self._day is None or self._day['date'] != date_str:
+            self.flush()
+            self._day = self._read_day(date_str)
+        return self._day
+    
+    def _changed(self, change: Tuple, immediate: bool = False):
+        self._changes.append(change)
+        if immediate:
+            self.flush()
+        elif self.WRITE_BEHIND_SEC is not None and self._timer is None:
+            self._timer = threading.Timer(self.WRITE_BEHIND_SEC, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def flush(self):
+        """Persiste los cambios pendientes; si falla se conservan para el siguiente flush."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._changes or self._day is None:
+                return
+            try:
+                self._persist(self._day, self._changes)
+                self._changes = []
+            except (OSError, sqlite3.Error) as e:
+                LOG.error("No se pudo guardar el journal (se reintentará): %s", e)
+    
+    def close(self):
+        self.flush()
+        atexit.unregister(self.close)
+    
+    # ─── Interfaz pública ─────────────────────────────────────────────────────
+    # Las lecturas devuelven copias: todo cambio pasa por los métodos de
+    # escritura (y por el write-behind)
+    
+    def load(self) -> Dict:
+        """Copia del día actual (para modificarlo usar save())."""
+        with self._lock:
+            return copy.deepcopy(self._current())
+    
+    def save(self, data: Dict):
+        """
+        Reemplaza el día completo (con una copia de `data`) y lo persiste al instante.
+        
+        Solo se registran las filas que cambian respecto al día guardado
+        (señales añadidas, trades nuevos o modificados); si se borró o editó
+        alguna señal o trade, se reemplaza el día entero.
+        """
+        with self._lock:
+            if self._day is not None and self._day['date'] != data['date']:
+                self.flush()
+                self._day = None
+            data = copy.deepcopy(data)
+            current = self._day if self._day is not None else self._read_day(data['date'])
+            changes = self._diff_day(current, data)
+            self._day = data
+            if changes is None:
+                self._changed(('day',), immediate=True)
+            else:
+                self._changes.extend(changes)
+                self._changed(('stats',), immediate=True)
+    
+    @staticmethod
+    def _diff_day(old: Dict, new: Dict) -> Optional[List[Tuple]]:
+        """Cambios por fila de old a new; None si hace falta reemplazar el día."""
+        old_signals, new_signals = old['signals_detected'], new.get('signals_detected', [])
+        if new_signals[:len(old_signals)] != old_signals:
+            return None
+        changes: List[Tuple] = [('signal', signal_data) for signal_data in new_signals[len(old_signals):]]
+        
+        old_trades = {trade['id']: trade for trade in old['trades']}
+        new_ids = set()
+        for trade in new.get('trades', []):
+            if 'id' not in trade or trade['id'] in new_ids:
+                return None
+            new_ids.add(trade['id'])
+            previous = old_trades.get(trade['id'])
+            if previous is None:
+                changes.append(('trade', trade))
+            elif previous != trade:
+                changes.append(('update', trade))
+        if not new_ids.issuperset(old_trades):
+            return None
+        return changes
     
     def log_signal(self, signal_data: Dict):
         """Registra una señal detectada."""
-        data = self.load()
-        signal_data['timestamp'] = time.time()
-        signal_data['time'] = datetime.now(CONFIG.USER_TZ).strftime('%H:%M:%S')
-        data['signals_detected'].append(signal_data)
-        self.save(data)
+        with self._lock:
+            data = self._current()
+            signal_data['timestamp'] = self.now().timestamp()
+            signal_data['time'] = self.now().strftime('%H:%M:%S')
+            data['signals_detected'].append(signal_data)
+            self._changed(('signal', signal_data))
+    
+    def ignore_signal(self):
+        """Cuenta una señal descartada por el usuario."""
+        with self._lock:
+            self._current()['stats']['signals_ignored'] += 1
+            self._changed(('stats',))
     
     def add_trade(self, trade: Dict) -> int:
         """Registra un trade abierto."""
-        data = self.load()
-        trade['id'] = len(data['trades']) + 1
-        trade['status'] = 'OPEN'
-        trade['open_time'] = time.time()
-        data['trades'].append(trade)
-        data['stats']['total_trades'] += 1
-        self.save(data)
+        with self._lock:
+            data = self._current()
+            trade['id'] = len(data['trades']) + 1
+            trade['status'] = 'OPEN'
+            trade['open_time'] = self.now().timestamp()
+            data['trades'].append(trade)
+            data['stats']['total_trades'] += 1
+            self._changed(('trade', trade), immediate=True)
         return trade['id']
     
     def close_trade(self, trade_id: int, pnl: float, result: str):
         """Cierra un trade y actualiza estadísticas."""
-        data = self.load()
-        
-        for trade in data['trades']:
-            if trade['id'] == trade_id:
-                trade['status'] = 'CLOSED'
-                trade['pnl'] = pnl
-                trade['result'] = result
-                trade['close_time'] = time.time()
-                break
-        
-        if pnl > 0:
-            data['stats']['wins'] += 1
-            data['stats']['consecutive_losses'] = 0
-        else:
-            data['stats']['losses'] += 1
-            data['stats']['consecutive_losses'] += 1
-        
-        data['stats']['total_pnl'] += pnl
-        self.save(data)
+        with self._lock:
+            data = self._current()
+            
+            for trade in data['trades']:
+                if trade['id'] == trade_id:
+                    trade['status'] = 'CLOSED'
+                    trade['pnl'] = pnl
+                    trade['result'] = result
+                    trade['close_time'] = self.now().timestamp()
+                    self._changes.append(('update', trade))
+                    break
+            
+            if pnl > 0:
+                data['stats']['wins'] += 1
+                data['stats']['consecutive_losses'] = 0
+            else:
+                data['stats']['losses'] += 1
+                data['stats']['consecutive_losses'] += 1
+            
+            data['stats']['total_pnl'] += pnl
+            self._changed(('stats',), immediate=True)
     
     def get_active_trade(self) -> Optional[Dict]:
         """Obtiene trade activo si existe."""
-        data = self.load()
-        for trade in reversed(data['trades']):
-            if trade.get('status') == 'OPEN':
-                return trade
+        with self._lock:
+            for trade in reversed(self._current()['trades']):
+                if trade.get('status') == 'OPEN':
+                    return dict(trade)
         return None
     
-    def get_stats(self) -> Dict:
-        return self.load().get('stats', {})
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self._current().get('stats', {}))
+    
+    def get_consecutive_losses(self) -> int:
+        with self._lock:
+            return self._current().get('stats', {}).get('consecutive_losses', 0)
+    
+    def get_daily_trades_count(self) -> int:
+        with self._lock:
+            return self._current().get('stats', {}).get('total_trades', 0)
+
+class SQLiteJournalManager(JournalManager):
+    """
+    Journal sobre SQLite con la misma interfaz que JournalManager (NUEVO v1.4).
+    
+    Cada cambio toca solo su fila: las señales y trades se insertan, un
+    cierre actualiza su trade y las stats del día son una fila por fecha.
+    El write-behind aplica los cambios acumulados en una sola transacción.
+    Modo WAL: la UI o Monte Carlo leen mientras el bot escribe. Índices por
+    tiempo, tipo y estado para consultar meses de histórico sin recorrer
+    archivos.
+    """
+    
+    DB_NAME = "journal.db"
+    STATS = ('total_trades', 'wins', 'losses', 'total_pnl', 'consecutive_losses', 'signals_ignored')
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS days (
+            date TEXT PRIMARY KEY,
+            total_trades INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            total_pnl REAL NOT NULL DEFAULT 0,
+            consecutive_losses INTEGER NOT NULL DEFAULT 0,
+            signals_ignored INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS signals (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            type TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_signals_date ON signals(date);
+        CREATE INDEX IF NOT EXISTS idx_signals_time ON signals(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_signals_type ON signals(type, timestamp);
+        CREATE TABLE IF NOT EXISTS trades (
+            date TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            type TEXT,
+            open_time REAL,
+            close_time REAL,
+            pnl REAL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (date, id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_trades_time ON trades(open_time);
+        CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status, date);
+        CREATE INDEX IF NOT EXISTS idx_trades_type ON trades(type, open_time);
+    """
+    
+    def __init__(self, clock: Optional[Callable[[], datetime]] = None, path: Optional[str] = None):
+        self.path = path or os.path.join(CONFIG.JOURNAL_DIR, self.DB_NAME)
+        super().__init__(clock)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")    # Seguro con WAL ante caídas del proceso
+        self._conn.executescript(self.SCHEMA)
+    
+    def _ensure_dir(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+    
+    def close(self):
+        with self._lock:
+            super().close()
+            self._conn.close()
+    
+    def _insert_signal(self, date: str, signal_data: Dict):
+        self._conn.execute(
+            "INSERT INTO signals (date, timestamp, type, data) VALUES (?, ?, ?, ?)",
+            (date, signal_data.get('timestamp', 0.0), signal_data.get('type'), json.dumps(signal_data))
+        )
+    
+    def _insert_trade(self, date: str, trade: Dict):
+        self._conn.execute(
+            "INSERT INTO trades (date, id, status, type, open_time, close_time, pnl, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (date, trade['id'], trade.get('status', 'OPEN'), trade.get('type'), trade.get('open_time'),
+             trade.get('close_time'), trade.get('pnl'), json.dumps(trade))
+        )
+    
+    def _update_trade(self, date: str, trade: Dict):
+        self._conn.execute(
+            "UPDATE trades SET status = ?, type = ?, open_time = ?, close_time = ?, pnl = ?, data = ? "
+            "WHERE date = ? AND id = ?",
+            (trade.get('status', 'OPEN'), trade.get('type'), trade.get('open_time'),
+             trade.get('close_time'), trade.get('pnl'), json.dumps(trade), date, trade['id'])
+        )
+    
+    def _write_stats(self, date: str, stats: Dict):
+        stats = {**self._empty_day()['stats'], **stats}
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO days (date, {', '.join(self.STATS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (date, *(stats[key] for key in self.STATS))
+        )
+    
+    def _replace_day(self, data: Dict):
+        date = data['date']
+        self._conn.execute("DELETE FROM trades WHERE date = ?", (date,))
+        self._conn.execute("DELETE FROM signals WHERE date = ?", (date,))
+        for trade in data.get('trades', []):
+            self._insert_trade(date, trade)
+        for signal_data in data.get('signals_detected', []):
+            self._insert_signal(date, signal_data)
+        self._write_stats(date, data.get('stats', {}))
+    
+    def _read_day(self, date_str: str) -> Dict:
+        data = self._empty_day()
+        data['date'] = date_str
+        data['trades'] = [json.loads(row['data']) for row in self._conn.execute(
+            "SELECT data FROM trades WHERE date = ? ORDER BY id", (date_str,))]
+        data['signals_detected'] = [json.loads(row['data']) for row in self._conn.execute(
+            "SELECT data FROM signals WHERE date = ? ORDER BY id", (date_str,))]
+        row = self._conn.execute(f"SELECT {', '.join(self.STATS)} FROM days WHERE date = ?",
+                                 (date_str,)).fetchone()
+        if row is not None:
+            data['stats'] = dict(row)
+        return data
     
-    def get_consecutive_losses(self) -> int:
-        return self.load().get('stats', {}).get('consecutive_losses', 0)
+    def _persist(self, data: Dict, changes: List[Tuple]):
+        """Aplica los cambios pendientes en una transacción (stats: una fila)."""
+        date = data['date']
+        with self._conn:
+            if any(change[0] == 'day' for change in changes):
+                # Señal o trade borrado/editado (save): el dict ya refleja los
+                # cambios posteriores, basta reemplazar el día
+                self._replace_day(data)
+                return
+            for change in changes:
+                if change[0] == 'signal':
+                    self._insert_signal(date, change[1])
+                elif change[0] == 'trade':
+                    self._insert_trade(date, change[1])
+                elif change[0] == 'update':
+                    self._update_trade(date, change[1])
+            self._write_stats(date, data['stats'])
     
-    def get_daily_trades_count(self) -> int:
-        return self.load().get('stats', {}).get('total_trades', 0)
+    def closed_trades(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """Trades cerrados con start <= open_time < end, en orden (índice por estado)."""
+        query = "SELECT data FROM trades WHERE status = 'CLOSED'"
+        params: List[float] = []
+        if start is not None:
+            query += " AND open_time >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND open_time < ?"
+            params.append(end)
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(query + " ORDER BY open_time", params).fetchall()
+        return [json.loads(row['data']) for row in rows]
+    
+    def migrate_json(self, directory: Optional[str] = None) -> int:
+        """
+        Importa los journal_YYYY-MM-DD.json existentes. Devuelve cuántos días importó.
+        
+        Los días que ya tienen datos en la base se omiten, así que repetirla
+        es inocua. Los archivos JSON no se modifican.
+        """
+        directory = directory or CONFIG.JOURNAL_DIR
+        if not os.path.isdir(directory):
+            return 0
+        imported = 0
+        with self._lock:
+            self.flush()
+            for name in sorted(os.listdir(directory)):
+                if not (name.startswith('journal_') and name.endswith('.json')):
+                    continue
+                try:
+                    with open(os.path.join(directory, name), 'r') as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    LOG.warning("No se pudo leer %s: %s", name, e)
+                    continue
+                date = data.get('date') or name[len('journal_'):-len('.json')]
+                exists = self._conn.execute(
+                    "SELECT 1 FROM days WHERE date = ? UNION SELECT 1 FROM trades WHERE date = ? "
+                    "UNION SELECT 1 FROM signals WHERE date = ?", (date, date, date)).fetchone()
+                if exists:
+                    continue
+                with self._conn:
+                    self._replace_day({**data, 'date': date})
+                imported += 1
+            self._day = None    # Releer el día actual si se importó
+        return imported
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 🛡️  SECCIÓN 8: RISK MANAGER
@@ -920,9 +3316,10 @@ class JournalManager:
 class RiskManager:
     """Gestiona reglas de riesgo."""
     
-    def __init__(self, journal: JournalManager):
+    def __init__(self, journal: JournalManager, clock: Optional[Callable[[], datetime]] = None):
         self.journal = journal
         self.last_loss_time: Optional[datetime] = None
+        self.clock = clock or journal.now   # Mismo reloj que el journal (v1.4)
     
     def can_trade(self) -> Tuple[bool, str]:
         """Verifica si se puede operar según reglas de riesgo."""
@@ -931,11 +3328,11 @@ class RiskManager:
         consecutive = self.journal.get_consecutive_losses()
         if consecutive >= CONFIG.MAX_CONSECUTIVE_LOSSES:
             if self.last_loss_time:
-                elapsed = (datetime.now(CONFIG.USER_TZ) - self.last_loss_time).total_seconds() / 60
+                elapsed = (self.clock() - self.last_loss_time).total_seconds() / 60
                 if elapsed < CONFIG.COOLDOWN_MINUTES:
                     remaining = CONFIG.COOLDOWN_MINUTES - elapsed
                     return False, f"⛔ COOLDOWN: {remaining:.0f}min (3 pérdidas consecutivas)"
-            self.last_loss_time = datetime.now(CONFIG.USER_TZ)
+            self.last_loss_time = self.clock()
             return False, f"⛔ 3 pérdidas consecutivas - Esperar {CONFIG.COOLDOWN_MINUTES}min"
         
         # Check daily limit
@@ -951,7 +3348,7 @@ class RiskManager:
     
     def record_loss(self):
         """Registra una pérdida para tracking."""
-        self.last_loss_time = datetime.now(CONFIG.USER_TZ)
+        self.last_loss_time = self.clock()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 🖥️  SECCIÓN 9: INTERFAZ DE USUARIO
@@ -1148,12 +3545,17 @@ class UI:
 class RSIMasterEngine:
     """Motor principal del programa."""
     
-    def __init__(self):
-        self.session = SessionManager()
-        self.journal = JournalManager()
+    def __init__(self, clock: Optional[SystemClock] = None, data=None,
+                 journal: Optional[JournalManager] = None):
+        # v1.4: reloj y fuente de datos inyectables (replay acelerado)
+        self.clock = clock or SystemClock()
+        self.data = data or DataEngine
+        self.session = SessionManager(clock.now if clock else None)
+        self.journal = journal or JournalManager.create(clock.now if clock else None)
         self.risk = RiskManager(self.journal)
-        self.detector = SignalDetector()
+        self.detector = SignalDetector(clock=clock, data=data)
         self.running = False
+        self._fired_until: Optional[int] = None   # Vela cuyo disparo ya saltó (v1.4)
     
     def run_scanner(self, strict_session: bool = True):
         """
@@ -1298,9 +3700,7 @@ class RSIMasterEngine:
                         return
                     else:
                         print("\n  ❌ Señal ignorada")
-                        data = self.journal.load()
-                        data['stats']['signals_ignored'] += 1
-                        self.journal.save(data)
+                        self.journal.ignore_signal()
                         time.sleep(2)
                 
                 else:
@@ -1412,40 +3812,92 @@ class RSIMasterEngine:
             print("\n\n  Monitor detenido (trade sigue activo)")
             input("\n  Presiona Enter...")
 
-    def run_cloud_mode(self):
+    TRIGGER_POLL_SEC = 2.0      # Sondeo de precio REST entre análisis (v1.4)
+    
+    def _wait_for_trigger(self, analysis: Dict, sleep_sec: float,
+                          market_stream: Optional[BinanceMarketStream] = None):
+        """
+        Espera hasta sleep_sec vigilando solo el precio contra los disparos.
+        
+        Sin disparos posibles (RSI cerrado fuera de zona) basta con dormir.
+        Con stream cada tick de markPrice se compara al instante; por REST se
+        sondea el mark price cada TRIGGER_POLL_SEC (cacheado, peso 1).
+        
+        El disparo queda enclavado por vela: tras saltar una vez no se rearma
+        hasta que cierre la vela (trigger_until) y llegue un análisis nuevo.
+        """
+        end = self.clock.time() + sleep_sec
+        if analysis['trigger_until'] is not None:
+            end = min(end, analysis['trigger_until'] / 1000 + 1)
+        watching = ((analysis['trigger_long'] is not None or analysis['trigger_short'] is not None)
+                    and analysis['trigger_until'] != self._fired_until)
+        
+        if market_stream:
+            self.clock.sleep(BinanceMarketStream.MIN_CYCLE_SEC)
+        
+        while True:
+            remaining = end - self.clock.time()
+            if remaining <= 0:
+                return
+            if not watching:
+                self.clock.sleep(remaining)
+                return
+            if market_stream and market_stream.is_live():
+                market_stream.wait_for_update(remaining)
+                price = market_stream.mark_price
+            else:
+                self.clock.sleep(min(self.TRIGGER_POLL_SEC, remaining))
+                price = self.data.get_current_price(CONFIG.SYMBOL)
+            if SignalDetector.trigger_hit(analysis, price):
+                LOG.debug("Precio %s cruza disparo (long=%s short=%s)", price,
+                          analysis['trigger_long'], analysis['trigger_short'],
+                          extra={'sample_key': 'trigger_hit'})
+                self._fired_until = analysis['trigger_until']
+                return
+    
+    def run_cloud_mode(self, stream: bool = False):
         """
         Modo Nube (Headless) para ejecución 24/7 en servidor.
         - Sin UI interactiva
         - Bucle infinito
         - Alertas Telegram
         - Auto-cooldown
+        - stream=True: datos push por WebSocket en vez de polling REST (v1.4)
         """
-        print(f"☁️  INICIANDO MODO NUBE (CLOUD MODE) v1.1")
-        print(f"📅  {datetime.now(CONFIG.USER_TZ)}")
-        print(f"⚡  RSI Period: {CONFIG.RSI_PERIOD} | Symbol: {CONFIG.SYMBOL}")
+        LOG.info("☁️  INICIANDO MODO NUBE (CLOUD MODE) v1.1")
+        LOG.info("📅  %s", self.clock.now())
+        LOG.info("⚡  RSI Period: %d | Symbol: %s", CONFIG.RSI_PERIOD, CONFIG.SYMBOL)
         
         if not CONFIG.TELEGRAM_BOT_TOKEN:
-            print("⚠️  ADVERTENCIA: Telegram no configurado. El bot correrá pero no avisará.")
+            LOG.warning("Telegram no configurado. El bot correrá pero no avisará.")
         else:
-            print("✅  Telegram configurado. Alertas activas.")
-            print("[LOG] Enviando mensaje de prueba a Telegram...")
+            LOG.info("✅  Telegram configurado. Alertas activas.")
+            LOG.info("Enviando mensaje de prueba a Telegram...")
             NotificationManager.send_message("🟢 <b>RSI Master:</b> Conexión establecida. Bot activo en MODO NUBE 24/7.")
-            print("[LOG] ✅ Mensaje enviado (revisa tu Telegram)")
 
         # Test de conexión a Binance
-        print("[LOG] Probando conexión a Binance API...")
-        test_price = DataEngine.get_current_price(CONFIG.SYMBOL)
+        LOG.info("Probando conexión a Binance API...")
+        test_price = self.data.get_current_price(CONFIG.SYMBOL, priority=RequestPriority.LOW)
         if test_price:
-            print(f"[LOG] ✅ Binance conectado. Precio actual BTC: ${test_price:,.2f}")
+            LOG.info("✅ Binance conectado. Precio actual BTC: $%s", f"{test_price:,.2f}")
             NotificationManager.send_message(f"✅ <b>Binance conectado.</b>\nPrecio BTC: ${test_price:,.2f}")
         else:
-            print("[LOG] ❌ Error conectando a Binance. Revisa los logs arriba.")
+            LOG.error("Error conectando a Binance. Revisa los logs arriba.")
             NotificationManager.send_message("❌ <b>Error:</b> No pude conectar a Binance API.")
             return
 
+        market_stream = None
+        if stream:
+            market_stream = BinanceMarketStream(
+                self.detector.klines, CONFIG.SYMBOL, [CONFIG.TIMEFRAME]
+            ).start()
+            self.detector.stream = market_stream
+            LOG.info("📡 Stream WebSocket iniciado (kline 15m + markPrice@1s)")
+
         last_signal_time = 0
         last_pre_alert_time = 0   # Cooldown para pre-alertas
-        last_heartbeat_time = time.time() # Para status cada 4h
+        last_heartbeat_time = self.clock.time() # Para status cada 4h
+        last_log_time = 0         # En modo stream el log de estado se limita
         signal_cooldown = 1800  # 30 minutos cooldown entre alertas para no spamear
         
         try:
@@ -1455,20 +3907,27 @@ class RSIMasterEngine:
                 
                 # Check error
                 if not analysis['rsi']:
-                    print(f"⚠️  Error obteniendo datos: {analysis['reasons']}")
-                    time.sleep(60)
+                    LOG.warning("Error obteniendo datos: %s", analysis['reasons'])
+                    self.clock.sleep(60)
                     continue
 
                 # Log simple en consola (para logs del servidor)
-                current_time = datetime.now(CONFIG.USER_TZ).strftime('%H:%M')
-                print(f"[{current_time}] RSI: {analysis['rsi']:.1f} | Precio: ${analysis['price']:.0f} | Signal: {analysis['signal'].value}")
+                if not market_stream or analysis['signal'] != SignalType.NONE or self.clock.time() - last_log_time >= 30:
+                    LOG.info("RSI: %.1f | Precio: $%.0f | Signal: %s", analysis['rsi'], analysis['price'],
+                             analysis['signal'].value,
+                             extra={'rsi': round(analysis['rsi'], 2), 'price': analysis['price'],
+                                    'signal': analysis['signal'].value, 'cycle_ms': analysis['cycle_ms'],
+                                    'fetch_ms': analysis['fetch_ms']})
+                    last_log_time = self.clock.time()
                 
                 # 2. Verificar Señal
                 if analysis['can_trade']:
-                    now_ts = time.time()
+                    now_ts = self.clock.time()
                     if (now_ts - last_signal_time) > signal_cooldown:
                         # ¡SEÑAL VÁLIDA!
-                        print(f"🚀  SEÑAL DETECTADA: {analysis['signal'].value}")
+                        LOG.info("🚀  SEÑAL DETECTADA: %s", analysis['signal'].value,
+                                     extra={'signal': analysis['signal'].value, 'rsi': analysis['rsi'],
+                                            'price': analysis['price'], 'ema_200': analysis['ema_200']})
                         
                         # Guardar Signal
                         self.journal.log_signal({
@@ -1497,13 +3956,15 @@ class RSIMasterEngine:
                         # Reset pre-alert para permitir nueva alerta en siguiente ciclo
                         last_pre_alert_time = 0
                         
-                        print(f"✅  Alerta enviada. Entrando en cooldown de 30min.")
+                        LOG.info("✅  Alerta enviada. Entrando en cooldown de 30min.")
                     else:
-                        print(f"⏳  Señal ignorada por cooldown ({(signal_cooldown - (time.time() - last_signal_time))/60:.0f}m restantes)")
+                        LOG.debug("⏳  Señal ignorada por cooldown (%.0fm restantes)",
+                                  (signal_cooldown - (self.clock.time() - last_signal_time)) / 60,
+                                  extra={'sample_key': 'signal_cooldown'})
                 
                 # 3. Lógica de Pre-Alertas (v1.3)
                 curr_rsi = analysis['rsi']
-                now_ts = time.time()
+                now_ts = self.clock.time()
                 pre_alert_cooldown = 900 # 15 mins
                 
                 if (now_ts - last_pre_alert_time) > pre_alert_cooldown:
@@ -1511,20 +3972,20 @@ class RSIMasterEngine:
                     if curr_rsi <= 25 and curr_rsi > 20: 
                         NotificationManager.send_pre_alert("LONG", curr_rsi, analysis['price'])
                         last_pre_alert_time = now_ts
-                        print(f"⚠️  Pre-Alerta LONG enviada (RSI {curr_rsi:.1f})")
+                        LOG.info("⚠️  Pre-Alerta LONG enviada (RSI %.1f)", curr_rsi)
                     
                     # SHORT Warning (RSI >= 75 and approaching 80)
                     elif curr_rsi >= 75 and curr_rsi < 80:
                         NotificationManager.send_pre_alert("SHORT", curr_rsi, analysis['price'])
                         last_pre_alert_time = now_ts
-                        print(f"⚠️  Pre-Alerta SHORT enviada (RSI {curr_rsi:.1f})")
+                        LOG.info("⚠️  Pre-Alerta SHORT enviada (RSI %.1f)", curr_rsi)
 
                 # 4. Status Heartbeat (Cada 4 horas)
                 if (now_ts - last_heartbeat_time) > 14400: # 4 horas
                     quality, _, _ = self.session.get_session_quality()
                     NotificationManager.send_status(curr_rsi, analysis['price'], quality.value)
                     last_heartbeat_time = now_ts
-                    print(f"🧘 Heartbeat enviado.")
+                    LOG.info("🧘 Heartbeat enviado.")
 
                 # Sleep inteligente
                 # Si estamos en sesión óptima -> check cada 30s
@@ -1532,11 +3993,18 @@ class RSIMasterEngine:
                 quality, _, _ = self.session.get_session_quality()
                 sleep_sec = 30 if quality in [SessionQuality.OPTIMAL, SessionQuality.GOOD] else 60
                 
-                time.sleep(sleep_sec)
+                # v1.4: Entre análisis completos solo se compara el precio con
+                # los disparos precalculados; se re-analiza al cruzarlos, al
+                # cerrar la vela 15m o al agotar sleep_sec
+                self._wait_for_trigger(analysis, sleep_sec, market_stream)
                 
         except KeyboardInterrupt:
-            print("\n☁️  Modo Nube detenido.")
+            LOG.info("☁️  Modo Nube detenido.")
             NotificationManager.send_message("🛑 <b>RSI Master:</b> Bot detenido manualmente.")
+        finally:
+            self.journal.flush()    # Write-behind pendiente (v1.4)
+            if market_stream:
+                market_stream.stop()
     
     def show_journal(self):
         """Muestra el journal del día."""
@@ -1716,6 +4184,1097 @@ class RSIMasterEngine:
         print("\n  ✅ Configuración guardada en config.json")
         time.sleep(1)
 
+# ══════════════════════════════════════════════════════════════════════════════
+# 🧪  SECCIÓN 10.5: BACKTEST (NUEVO v1.4)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class MemoryJournal(JournalManager):
+    """Journal en memoria que sigue el reloj simulado (mismas stats diarias, sin disco)."""
+    
+    WRITE_BEHIND_SEC = None
+    
+    def __init__(self, clock: Callable[[], datetime]):
+        self.days: Dict[str, Dict] = {}
+        super().__init__(clock)
+    
+    def _ensure_dir(self):
+        pass
+    
+    def _read_day(self, date_str: str) -> Dict:
+        data = self.days.get(date_str)
+        if data is None:
+            data = self.days[date_str] = self._empty_day()
+        return data
+    
+    def _persist(self, data: Dict, changes: List[Tuple]):
+        self.days[data['date']] = data
+
+@dataclass
+class BacktestResult:
+    """Resultado de un backtest: trades cerrados + métricas agregadas."""
+    trades: List[Dict]
+    signals: int
+    blocked: Dict[str, int]
+    total_trades: int = 0
+    wins: int = 0
+    losses: int = 0
+    win_rate: float = 0.0
+    profit_factor: Optional[float] = None
+    total_pnl: float = 0.0
+    max_drawdown: float = 0.0
+    elapsed_ms: float = 0.0
+    
+    @classmethod
+    def from_trades(cls, trades: List[Dict], signals: int, blocked: Dict[str, int],
+                    elapsed_ms: float = 0.0) -> 'BacktestResult':
+        wins = sum(1 for t in trades if t['pnl'] > 0)
+        gross_profit = sum(t['pnl'] for t in trades if t['pnl'] > 0)
+        gross_loss = -sum(t['pnl'] for t in trades if t['pnl'] <= 0)
+        
+        equity = peak = max_dd = 0.0
+        for t in trades:
+            equity += t['pnl']
+            peak = max(peak, equity)
+            max_dd = max(max_dd, peak - equity)
+        
+        return cls(
+            trades=trades,
+            signals=signals,
+            blocked=blocked,
+            total_trades=len(trades),
+            wins=wins,
+            losses=len(trades) - wins,
+            win_rate=round(wins / len(trades) * 100, 2) if trades else 0.0,
+            profit_factor=round(gross_profit / gross_loss, 3) if gross_loss > 0 else None,
+            total_pnl=round(equity, 2),
+            max_drawdown=round(max_dd, 2),
+            elapsed_ms=round(elapsed_ms, 1)
+        )
+    
+    def summary(self) -> Dict:
+        """Métricas sin la lista de trades (para JSON/logs)."""
+        data = asdict(self)
+        del data['trades']
+        return data
+
+class ExitResolver:
+    """
+    Resolución de salidas TP/SL por primer toque (NUEVO v1.4).
+    
+    La mayoría de trades salen en pocas velas, así que primero se recorren
+    SCAN_BARS velas directamente. Si no hay toque, se usa una sparse table
+    de máximos de high y mínimos de low (bloques de 2^k velas, construida
+    perezosamente una vez por serie) y cada consulta salta con binary
+    lifting los bloques que no alcanzan el nivel: O(log n) en vez de
+    O(duración del trade). Con NumPy la tabla se construye vectorizada.
+    
+    Regla conservadora: si SL y TP se tocan en la misma vela, cuenta como SL
+    (con velas OHLC no se sabe cuál ocurrió primero).
+    """
+    
+    SCAN_BARS = 32
+    
+    def __init__(self, candles: Candles, use_numpy: bool = HAS_NUMPY):
+        self.n = len(candles)
+        self.high = candles.high
+        self.low = candles.low
+        self.use_numpy = use_numpy
+        self._max: Optional[List[array]] = None
+        self._min: Optional[List[array]] = None
+    
+    def _build(self, column, op) -> List[array]:
+        levels = [array('d', column)]
+        span = 1
+        while span * 2 <= self.n:
+            prev = levels[-1]
+            if self.use_numpy and np is not None:
+                data = np.frombuffer(prev, dtype=np.float64)
+                reduce = np.maximum if op is max else np.minimum
+                levels.append(array('d', reduce(data[:-span], data[span:]).tobytes()))
+            else:
+                levels.append(array('d', map(op, prev, itertools.islice(prev, span, None))))
+            span *= 2
+        return levels
+    
+    def first_at_or_above(self, start: int, level: float) -> Optional[int]:
+        """Primer índice >= start con high >= level."""
+        if self._max is None:
+            self._max = self._build(self.high, max)
+        table, pos = self._max, start
+        for k in range(len(table) - 1, -1, -1):
+            if pos + (1 << k) <= self.n and table[k][pos] < level:
+                pos += 1 << k
+        return pos if pos < self.n else None
+    
+    def first_at_or_below(self, start: int, level: float) -> Optional[int]:
+        """Primer índice >= start con low <= level."""
+        if self._min is None:
+            self._min = self._build(self.low, min)
+        table, pos = self._min, start
+        for k in range(len(table) - 1, -1, -1):
+            if pos + (1 << k) <= self.n and table[k][pos] > level:
+                pos += 1 << k
+        return pos if pos < self.n else None
+    
+    def resolve(self, entry_index: int, signal: SignalType, levels: Dict) -> Tuple[Optional[int], Optional[str]]:
+        """(índice de salida, 'WIN'/'LOSS') desde la vela siguiente; (None, None) si no sale."""
+        tp, sl = levels['tp'], levels['sl']
+        is_long = signal == SignalType.LONG
+        high, low = self.high, self.low
+        
+        start = entry_index + 1
+        end = min(start + self.SCAN_BARS, self.n)
+        for j in range(start, end):
+            if (low[j] <= sl) if is_long else (high[j] >= sl):
+                return j, 'LOSS'
+            if (high[j] >= tp) if is_long else (low[j] <= tp):
+                return j, 'WIN'
+        if end >= self.n:
+            return None, None
+        
+        if is_long:
+            tp_index = self.first_at_or_above(end, tp)
+            sl_index = self.first_at_or_below(end, sl)
+        else:
+            tp_index = self.first_at_or_below(end, tp)
+            sl_index = self.first_at_or_above(end, sl)
+        
+        if sl_index is not None and (tp_index is None or sl_index <= tp_index):
+            return sl_index, 'LOSS'
+        if tp_index is not None:
+            return tp_index, 'WIN'
+        return None, None
+
+class Backtester:
+    """
+    Backtest dirigido por eventos sobre velas históricas (NUEVO v1.4).
+    
+    Reutiliza las reglas reales: SignalDetector.evaluate (cruce + EMA),
+    SessionManager, RiskManager (sobre MemoryJournal) y PositionCalculator,
+    con un reloj simulado. Las series RSI y EMA H1 se calculan una vez y
+    solo se evalúan las velas con cruce, así que el coste es ~una pasada.
+    
+    Supuestos (documentados):
+    - La señal se evalúa al cierre de la vela 15m y se entra a ese cierre
+      (en vivo puede dispararse antes, dentro de la vela).
+    - El RSI es el mismo que en vivo: por defecto el de la ventana de
+      RSI_WINDOW velas (prev = ventana de RSI_WINDOW-1 velas hasta la vela
+      anterior); con RSI_CONVERGED, la serie completa.
+    - La EMA H1 se deriva de las velas 15m (cierre H1 = último cierre 15m
+      de la hora) y es provisional con el precio de entrada, como en vivo:
+      por defecto la de la ventana de EMA_WINDOW velas; con EMA_CONVERGED,
+      la serie completa.
+    - TP/SL se resuelven con high/low desde la vela siguiente vía
+      ExitResolver; si una vela toca ambos cuenta como SL.
+    - Una posición a la vez; las fees (FEE_ROUND_TRIP_PCT) se restan siempre.
+    """
+    
+    HOUR_MS = 3_600_000
+    DAY_MS = 86_400_000
+    
+    def __init__(self, candles: Candles, strict_session: bool = True,
+                 symbol: Optional[str] = None, interval: Optional[str] = None,
+                 start_index: int = 0, end_index: Optional[int] = None):
+        self.candles = candles
+        self.strict_session = strict_session
+        self.symbol = symbol or CONFIG.SYMBOL
+        self.interval = interval or CONFIG.TIMEFRAME
+        # Ventana de entradas [start_index, end_index): los indicadores se
+        # calculan sobre toda la serie (memoizados) y se comparten entre ventanas
+        self.start_index = start_index
+        self.end_index = len(candles) if end_index is None else end_index
+        self._now: Optional[datetime] = None
+        # Último inicio de día local sin trade en curso: desde ahí se puede
+        # reanudar con journal/risk vacíos y obtener el mismo resultado
+        self.checkpoint: Optional[Dict[str, Any]] = None
+    
+    def clock(self) -> datetime:
+        return self._now
+    
+    def _set_clock(self, ms: int):
+        self._now = datetime.fromtimestamp(ms / 1000, CONFIG.USER_TZ)
+    
+    def _h1_ema(self) -> Tuple[Dict[int, int], List[Optional[float]]]:
+        """
+        EMA H1 sin redondear por hora, derivada de las velas 15m.
+        
+        Devuelve (índice por hora, ema tras cerrar cada hora). Ventana (por
+        defecto): la de las EMA_WINDOW-1 horas cerradas que ve SignalDetector.
+        Memoizado: configuraciones con el mismo EMA_PERIOD comparten el cálculo.
+        """
+        c = self.candles
+        period, converged, window = CONFIG.EMA_PERIOD, CONFIG.EMA_CONVERGED, CONFIG.EMA_WINDOW
+        key = ('h1_ema', self.symbol, self.interval, period, converged, window)
+        
+        def compute():
+            hour_index: Dict[int, int] = {}
+            hour_closes: List[float] = []
+            for ts, close in zip(c.timestamp, c.close):
+                hour = ts // self.HOUR_MS
+                if hour in hour_index:
+                    hour_closes[-1] = close
+                else:
+                    hour_index[hour] = len(hour_closes)
+                    hour_closes.append(close)
+            
+            if not converged:
+                return hour_index, Indicators.ema_window_series(hour_closes, period, window - 1)
+            values: List[Optional[float]] = [None] * len(hour_closes)
+            if len(hour_closes) >= period:
+                state = EMAState(period, sum(hour_closes[:period]) / period, 0)
+                values[period - 1] = state.value
+                for k in range(period, len(hour_closes)):
+                    state.update(hour_closes[k])
+                    values[k] = state.value
+            return hour_index, values
+        
+        return Indicators.MEMO.get_or_compute(key, compute, c)
+    
+    def _rsi_pair(self) -> Tuple[Tuple[Optional[float], ...], Tuple[Optional[float], ...]]:
+        """
+        (prev, curr) alineados por vela, como los ve SignalDetector al cierre.
+        
+        Ventana (por defecto): curr[i] = rsi de las RSI_WINDOW velas hasta i y
+        prev[i] = rsi de las RSI_WINDOW-1 velas hasta i-1 (mismo inicio).
+        Convergido: la serie completa y su valor anterior. Memoizado.
+        """
+        c = self.candles
+        period, window = CONFIG.RSI_PERIOD, CONFIG.RSI_WINDOW
+        if CONFIG.RSI_CONVERGED:
+            curr = Indicators.closed('rsi_series', self.symbol, self.interval, c, period)
+            return (None,) + curr[:-1], curr
+        
+        def series(size: int) -> Tuple[Optional[float], ...]:
+            key = ('rsi_window', self.symbol, self.interval, period, size)
+            return Indicators.MEMO.get_or_compute(
+                key, lambda: tuple(Indicators.rsi_window_series(c, period, size)), c)
+        
+        return (None,) + series(window - 1)[:-1], series(window)
+    
+    def _crossings(self, prev: Tuple[Optional[float], ...], curr: Tuple[Optional[float], ...]) -> Tuple[int, ...]:
+        """Índices de vela con cruce 20/80 (memoizado por período, niveles y modo RSI)."""
+        c = self.candles
+        period, oversold, overbought = CONFIG.RSI_PERIOD, CONFIG.RSI_OVERSOLD, CONFIG.RSI_OVERBOUGHT
+        key = ('crossings', self.symbol, self.interval, period, oversold, overbought,
+               CONFIG.RSI_CONVERGED, CONFIG.RSI_WINDOW)
+        
+        def compute():
+            return tuple(
+                i for i in range(len(curr))
+                if prev[i] is not None and curr[i] is not None
+                and ((prev[i] < oversold <= curr[i]) or (prev[i] > overbought >= curr[i]))
+            )
+        
+        return Indicators.MEMO.get_or_compute(key, compute, c)
+    
+    def _resolve_exit(self, i: int, signal: SignalType, levels: Dict) -> Tuple[Optional[int], Optional[str]]:
+        """Primera vela posterior a `i` que toca TP o SL (ambos => SL)."""
+        c = self.candles
+        key = ('exit_resolver', self.symbol, self.interval)
+        resolver = Indicators.MEMO.get_or_compute(key, lambda: ExitResolver(c), c)
+        return resolver.resolve(i, signal, levels)
+    
+    def run(self, resume: Optional[Dict[str, Any]] = None) -> BacktestResult:
+        """
+        Ejecuta el backtest. `resume` (checkpoint + trades previos) continúa
+        desde un checkpoint de una ejecución anterior sobre un prefijo de los
+        mismos datos (ver BacktestCache).
+        """
+        started = time.perf_counter()
+        c = self.candles
+        n = len(c)
+        blocked = {'position': 0, 'warmup': 0, 'ema': 0, 'session': 0, 'risk': 0}
+        trades: List[Dict] = []
+        signals = 0
+        start_index = self.start_index
+        if resume is not None:
+            blocked = dict(resume['blocked'])
+            trades = list(resume['trades'])
+            signals = resume['signals']
+            start_index = max(start_index, c.index_of(resume['time']))
+        if n < CONFIG.RSI_PERIOD + 2:
+            return BacktestResult.from_trades(trades, signals, blocked)
+        
+        prev_series, rsi = self._rsi_pair()
+        hour_index, h1_ema = self._h1_ema()
+        multiplier = 2 / (CONFIG.EMA_PERIOD + 1)
+        
+        session = SessionManager(self.clock)
+        journal = MemoryJournal(self.clock)
+        risk = RiskManager(journal)
+        position_size, _, _ = PositionCalculator.calculate_position_size()
+        fees = position_size * (CONFIG.FEE_ROUND_TRIP_PCT / 100)
+        
+        timestamp, close, close_time = c.timestamp, c.close, c.close_time
+        pending: Optional[Dict] = None      # Trade abierto (con salida ya resuelta)
+        
+        crossings = self._crossings(prev_series, rsi)
+        first = bisect.bisect_left(crossings, start_index)
+        last = bisect.bisect_left(crossings, self.end_index)
+        offset_ms = CONFIG.USER_TZ_OFFSET * self.HOUR_MS
+        last_day = None
+        
+        for i in crossings[first:last]:
+            day = (close_time[i] + offset_ms) // self.DAY_MS
+            if day != last_day:
+                last_day = day
+                boundary = day * self.DAY_MS - offset_ms
+                if pending is None or (pending['exit_index'] is not None
+                                       and close_time[pending['exit_index']] < boundary):
+                    self.checkpoint = {'time': boundary, 'signals': signals,
+                                       'blocked': dict(blocked), 'trades': len(trades)}
+            
+            prev_rsi, curr_rsi = prev_series[i], rsi[i]
+            signals += 1
+            
+            # Cerrar en el journal el trade cuya salida ya ocurrió
+            if pending is not None and pending['exit_index'] is not None and pending['exit_index'] <= i:
+                self._set_clock(close_time[pending['exit_index']])
+                journal.close_trade(pending['id'], pending['pnl'], pending['result'])
+                if pending['pnl'] <= 0:
+                    risk.record_loss()
+                pending = None
+            if pending is not None:
+                blocked['position'] += 1
+                continue
+            
+            k = hour_index[timestamp[i] // self.HOUR_MS]
+            ema_prev = h1_ema[k - 1] if k > 0 else None
+            if ema_prev is None:
+                blocked['warmup'] += 1
+                continue
+            
+            price = close[i]
+            ema_200 = round((price - ema_prev) * multiplier + ema_prev, 2)
+            analysis = SignalDetector.evaluate(prev_rsi, curr_rsi, price, ema_200)
+            if not analysis['can_trade']:
+                blocked['ema'] += 1
+                continue
+            
+            self._set_clock(close_time[i])
+            if not session.can_trade_now(self.strict_session)[0]:
+                blocked['session'] += 1
+                continue
+            if not risk.can_trade()[0]:
+                blocked['risk'] += 1
+                continue
+            
+            signal = analysis['signal']
+            levels = PositionCalculator.calculate_levels(price, signal)
+            trade = {
+                'type': signal.value,
+                'entry': price,
+                'sl': levels['sl'],
+                'tp': levels['tp'],
+                'position_size': position_size,
+                'rsi_at_entry': curr_rsi,
+                'ema_at_entry': ema_200
+            }
+            trade_id = journal.add_trade(trade)
+            
+            exit_index, result = self._resolve_exit(i, signal, levels)
+            if exit_index is None:
+                pending = {'id': trade_id, 'exit_index': None}
+                continue    # Sigue abierto al final de los datos: no cuenta
+            
+            exit_price = levels['tp'] if result == 'WIN' else levels['sl']
+            move = (exit_price - price) / price
+            if signal == SignalType.SHORT:
+                move = -move
+            pnl = position_size * move - fees
+            
+            pending = {'id': trade_id, 'exit_index': exit_index, 'pnl': pnl, 'result': result}
+            trades.append({
+                'type': signal.value,
+                'entry_time': close_time[i],
+                'exit_time': close_time[exit_index],
+                'entry': price,
+                'exit': exit_price,
+                'rsi_at_entry': curr_rsi,
+                'ema_at_entry': ema_200,
+                'result': result,
+                'pnl': pnl
+            })
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return BacktestResult.from_trades(trades, signals, blocked, elapsed_ms)
+
+class BacktestCache:
+    """
+    Cache en disco de backtests direccionada por contenido (NUEVO v1.4).
+    
+    Clave = hash de los campos de ValidatedConfig que afectan al backtest +
+    símbolo/intervalo/sesión/ventana. Cada entrada guarda la huella de las
+    velas usadas, el resultado y el último checkpoint limpio. Con los
+    mismos datos es un hit directo; si los datos nuevos extienden el mismo
+    prefijo (backfill incremental), solo se re-simula desde el checkpoint.
+    Los indicadores son causales, así que el resultado es idéntico.
+    """
+    
+    VERSION = 3     # Subir si cambia la lógica del backtest (2: RSI de ventana, 3: EMA de ventana)
+    CONFIG_FIELDS = (
+        'RSI_PERIOD', 'RSI_OVERSOLD', 'RSI_OVERBOUGHT', 'RSI_WINDOW', 'RSI_CONVERGED',
+        'EMA_WINDOW', 'EMA_CONVERGED', 'STOP_LOSS_PCT', 'TAKE_PROFIT_PCT',
+        'CAPITAL_TOTAL', 'CAPITAL_FUTURES', 'LEVERAGE', 'RISK_PER_TRADE_PCT', 'FEE_ROUND_TRIP_PCT',
+        'USER_TZ_OFFSET', 'EMA_PERIOD', 'ASIA_START', 'ASIA_END', 'EUROPE_START', 'EUROPE_END',
+        'OVERLAP_START', 'OVERLAP_END', 'MAX_CONSECUTIVE_LOSSES', 'COOLDOWN_MINUTES', 'MAX_DAILY_TRADES',
+    )
+    FINGERPRINT_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'close_time')
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(CONFIG.HISTORY_DIR, "backtest_cache")
+        self.hits = 0
+        self.resumed = 0
+        self.misses = 0
+    
+    @classmethod
+    def config_hash(cls, strict_session: bool, symbol: str, interval: str,
+                    start_time: Optional[int], end_time: Optional[int]) -> str:
+        fields = {name: getattr(CONFIG, name) for name in cls.CONFIG_FIELDS}
+        fields.update(version=cls.VERSION, strict_session=strict_session, symbol=symbol,
+                      interval=interval, start_time=start_time, end_time=end_time)
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()[:32]
+    
+    @classmethod
+    def fingerprint(cls, candles: Candles, n: int, symbol: str, interval: str) -> str:
+        """
+        Huella de las primeras n velas, memoizada por objeto Candles (la
+        huella es lo que detecta datos corregidos con los mismos timestamps).
+        """
+        key = ('fingerprint', symbol, interval, n)
+        
+        def compute():
+            digest = hashlib.blake2b(digest_size=16)
+            for name, typecode in zip(Candles.COLUMNS, Candles.TYPECODES):
+                if name in cls.FINGERPRINT_COLUMNS:
+                    digest.update(Candles._as_bytes(getattr(candles, name)[:n], typecode))
+            return digest.hexdigest()
+        
+        return Indicators.MEMO.get_or_compute(key, compute, candles)
+    
+    def _load(self, path: str) -> Optional[Dict]:
+        try:
+            with gzip.open(path, 'rt') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _save(self, path: str, entry: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, 'wt', compresslevel=1) as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+    
+    def run(self, candles: Candles, strict_session: bool = True,
+            symbol: Optional[str] = None, interval: Optional[str] = None,
+            start_index: int = 0, end_index: Optional[int] = None) -> BacktestResult:
+        symbol = symbol or CONFIG.SYMBOL
+        interval = interval or CONFIG.TIMEFRAME
+        n = len(candles)
+        backtester = Backtester(candles, strict_session, symbol, interval, start_index, end_index)
+        if not n:
+            return backtester.run()
+        
+        start_time = candles.timestamp[start_index] if start_index < n else None
+        end_time = candles.timestamp[end_index - 1] if end_index else None
+        path = os.path.join(self.directory, self.config_hash(strict_session, symbol, interval,
+                                                             start_time, end_time) + ".json.gz")
+        digest = self.fingerprint(candles, n, symbol, interval)
+        entry = self._load(path)
+        
+        resume = None
+        if entry is not None:
+            if entry['n'] == n and entry['digest'] == digest:
+                self.hits += 1
+                result = entry['result']
+                return BacktestResult.from_trades(result['trades'], result['signals'], result['blocked'])
+            checkpoint = entry.get('checkpoint')
+            if (checkpoint is not None and entry['n'] < n
+                    and self.fingerprint(candles, entry['n'], symbol, interval) == entry['digest']):
+                resume = dict(checkpoint, trades=entry['result']['trades'][:checkpoint['trades']])
+        
+        if resume is not None:
+            self.resumed += 1
+        else:
+            self.misses += 1
+        result = backtester.run(resume)
+        
+        self._save(path, {
+            'n': n,
+            'digest': digest,
+            'result': {'trades': result.trades, 'signals': result.signals, 'blocked': result.blocked},
+            'checkpoint': backtester.checkpoint,
+        })
+        return result
+
+@contextmanager
+def config_override(params: Dict[str, Any]):
+    """Aplica parámetros sobre CONFIG y los restaura al salir (no thread-safe)."""
+    previous = {key: getattr(CONFIG, key) for key in params}
+    try:
+        for key, value in params.items():
+            setattr(CONFIG, key, value)
+        yield CONFIG
+    finally:
+        for key, value in previous.items():
+            setattr(CONFIG, key, value)
+
+class ParameterSweep:
+    """
+    Barrido de parámetros multi-proceso sobre el histórico local (NUEVO v1.4).
+    
+    - Cada worker abre el KlineStore por mmap en su initializer: las velas se
+      comparten vía page cache del SO, nunca se picklean por tarea.
+    - Las configuraciones se agrupan por (RSI_PERIOD, EMA_PERIOD) y cada lote
+      va a un solo worker, que reutiliza las series memoizadas.
+    - Los resultados se escriben en JSON lines a medida que llegan.
+    """
+    
+    DEFAULT_GRID: Dict[str, List[Any]] = {
+        'RSI_PERIOD': [9, 14, 21, 28, 34],
+        'RSI_OVERSOLD': [15, 20, 25, 30],
+        'RSI_OVERBOUGHT': [70, 75, 80, 85],
+        'TAKE_PROFIT_PCT': [0.3, 0.5, 0.8, 1.0],
+        'STOP_LOSS_PCT': [0.5, 0.8, 1.0, 1.5],
+        'EMA_PERIOD': [100, 200],
+        'strict_session': [True, False],
+    }
+    BATCH_SIZE = 64
+    
+    _worker_candles: Optional[Candles] = None      # Estado por proceso worker
+    _worker_source: Tuple[str, str] = ("", "")
+    _worker_cache: Optional[BacktestCache] = None
+    
+    def __init__(self, grid: Optional[Dict[str, List[Any]]] = None,
+                 symbol: Optional[str] = None, interval: Optional[str] = None,
+                 start_time: Optional[int] = None, end_time: Optional[int] = None,
+                 directory: Optional[str] = None, use_cache: bool = True):
+        self.grid = grid or self.DEFAULT_GRID
+        for key in self.grid:
+            if key != 'strict_session' and not hasattr(CONFIG, key):
+                raise ValueError(f"Parámetro desconocido en el grid: {key}")
+        self.symbol = symbol or CONFIG.SYMBOL
+        self.interval = interval or CONFIG.TIMEFRAME
+        self.start_time = start_time
+        self.end_time = end_time
+        self.directory = directory or CONFIG.HISTORY_DIR
+        self.use_cache = use_cache
+    
+    def configs(self, samples: Optional[int] = None, seed: int = 42) -> List[Dict[str, Any]]:
+        """Producto cartesiano del grid o `samples` combinaciones aleatorias."""
+        keys = list(self.grid)
+        if samples is None:
+            return [dict(zip(keys, values)) for values in itertools.product(*(self.grid[k] for k in keys))]
+        rnd = random.Random(seed)
+        return [{k: rnd.choice(self.grid[k]) for k in keys} for _ in range(samples)]
+    
+    def batches(self, configs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Lotes que no mezclan períodos: cada lote reutiliza sus series."""
+        def group(params):
+            return (params.get('RSI_PERIOD', CONFIG.RSI_PERIOD), params.get('EMA_PERIOD', CONFIG.EMA_PERIOD))
+        
+        batches = []
+        for _, members in itertools.groupby(sorted(configs, key=group), key=group):
+            members = list(members)
+            for i in range(0, len(members), self.BATCH_SIZE):
+                batches.append(members[i:i + self.BATCH_SIZE])
+        return batches
+    
+    @staticmethod
+    def _init_worker(symbol: str, interval: str, directory: str,
+                     start_time: Optional[int], end_time: Optional[int], use_cache: bool):
+        store = KlineStore(symbol, interval, directory)
+        ParameterSweep._worker_candles = store.read(start_time, end_time)
+        ParameterSweep._worker_source = (symbol, interval)
+        ParameterSweep._worker_cache = BacktestCache(os.path.join(directory, "backtest_cache")) if use_cache else None
+    
+    @staticmethod
+    def _backtest(params: Dict[str, Any], start_index: int = 0,
+                  end_index: Optional[int] = None) -> BacktestResult:
+        candles = ParameterSweep._worker_candles
+        symbol, interval = ParameterSweep._worker_source
+        cache = ParameterSweep._worker_cache
+        overrides = {k: v for k, v in params.items() if k != 'strict_session'}
+        strict = params.get('strict_session', True)
+        with config_override(overrides):
+            if cache is not None:
+                return cache.run(candles, strict, symbol, interval, start_index, end_index)
+            return Backtester(candles, strict, symbol, interval, start_index, end_index).run()
+    
+    @staticmethod
+    def _run_batch(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [{'params': params, **ParameterSweep._backtest(params).summary()} for params in batch]
+    
+    @staticmethod
+    def _run_batch_windows(batch: List[Dict[str, Any]],
+                           windows: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """Cada configuración sobre varias ventanas (mismas series memoizadas)."""
+        return [
+            {'params': params,
+             'windows': [ParameterSweep._backtest(params, lo, hi).summary() for lo, hi in windows]}
+            for params in batch
+        ]
+    
+    def _pool(self, workers: Optional[int]) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            initializer=ParameterSweep._init_worker,
+            initargs=(self.symbol, self.interval, self.directory, self.start_time, self.end_time,
+                      self.use_cache)
+        )
+    
+    def run(self, output_path: str, samples: Optional[int] = None,
+            workers: Optional[int] = None, seed: int = 42) -> int:
+        """Ejecuta el barrido y escribe una línea JSON por configuración."""
+        configs = self.configs(samples, seed)
+        batches = self.batches(configs)
+        written = 0
+        
+        with open(output_path, 'w') as out, self._pool(workers) as pool:
+            futures = [pool.submit(ParameterSweep._run_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                for row in future.result():
+                    out.write(json.dumps(row) + "\n")
+                    written += 1
+                out.flush()
+                LOG.info("Sweep: %d/%d configuraciones", written, len(configs),
+                         extra={'sample_key': 'sweep_progress'})
+        return written
+
+class WalkForward:
+    """
+    Validación walk-forward (rolling origin) sobre el histórico local (NUEVO v1.4).
+    
+    Divide los datos en folds train/test consecutivos, elige en cada train
+    la mejor configuración del grid y la evalúa fuera de muestra en el test
+    siguiente. Cada configuración se evalúa en TODAS las ventanas dentro del
+    mismo worker, con las series calculadas una sola vez sobre la serie
+    completa: el coste total es cercano a una pasada por configuración.
+    """
+    
+    DAY_MS = 86_400_000
+    
+    def __init__(self, grid: Optional[Dict[str, List[Any]]] = None,
+                 train_days: int = 180, test_days: int = 30,
+                 symbol: Optional[str] = None, interval: Optional[str] = None,
+                 directory: Optional[str] = None, min_trades: int = 10, use_cache: bool = True):
+        self.sweep = ParameterSweep(grid, symbol, interval, directory=directory, use_cache=use_cache)
+        self.train_days = train_days
+        self.test_days = test_days
+        self.min_trades = min_trades
+    
+    def folds(self, candles: Candles) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """[((train_lo, train_hi), (test_lo, test_hi)), ...] en índices de vela."""
+        if not len(candles):
+            return []
+        folds = []
+        origin = candles.timestamp[0]
+        end = candles.timestamp[-1]
+        while True:
+            train_end = origin + self.train_days * self.DAY_MS
+            test_end = train_end + self.test_days * self.DAY_MS
+            if test_end > end + 1:
+                break
+            folds.append((
+                (candles.index_of(origin), candles.index_of(train_end)),
+                (candles.index_of(train_end), candles.index_of(test_end))
+            ))
+            origin += self.test_days * self.DAY_MS
+        return folds
+    
+    def _score(self, summary: Dict) -> Tuple[float, float]:
+        """Mayor profit factor (sin pérdidas = infinito), desempate por PnL."""
+        if summary['total_trades'] < self.min_trades:
+            return (-1.0, summary['total_pnl'])
+        pf = summary['profit_factor']
+        return (float('inf') if pf is None else pf, summary['total_pnl'])
+    
+    def run(self, samples: Optional[int] = None, workers: Optional[int] = None,
+            seed: int = 42) -> Dict[str, Any]:
+        sweep = self.sweep
+        candles = KlineStore(sweep.symbol, sweep.interval, sweep.directory).read(sweep.start_time, sweep.end_time)
+        folds = self.folds(candles)
+        if not folds:
+            raise ValueError("Histórico insuficiente para un fold train+test")
+        windows = [window for fold in folds for window in fold]
+        
+        rows = []
+        with sweep._pool(workers) as pool:
+            futures = [pool.submit(ParameterSweep._run_batch_windows, batch, windows)
+                       for batch in sweep.batches(sweep.configs(samples, seed))]
+            for future in as_completed(futures):
+                rows.extend(future.result())
+        
+        report_folds = []
+        for f, ((train_lo, _), (test_lo, test_hi)) in enumerate(folds):
+            best = max(rows, key=lambda row: self._score(row['windows'][2 * f]))
+            report_folds.append({
+                'train_start': candles.timestamp[train_lo],
+                'test_start': candles.timestamp[test_lo],
+                'test_end': candles.close_time[test_hi - 1],
+                'params': best['params'],
+                'train': best['windows'][2 * f],
+                'test': best['windows'][2 * f + 1],
+            })
+        
+        tests = [fold['test'] for fold in report_folds]
+        win_rates = [t['win_rate'] for t in tests if t['total_trades']]
+        factors = [t['profit_factor'] for t in tests if t['profit_factor'] is not None]
+        total = sum(t['total_trades'] for t in tests)
+        
+        def spread(values: List[float]) -> Dict[str, Optional[float]]:
+            if not values:
+                return {'mean': None, 'stdev': None, 'min': None, 'max': None}
+            return {
+                'mean': round(statistics.fmean(values), 3),
+                'stdev': round(statistics.stdev(values), 3) if len(values) > 1 else 0.0,
+                'min': min(values),
+                'max': max(values),
+            }
+        
+        return {
+            'folds': report_folds,
+            'out_of_sample': {
+                'trades': total,
+                'win_rate': round(sum(t['wins'] for t in tests) / total * 100, 2) if total else 0.0,
+                'total_pnl': round(sum(t['total_pnl'] for t in tests), 2),
+                'win_rate_by_fold': spread(win_rates),
+                'profit_factor_by_fold': spread(factors),
+            },
+            'configs': len(rows),
+        }
+
+class MonteCarlo:
+    """
+    Bootstrap de secuencias de trades para medir riesgo (NUEVO v1.4).
+    
+    Remuestrea con reemplazo los resultados (retorno neto sobre nocional)
+    del backtest o del journal y simula secuencias de `horizon` trades con
+    el tamaño de PositionCalculator (RISK_PER_TRADE_PCT, LEVERAGE) aplicado
+    sobre el equity actual. Mide max drawdown, racha perdedora más larga y
+    riesgo de ruina. Vectorizado con NumPy si está disponible y repartido
+    en procesos por bloques con semillas independientes (determinista).
+    """
+    
+    CHUNK_SIMS = 50_000
+    
+    def __init__(self, moves: List[float], horizon: Optional[int] = None, ruin_pct: float = 50.0):
+        if not moves:
+            raise ValueError("Sin trades para simular")
+        self.moves = list(moves)
+        self.horizon = horizon or len(self.moves)
+        self.ruin_pct = ruin_pct
+    
+    @staticmethod
+    def moves_from_backtest(result: BacktestResult) -> List[float]:
+        """Retorno neto por trade sobre el nocional (incluye fees)."""
+        fee = CONFIG.FEE_ROUND_TRIP_PCT / 100
+        moves = []
+        for t in result.trades:
+            move = (t['exit'] - t['entry']) / t['entry']
+            moves.append((move if t['type'] == 'LONG' else -move) - fee)
+        return moves
+    
+    @staticmethod
+    def moves_from_journal(directory: Optional[str] = None) -> List[float]:
+        """Retorno por trade cerrado de todos los días del journal (pnl / nocional)."""
+        directory = directory or CONFIG.JOURNAL_DIR
+        moves = []
+        if not os.path.isdir(directory):
+            return moves
+        # v1.4: con backend SQLite (incluye los días migrados) basta una consulta indexada
+        db_path = os.path.join(directory, SQLiteJournalManager.DB_NAME)
+        if CONFIG.JOURNAL_BACKEND == 'sqlite' and os.path.exists(db_path):
+            journal = SQLiteJournalManager(path=db_path)
+            try:
+                return [t['pnl'] / t['position_size'] for t in journal.closed_trades()
+                        if t.get('position_size')]
+            finally:
+                journal.close()
+        for name in sorted(os.listdir(directory)):
+            if not (name.startswith('journal_') and name.endswith('.json')):
+                continue
+            with open(os.path.join(directory, name), 'r') as f:
+                data = json.load(f)
+            for t in data.get('trades', []):
+                if t.get('status') == 'CLOSED' and t.get('position_size'):
+                    moves.append(t['pnl'] / t['position_size'])
+        return moves
+    
+    @staticmethod
+    def position_fraction() -> float:
+        """Nocional por trade como fracción del capital (según CONFIG)."""
+        position_size, _, _ = PositionCalculator.calculate_position_size()
+        return position_size / CONFIG.CAPITAL_TOTAL if CONFIG.CAPITAL_TOTAL else 0.0
+    
+    @staticmethod
+    def _simulate(moves: List[float], fraction: float, horizon: int, sims: int,
+                  seed: int, use_numpy: bool):
+        """Un bloque de simulaciones: (max_dd %, racha máxima, retorno final %)."""
+        if use_numpy and np is not None:
+            rng = np.random.default_rng(seed)
+            values = np.asarray(moves)
+            # Solo hay len(moves) valores distintos: log y signo se calculan una vez
+            log_growth = np.log(np.maximum(1 + fraction * values, 1e-12))
+            is_loss = values <= 0
+            picks = rng.integers(0, len(moves), size=(sims, horizon), dtype=np.int32)
+            
+            log_equity = np.cumsum(log_growth[picks], axis=1)
+            peak = np.maximum(np.maximum.accumulate(log_equity, axis=1), 0.0)
+            drawdown = (1 - np.exp((log_equity - peak).min(axis=1))) * 100
+            
+            losses = is_loss[picks]
+            count = np.cumsum(losses, axis=1, dtype=np.int32)
+            reset = np.maximum.accumulate(np.where(losses, 0, count), axis=1)
+            streak = (count - reset).max(axis=1)
+            
+            final = (np.exp(log_equity[:, -1]) - 1) * 100
+            return drawdown, streak, final
+        
+        rnd = random.Random(seed)
+        n = len(moves)
+        drawdown, streak, final = array('d'), array('l'), array('d')
+        for _ in range(sims):
+            equity = peak = 1.0
+            max_dd = 0.0
+            run = longest = 0
+            for _ in range(horizon):
+                move = moves[int(rnd.random() * n)]
+                equity *= max(1 + fraction * move, 1e-12)
+                if equity > peak:
+                    peak = equity
+                elif 1 - equity / peak > max_dd:
+                    max_dd = 1 - equity / peak
+                if move <= 0:
+                    run += 1
+                    if run > longest:
+                        longest = run
+                else:
+                    run = 0
+            drawdown.append(max_dd * 100)
+            streak.append(longest)
+            final.append((equity - 1) * 100)
+        return drawdown, streak, final
+    
+    @staticmethod
+    def _percentiles(values, qs=(50, 90, 95, 99)) -> Dict[str, float]:
+        ordered = np.sort(values) if np is not None and isinstance(values, np.ndarray) else sorted(values)
+        last = len(ordered) - 1
+        return {f"p{q}": round(float(ordered[min(last, int(round(q / 100 * last)))]), 3) for q in qs}
+    
+    def run(self, sims: Optional[int] = None, workers: Optional[int] = None,
+            seed: int = 42) -> Dict[str, Any]:
+        use_numpy = HAS_NUMPY
+        sims = sims or (1_000_000 if use_numpy else 100_000)
+        fraction = self.position_fraction()
+        chunks = [min(self.CHUNK_SIMS, sims - i) for i in range(0, sims, self.CHUNK_SIMS)]
+        started = time.perf_counter()
+        
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [
+                pool.submit(MonteCarlo._simulate, self.moves, fraction, self.horizon,
+                            size, seed * 1_000_003 + k, use_numpy)
+                for k, size in enumerate(chunks)
+            ]
+            parts = [future.result() for future in futures]
+        
+        if use_numpy:
+            drawdown, streak, final = (np.concatenate([part[i] for part in parts]) for i in range(3))
+            streak_hits = int((streak >= CONFIG.MAX_CONSECUTIVE_LOSSES).sum())
+            ruined = int((drawdown >= self.ruin_pct).sum())
+        else:
+            drawdown, streak, final = ([x for part in parts for x in part[i]] for i in range(3))
+            streak_hits = sum(1 for x in streak if x >= CONFIG.MAX_CONSECUTIVE_LOSSES)
+            ruined = sum(1 for x in drawdown if x >= self.ruin_pct)
+        
+        wins = sum(1 for m in self.moves if m > 0)
+        return {
+            'sims': sims,
+            'horizon_trades': self.horizon,
+            'sample_trades': len(self.moves),
+            'sample_win_rate': round(wins / len(self.moves) * 100, 2),
+            'position_fraction': round(fraction, 4),
+            'max_drawdown_pct': self._percentiles(drawdown),
+            'longest_losing_streak': self._percentiles(streak),
+            'p_streak_ge_limit': round(streak_hits / sims, 4),
+            'risk_of_ruin': round(ruined / sims, 5),
+            'final_return_pct': self._percentiles(final, (5, 50, 95)),
+            'elapsed_sec': round(time.perf_counter() - started, 2),
+        }
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ⏩  SECCIÓN 10.6: REPLAY ACELERADO DEL MODO NUBE (NUEVO v1.4)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ReplayDataEngine:
+    """
+    Sustituto de DataEngine que sirve velas grabadas según un VirtualClock.
+    
+    Solo devuelve lo que existía en el instante virtual: velas cerradas más
+    la vela en formación. Dentro de la vela el precio sigue una trayectoria
+    lineal O→L→H→C (alcista) u O→H→L→C (bajista); el mark price y el high/
+    low parcial salen de esa trayectoria. Intervalos mayores (1h para la
+    EMA) se agregan desde las velas base.
+    """
+    
+    CONCURRENT = False      # Todo en memoria: el ciclo no usa threads
+    
+    def __init__(self, candles: Candles, clock: VirtualClock, interval: Optional[str] = None):
+        self.candles = candles
+        self.clock = clock
+        self.interval = interval or CONFIG.TIMEFRAME
+        self.interval_ms = DataEngine.INTERVAL_MS[self.interval]
+        self._aggregated: Dict[str, Candles] = {}
+    
+    def _series(self, interval: str) -> Candles:
+        if interval == self.interval:
+            return self.candles
+        series = self._aggregated.get(interval)
+        if series is None:
+            series = self._aggregated[interval] = self.aggregate(
+                self.candles, DataEngine.INTERVAL_MS[interval])
+        return series
+    
+    @staticmethod
+    def aggregate(candles: Candles, interval_ms: int) -> Candles:
+        """Agrupa velas base en velas de interval_ms (alineadas a UTC)."""
+        rows: List[Dict] = []
+        for i in range(len(candles)):
+            ts = candles.timestamp[i]
+            start = ts - ts % interval_ms
+            if rows and rows[-1]['timestamp'] == start:
+                row = rows[-1]
+                row['high'] = max(row['high'], candles.high[i])
+                row['low'] = min(row['low'], candles.low[i])
+                row['close'] = candles.close[i]
+                row['volume'] += candles.volume[i]
+            else:
+                rows.append({'timestamp': start, 'open': candles.open[i], 'high': candles.high[i],
+                             'low': candles.low[i], 'close': candles.close[i],
+                             'volume': candles.volume[i], 'close_time': start + interval_ms - 1})
+        return Candles.from_dicts(rows)
+    
+    def _path(self, index: int, now_ms: int) -> Tuple[float, float, float]:
+        """(precio, high parcial, low parcial) de la vela base `index` en now_ms."""
+        c = self.candles
+        o, h, l, close = c.open[index], c.high[index], c.low[index], c.close[index]
+        points = (o, l, h, close) if close >= o else (o, h, l, close)
+        legs = (now_ms - c.timestamp[index]) / self.interval_ms * 3
+        leg = min(int(legs), 2)
+        price = points[leg] + (points[leg + 1] - points[leg]) * (legs - leg)
+        visited = points[:leg + 1] + (price,)
+        return price, max(visited), min(visited)
+    
+    def _forming(self, open_time: int, interval_ms: int, now_ms: int) -> Optional[Dict]:
+        """Vela [open_time, open_time + interval_ms) tal como se veía en now_ms."""
+        c = self.candles
+        lo = c.index_of(open_time)
+        hi = c.index_of(now_ms - self.interval_ms + 1)     # Velas base ya cerradas
+        if lo >= len(c) or c.timestamp[lo] > now_ms:
+            return None
+        
+        high, low = max(c.high[lo:hi], default=float('-inf')), min(c.low[lo:hi], default=float('inf'))
+        volume = sum(c.volume[lo:hi])
+        close = c.close[hi - 1] if hi > lo else c.open[lo]
+        if hi < len(c) and c.timestamp[hi] <= now_ms:
+            close, path_high, path_low = self._path(hi, now_ms)
+            high, low = max(high, path_high), min(low, path_low)
+            volume += c.volume[hi] * (now_ms - c.timestamp[hi]) / self.interval_ms
+        return {'timestamp': open_time, 'open': c.open[lo], 'high': high, 'low': low,
+                'close': close, 'volume': volume, 'close_time': open_time + interval_ms - 1}
+    
+    def get_klines(self, symbol: str, interval: str, limit: int = 100, start_time: Optional[int] = None,
+                   deadline: Optional[float] = None,
+                   priority: RequestPriority = RequestPriority.CRITICAL) -> Optional[Candles]:
+        now_ms = int(self.clock.time() * 1000)
+        interval_ms = DataEngine.INTERVAL_MS[interval]
+        series = self._series(interval)
+        closed = series.index_of(now_ms - interval_ms + 1)
+        forming = self._forming(now_ms - now_ms % interval_ms, interval_ms, now_ms)
+        
+        if start_time is None:
+            lo = max(0, closed - (limit - 1 if forming else limit))
+        else:
+            lo = series.index_of(start_time)
+        hi = min(closed, lo + limit)
+        candles = series[lo:hi]
+        if forming and hi - lo < limit and (start_time is None or forming['timestamp'] >= start_time):
+            candles = Candles.concat([candles, Candles.from_dicts([forming])])
+        return candles if len(candles) else None
+    
+    def get_current_price(self, symbol: str, deadline: Optional[float] = None,
+                          priority: RequestPriority = RequestPriority.NORMAL) -> Optional[float]:
+        now_ms = int(self.clock.time() * 1000)
+        c = self.candles
+        i = c.index_of(now_ms - self.interval_ms + 1)
+        if i < len(c) and c.timestamp[i] <= now_ms:
+            return self._path(i, now_ms)[0]
+        return c.close[i - 1] if i > 0 else None
+
+class Replay:
+    """
+    Ejecuta run_cloud_mode sobre velas grabadas con reloj virtual (NUEVO v1.4).
+    
+    Las esperas del bucle (incluido el backoff de DataEngine) avanzan el
+    reloj al instante, así que el throughput del bucle completo (análisis +
+    disparos + journal) es medible y determinista. Un mes de mercado son
+    ~60.000 ciclos: del orden de 10 s. Telegram y sonido se desactivan;
+    señales y trades van a un MemoryJournal.
+    """
+    
+    def __init__(self, candles: Candles, days: Optional[int] = None,
+                 interval: Optional[str] = None, quiet: bool = True):
+        self.candles = candles
+        self.interval = interval or CONFIG.TIMEFRAME
+        self.quiet = quiet
+        # Calentamiento: suficientes horas cerradas para sembrar la EMA H1
+        warmup = (CONFIG.EMA_PERIOD + 24) * Backtester.HOUR_MS
+        self.end = candles.close_time[-1] + 1
+        self.start = candles.timestamp[0] + warmup
+        if days:
+            self.start = max(self.start, self.end - days * Backtester.DAY_MS)
+    
+    def run(self) -> Dict[str, Any]:
+        if self.start >= self.end:
+            raise ValueError("Histórico insuficiente para el calentamiento de la EMA")
+        clock = VirtualClock(self.start / 1000, self.end / 1000)
+        data = ReplayDataEngine(self.candles, clock, self.interval)
+        journal = MemoryJournal(clock.now)
+        
+        level = LOG.level
+        if self.quiet:
+            LOG.setLevel(logging.WARNING)
+        previous_clock, DataEngine.CLOCK = DataEngine.CLOCK, clock
+        started = time.perf_counter()
+        try:
+            with config_override({'TELEGRAM_BOT_TOKEN': '', 'SOUND_ENABLED': False}):
+                engine = RSIMasterEngine(clock, data, journal)
+                engine.run_cloud_mode()
+        except ReplayFinished:
+            pass
+        finally:
+            DataEngine.CLOCK = previous_clock
+            LOG.setLevel(level)
+        elapsed = time.perf_counter() - started
+        
+        virtual_sec = min(clock.time(), self.end / 1000) - self.start / 1000
+        signals = [s for day in journal.days.values() for s in day['signals_detected']]
+        cycles = engine.detector.cycles
+        return {
+            'start': datetime.fromtimestamp(self.start / 1000, CONFIG.USER_TZ).isoformat(),
+            'end': datetime.fromtimestamp(self.end / 1000, CONFIG.USER_TZ).isoformat(),
+            'virtual_days': round(virtual_sec / 86400, 2),
+            'real_sec': round(elapsed, 3),
+            'speedup': round(virtual_sec / elapsed) if elapsed > 0 else None,
+            'cycles': cycles,
+            'cycles_per_sec': round(cycles / elapsed, 1) if elapsed > 0 else None,
+            'signals': len(signals),
+            'signal_log': [{'time': datetime.fromtimestamp(s['timestamp'], CONFIG.USER_TZ).isoformat(),
+                            'type': s['type'], 'rsi': round(s['rsi'], 2), 'price': s['price']}
+                           for s in signals],
+        }
+
 # ══════════════════════════════════════════════════════════════════════════════
 # 🚀  MAIN
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1726,13 +5285,120 @@ def main():
     # 1. Check CLI arguments
     parser = argparse.ArgumentParser(description='RSI Mean Reversion Master')
     parser.add_argument('--cloud', action='store_true', help='Ejecutar en modo nube (headless/automático)')
+    parser.add_argument('--stream', action='store_true', help='Modo nube con datos push por WebSocket (requiere --cloud)')
+    parser.add_argument('--backfill', type=int, metavar='DIAS', help='Descargar histórico de velas a disco (rsi_history/)')
+    parser.add_argument('--symbol', default=CONFIG.SYMBOL, help='Símbolo para herramientas de histórico')
+    parser.add_argument('--interval', default=CONFIG.TIMEFRAME, help='Intervalo para herramientas de histórico')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help='Nivel de log')
+    parser.add_argument('--log-json', action='store_true', help='Logs en formato JSON lines')
+    parser.add_argument('--backtest', type=int, nargs='?', const=0, metavar='DIAS',
+                        help='Backtest sobre el histórico local (DIAS=0 o vacío: todo el histórico)')
+    parser.add_argument('--no-cache', action='store_true', help='No usar la cache de resultados de backtest')
+    parser.add_argument('--relaxed', action='store_true', help='Backtest en modo relajado (cualquier sesión salvo overlap)')
+    parser.add_argument('--sweep', nargs='?', const='', metavar='GRID.json',
+                        help='Barrido de parámetros sobre el histórico local (vacío: grid por defecto)')
+    parser.add_argument('--sweep-out', default='sweep_results.jsonl', help='Salida JSON lines del barrido')
+    parser.add_argument('--samples', type=int, help='Búsqueda aleatoria: número de combinaciones')
+    parser.add_argument('--workers', type=int, help='Procesos para el barrido (por defecto: todos los núcleos)')
+    parser.add_argument('--walk-forward', nargs='?', const='', metavar='GRID.json',
+                        help='Validación walk-forward sobre el histórico local (vacío: grid por defecto)')
+    parser.add_argument('--train-days', type=int, default=180, help='Días de cada ventana de entrenamiento')
+    parser.add_argument('--test-days', type=int, default=30, help='Días de cada ventana fuera de muestra')
+    parser.add_argument('--monte-carlo', type=int, nargs='?', const=0, metavar='SIMS',
+                        help='Monte Carlo de drawdown/rachas sobre trades del backtest (o --mc-journal)')
+    parser.add_argument('--mc-journal', action='store_true', help='Monte Carlo sobre los trades cerrados del journal')
+    parser.add_argument('--horizon', type=int, help='Trades por secuencia simulada (por defecto: tamaño de la muestra)')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='Reproducir el modo nube sobre velas grabadas (.bin de --backfill) con reloj virtual')
+    parser.add_argument('--replay-days', type=int, help='Días finales del archivo a reproducir (por defecto: todo)')
+    parser.add_argument('--migrate-journal', action='store_true',
+                        help='Importar los journal_*.json a la base SQLite (rsi_journal/journal.db) y usarla como journal')
     args = parser.parse_args()
     
+    setup_logging(args.log_level, args.log_json)
+    
+    if args.backfill:
+        store = KlineStore(args.symbol, args.interval)
+        added = store.backfill(args.backfill)
+        print(f"✅ {added} velas añadidas. Total en {store.path}: {len(store)}")
+        return
+    
+    if args.backtest is not None:
+        store = KlineStore(args.symbol, args.interval)
+        last = store.last_open_time()
+        if last is None:
+            print(f"❌ Sin histórico en {store.path}. Ejecuta primero --backfill DIAS")
+            return
+        start = last - args.backtest * 86_400_000 if args.backtest else None
+        candles = store.read(start)
+        if args.no_cache:
+            result = Backtester(candles, strict_session=not args.relaxed,
+                                symbol=args.symbol, interval=args.interval).run()
+        else:
+            result = BacktestCache().run(candles, not args.relaxed, args.symbol, args.interval)
+        print(json.dumps(result.summary(), indent=2))
+        return
+    
+    if args.sweep is not None:
+        grid = None
+        if args.sweep:
+            with open(args.sweep, 'r') as f:
+                grid = json.load(f)
+        sweep = ParameterSweep(grid, args.symbol, args.interval, use_cache=not args.no_cache)
+        started = time.perf_counter()
+        written = sweep.run(args.sweep_out, samples=args.samples, workers=args.workers)
+        print(f"✅ {written} configuraciones en {time.perf_counter() - started:.1f}s → {args.sweep_out}")
+        return
+    
+    if args.walk_forward is not None:
+        grid = None
+        if args.walk_forward:
+            with open(args.walk_forward, 'r') as f:
+                grid = json.load(f)
+        walk = WalkForward(grid, args.train_days, args.test_days, args.symbol, args.interval,
+                           use_cache=not args.no_cache)
+        report = walk.run(samples=args.samples, workers=args.workers)
+        print(json.dumps(report, indent=2))
+        return
+    
+    if args.monte_carlo is not None:
+        if args.mc_journal:
+            moves = MonteCarlo.moves_from_journal()
+        else:
+            candles = KlineStore(args.symbol, args.interval).read()
+            result = Backtester(candles, strict_session=not args.relaxed,
+                                symbol=args.symbol, interval=args.interval).run()
+            moves = MonteCarlo.moves_from_backtest(result)
+        if not moves:
+            print("❌ Sin trades para simular (¿histórico o journal vacío?)")
+            return
+        report = MonteCarlo(moves, args.horizon).run(args.monte_carlo or None, args.workers)
+        print(json.dumps(report, indent=2))
+        return
+    
+    if args.replay:
+        candles = KlineStore(args.symbol, args.interval, path=args.replay).read()
+        if not len(candles):
+            print(f"❌ Sin velas en {args.replay}")
+            return
+        report = Replay(candles, args.replay_days, args.interval, quiet=args.log_level != 'DEBUG').run()
+        print(json.dumps(report, indent=2))
+        return
+    
+    if args.migrate_journal:
+        journal = SQLiteJournalManager()
+        imported = journal.migrate_json()
+        journal.close()
+        CONFIG.JOURNAL_BACKEND = 'sqlite'
+        CONFIG.save()
+        print(f"✅ {imported} días importados a {journal.path} (JOURNAL_BACKEND=sqlite en config.json)")
+        return
+    
     engine = RSIMasterEngine()
     
     # 2. Run Cloud Mode if flag is set
     if args.cloud:
-        engine.run_cloud_mode()
+        engine.run_cloud_mode(stream=args.stream)
         return
 
     # 3. Interactive Mode (Default)
@@ -0,0 +1,82 @@
+import os
+import sys
+import random
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import rsi_mean_reversion_master as rsi  # noqa: E402
+
+
+START_MS = 1_699_999_200_000    # Múltiplo de 1h: velas alineadas a UTC
+JOURNAL_START = datetime(2026, 3, 2, 9, 0, tzinfo=rsi.CONFIG.USER_TZ)    # Lunes 09:00 local
+
+
+def random_walk(n: int, seed: int = 7, interval_ms: int = 900_000, start: int = START_MS) -> rsi.Candles:
+    """Velas sintéticas reproducibles (paseo aleatorio con mechas)."""
+    rnd = random.Random(seed)
+    price = 40000.0
+    rows = []
+    for i in range(n):
+        o = price
+        price = max(1000.0, price * (1 + rnd.gauss(0, 0.0025)))
+        high = max(o, price) * (1 + abs(rnd.gauss(0, 0.0012)))
+        low = min(o, price) * (1 - abs(rnd.gauss(0, 0.0012)))
+        ts = start + i * interval_ms
+        rows.append([ts, repr(o), repr(high), repr(low), repr(price), '1', ts + interval_ms - 1])
+    return rsi.Candles.from_binance(rows)
+
+
+class ManualClock:
+    """Reloj que solo avanza a mano (`clock.now += ...`)."""
+    
+    def __init__(self, now):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def make_candles():
+    return random_walk
+
+
+@pytest.fixture
+def make_clock():
+    """Fábrica de relojes manuales: datetime para journal/sesiones, float para relojes monotónicos."""
+    def make(now=JOURNAL_START) -> ManualClock:
+        return ManualClock(now)
+    return make
+
+
+@pytest.fixture
+def wide_levels():
+    """Niveles 33/67: el paseo aleatorio cruza lo bastante para generar trades."""
+    with rsi.config_override({'RSI_OVERSOLD': 33, 'RSI_OVERBOUGHT': 67}) as config:
+        yield config
+
+
+@pytest.fixture
+def tmp_config(tmp_path):
+    """CONFIG con directorios temporales (journal, histórico)."""
+    with rsi.config_override({'JOURNAL_DIR': str(tmp_path / 'journal'),
+                              'HISTORY_DIR': str(tmp_path / 'history')}) as config:
+        yield config
+
+
+@pytest.fixture
+def local_api():
+    """DataEngine apuntando a un StandInBinanceServer durante el test."""
+    from bench.standin import StandInBinanceServer
+    with StandInBinanceServer() as server:
+        previous = rsi.DataEngine.BASE_URL, rsi.DataEngine.MIRROR_URLS
+        rsi.DataEngine.BASE_URL, rsi.DataEngine.MIRROR_URLS = server.base_url, []
+        try:
+            yield server
+        finally:
+            rsi.DataEngine.BASE_URL, rsi.DataEngine.MIRROR_URLS = previous
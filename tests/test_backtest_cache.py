@@ -0,0 +1,49 @@
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+DAY = 96
+
+
+def comparable(result):
+    summary = result.summary()
+    del summary['elapsed_ms']
+    return summary, result.trades
+
+
+@pytest.mark.parametrize('strict', [True, False])
+def test_resume_matches_full_run(make_candles, tmp_path, wide_levels, strict):
+    candles = make_candles(90 * DAY, seed=17)
+    cache = rsi.BacktestCache(str(tmp_path))
+    
+    for days in (40, 41, 65, 90):       # Backfill incremental: el mismo prefijo crece
+        prefix = candles[:days * DAY]
+        result = cache.run(prefix, strict)
+        assert comparable(result) == comparable(rsi.Backtester(prefix, strict).run())
+    assert (cache.misses, cache.resumed, cache.hits) == (1, 3, 0)
+    
+    cache.run(candles, strict)
+    assert cache.hits == 1
+
+
+def test_changed_prefix_is_a_miss(make_candles, tmp_path, wide_levels):
+    candles = make_candles(50 * DAY, seed=17)
+    cache = rsi.BacktestCache(str(tmp_path))
+    cache.run(candles[:30 * DAY])
+    
+    rows = candles.to_dicts()
+    rows[10]['close'] *= 1.01       # Vela corregida dentro del prefijo cacheado
+    changed = rsi.Candles.from_dicts(rows)
+    result = cache.run(changed)
+    assert cache.misses == 2 and cache.resumed == 0
+    assert comparable(result) == comparable(rsi.Backtester(changed).run())
+
+
+def test_config_change_is_a_different_entry(make_candles, tmp_path, wide_levels):
+    candles = make_candles(30 * DAY, seed=17)
+    cache = rsi.BacktestCache(str(tmp_path))
+    cache.run(candles)
+    with rsi.config_override({'TAKE_PROFIT_PCT': 0.8}):
+        cache.run(candles)
+    cache.run(candles)
+    assert (cache.misses, cache.hits) == (2, 1)
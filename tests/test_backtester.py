@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+DAY = 96     # Velas de 15m por día
+
+
+@pytest.mark.parametrize('converged', [False, True])
+def test_backtest_trades_are_consistent(make_candles, wide_levels, converged):
+    candles = make_candles(40 * DAY, seed=7)
+    with rsi.config_override({'RSI_CONVERGED': converged}):
+        result = rsi.Backtester(candles, strict_session=False).run()
+    
+    assert result.total_trades > 0
+    assert result.total_trades == len(result.trades) == result.wins + result.losses
+    assert result.signals >= result.total_trades + sum(result.blocked.values())
+    assert result.total_pnl == pytest.approx(sum(t['pnl'] for t in result.trades), abs=0.01)
+    
+    previous_exit = None
+    for trade in result.trades:
+        assert trade['exit_time'] > trade['entry_time']
+        if previous_exit is not None:
+            assert trade['entry_time'] > previous_exit      # Una posición a la vez
+        previous_exit = trade['exit_time']
+        assert trade['exit'] == pytest.approx(trade['entry'] * (
+            1 + (1 if (trade['type'] == 'LONG') == (trade['result'] == 'WIN') else -1)
+            * (rsi.CONFIG.TAKE_PROFIT_PCT if trade['result'] == 'WIN' else rsi.CONFIG.STOP_LOSS_PCT) / 100))
+        assert (trade['pnl'] > 0) == (trade['result'] == 'WIN')
+
+
+def test_backtest_entries_follow_live_rules(make_candles, wide_levels):
+    """Cada entrada es un cruce que SignalDetector.evaluate aceptaría con el RSI en vivo."""
+    candles = make_candles(30 * DAY, seed=9)
+    result = rsi.Backtester(candles, strict_session=False).run()
+    window = rsi.CONFIG.RSI_WINDOW
+    index = {ts: i for i, ts in enumerate(candles.close_time)}
+    
+    for trade in result.trades:
+        i = index[trade['entry_time']]
+        prev = rsi.Indicators.rsi(candles[i - window + 1:i], rsi.CONFIG.RSI_PERIOD)
+        curr = rsi.Indicators.rsi(candles[i - window + 1:i + 1], rsi.CONFIG.RSI_PERIOD)
+        assert trade['rsi_at_entry'] == pytest.approx(curr, abs=1e-9)
+        analysis = rsi.SignalDetector.evaluate(prev, curr, trade['entry'], trade['ema_at_entry'])
+        assert analysis['can_trade']
+        assert analysis['signal'].value == trade['type']
+
+
+def test_strict_session_entries_in_allowed_sessions(make_candles, wide_levels):
+    candles = make_candles(90 * DAY, seed=7)
+    result = rsi.Backtester(candles, strict_session=True).run()
+    assert result.blocked['session'] > 0 and result.total_trades > 0
+    for trade in result.trades:
+        entry = datetime.fromtimestamp(trade['entry_time'] / 1000, rsi.CONFIG.USER_TZ)
+        assert rsi.SessionManager(lambda: entry).can_trade_now(True)[0]
@@ -0,0 +1,105 @@
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+PERIOD = 200
+HOUR = 3_600_000
+
+
+class CountingReplay(rsi.ReplayDataEngine):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+    
+    def get_klines(self, *args, **kwargs):
+        self.calls += 1
+        return super().get_klines(*args, **kwargs)
+
+
+@pytest.fixture
+def hourly(make_candles):
+    """SignalDetector sobre 1500 velas 1H grabadas, con el reloj a mitad de una vela."""
+    candles = make_candles(1500, seed=5, interval_ms=HOUR)
+    clock = rsi.VirtualClock((candles.timestamp[1100] + HOUR // 2) / 1000)
+    data = CountingReplay(candles, clock, interval='1h')
+    return rsi.SignalDetector(clock=clock, data=data), clock, data
+
+
+def test_seed_and_peek_match_indicator(make_candles):
+    candles = make_candles(250, interval_ms=HOUR)
+    state = rsi.EMAState.from_candles(candles[:-1], PERIOD)
+    assert state.last_timestamp == candles.timestamp[-2]
+    assert state.peek(candles.close[-1]) == rsi.Indicators.ema(candles, PERIOD)
+    assert rsi.EMAState.from_candles(candles[:PERIOD - 1], PERIOD) is None
+
+
+def test_update_vs_peek(make_candles):
+    candles = make_candles(400, interval_ms=HOUR)
+    state = rsi.EMAState.from_candles(candles[:300], PERIOD)
+    for i in range(300, 400):
+        value = state.value
+        peeked = state.peek(candles.close[i])
+        assert state.value == value                 # peek no muta
+        state.update(candles.close[i], candles.timestamp[i])
+        assert round(state.value, 2) == peeked
+        assert round(state.value, 2) == rsi.Indicators.ema(candles[:i + 1], PERIOD)
+    assert state.last_timestamp == candles.timestamp[-1]
+
+
+def test_save_load_roundtrip(tmp_path, make_candles):
+    state = rsi.EMAState.from_candles(make_candles(300, interval_ms=HOUR), PERIOD)
+    path = str(tmp_path / 'ema' / 'state.json')
+    state.save(path)
+    loaded = rsi.EMAState.load(path, PERIOD)
+    assert (loaded.value, loaded.last_timestamp) == (state.value, state.last_timestamp)
+    assert rsi.EMAState.load(path, 50) is None
+    assert rsi.EMAState.load(str(tmp_path / 'missing.json'), PERIOD) is None
+
+
+def test_window_series_matches_per_window_ema(make_candles):
+    candles = make_candles(3000, seed=11, interval_ms=HOUR)
+    closes = list(candles.close)
+    window = rsi.CONFIG.EMA_WINDOW - 1
+    series = rsi.Indicators.ema_window_series(closes, PERIOD, window)
+    assert series[:window - 1] == [None] * (window - 1)
+    for i in range(window - 1, len(closes), 13):
+        expected = rsi.EMAState.from_candles(candles[i - window + 1:i + 1], PERIOD).value
+        assert series[i] == pytest.approx(expected, rel=1e-12)
+
+
+def test_live_window_matches_v13(hourly):
+    """EMA en vivo por defecto == Indicators.ema de las 250 velas 1H de v1.3."""
+    detector, clock, data = hourly
+    for _ in range(30):
+        state = detector._advance_ema_state()
+        candles_1h = data.get_klines('BTCUSDT', '1h', 250)
+        assert state.peek(candles_1h.close[-1]) == rsi.Indicators.ema(candles_1h, PERIOD)
+        clock.sleep(17 * 60)
+
+
+def test_window_state_fetches_only_on_hour_close(hourly):
+    detector, clock, data = hourly
+    first = detector._advance_ema_state()
+    calls = data.calls
+    clock.sleep(20 * 60)                    # Misma hora
+    assert detector._advance_ema_state() is first
+    assert data.calls == calls
+    clock.sleep(HOUR / 1000)                # Cerró una vela
+    assert detector._advance_ema_state().last_timestamp == first.last_timestamp + HOUR
+    assert data.calls > calls
+
+
+def test_converged_state_advances_with_deltas(hourly):
+    detector, clock, data = hourly
+    with rsi.config_override({'EMA_CONVERGED': True}):
+        state = detector._advance_ema_state()
+        seed_start = data.candles.index_of(state.last_timestamp) - detector.EMA_SEED_CANDLES + 2
+        calls = data.calls
+        for hours in (1, 3, 1):
+            clock.sleep(hours * HOUR / 1000)
+            state = detector._advance_ema_state()
+        assert data.calls == calls + 3              # Un delta por avance, sin volver a sembrar
+        end = data.candles.index_of(state.last_timestamp)
+        expected = rsi.EMAState.from_candles(data.candles[seed_start:end + 1], PERIOD)
+        assert state.value == pytest.approx(expected.value, rel=1e-12)
+        assert state.last_timestamp == expected.last_timestamp
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+
+def naive_exit(candles, entry_index, signal, levels):
+    """Recorrido vela a vela: primer toque de TP o SL (ambos en la misma vela => SL)."""
+    is_long = signal == rsi.SignalType.LONG
+    for j in range(entry_index + 1, len(candles)):
+        if (candles.low[j] <= levels['sl']) if is_long else (candles.high[j] >= levels['sl']):
+            return j, 'LOSS'
+        if (candles.high[j] >= levels['tp']) if is_long else (candles.low[j] <= levels['tp']):
+            return j, 'WIN'
+    return None, None
+
+
+@pytest.mark.parametrize('use_numpy', [False, pytest.param(True, marks=pytest.mark.skipif(
+    not rsi.HAS_NUMPY, reason='NumPy no instalado'))])
+def test_resolve_matches_naive_scan(make_candles, use_numpy):
+    candles = make_candles(3000, seed=21)
+    resolver = rsi.ExitResolver(candles, use_numpy=use_numpy)
+    rnd = random.Random(5)
+    for _ in range(400):
+        i = rnd.randrange(len(candles))
+        signal = rnd.choice([rsi.SignalType.LONG, rsi.SignalType.SHORT])
+        # Distancias de 0.1% a 8%: salidas dentro y fuera de SCAN_BARS
+        tp_pct, sl_pct = rnd.uniform(0.1, 8), rnd.uniform(0.1, 8)
+        price = candles.close[i]
+        sign = 1 if signal == rsi.SignalType.LONG else -1
+        levels = {'tp': price * (1 + sign * tp_pct / 100), 'sl': price * (1 - sign * sl_pct / 100)}
+        assert resolver.resolve(i, signal, levels) == naive_exit(candles, i, signal, levels)
+
+
+def test_first_touch_queries(make_candles):
+    candles = make_candles(1000, seed=4)
+    resolver = rsi.ExitResolver(candles, use_numpy=False)
+    for start in (0, 1, 37, 500, 999):
+        for level in (38000.0, 40000.0, 42000.0):
+            above = next((j for j in range(start, len(candles)) if candles.high[j] >= level), None)
+            below = next((j for j in range(start, len(candles)) if candles.low[j] <= level), None)
+            assert resolver.first_at_or_above(start, level) == above
+            assert resolver.first_at_or_below(start, level) == below
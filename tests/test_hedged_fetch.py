@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+PRIMARY = "http://primary/fapi/v1"
+MIRROR = "http://mirror/fapi/v1"
+PATH = "/klines?symbol=BTCUSDT&interval=15m&limit=10"
+
+
+class FakePool:
+    """Pool con comportamiento por host: 'ok', 'fail' (error inmediato) o segundos de demora."""
+    
+    def __init__(self, **behaviour):
+        self.behaviour = behaviour
+        self.calls = []
+    
+    def request(self, url, headers=None, timeout=None):
+        host = url.split('//', 1)[1].split('/', 1)[0]
+        self.calls.append(host)
+        action = self.behaviour.get(host, 'ok')
+        if action == 'fail':
+            raise ConnectionError(f"{host} caído")
+        if action != 'ok':
+            time.sleep(action)
+        return 200, {}, host.encode()
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(rsi.DataEngine, 'BASE_URL', PRIMARY)
+    monkeypatch.setattr(rsi.DataEngine, 'MIRROR_URLS', [MIRROR])
+    monkeypatch.setattr(rsi.DataEngine, 'BREAKERS', {})
+    monkeypatch.setattr(rsi.DataEngine, 'SCHEDULER', rsi.WeightScheduler())
+    monkeypatch.setattr(rsi.DataEngine, 'LATENCY', rsi.LatencyTracker(default=0.05))
+    
+    def use(pool):
+        monkeypatch.setattr(rsi.DataEngine, 'POOL', pool)
+        return pool
+    return use
+
+
+def fetch():
+    return rsi.DataEngine._hedged_fetch(PATH, 2.0, rsi.RequestPriority.NORMAL)
+
+
+def test_breaker_transitions(make_clock):
+    clock = make_clock(1000.0)
+    breaker = rsi.CircuitBreaker(failure_threshold=2, reset_timeout=30.0, clock=clock)
+    assert breaker.allow()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()             # Se abre al llegar al umbral
+    assert breaker.state == rsi.CircuitState.OPEN
+    assert not breaker.available() and not breaker.allow()
+    
+    clock.now += 30.0
+    assert breaker.available()
+    assert breaker.state == rsi.CircuitState.OPEN   # available() no cambia el estado
+    assert breaker.allow()                          # Reserva el request de prueba
+    assert breaker.state == rsi.CircuitState.HALF_OPEN
+    assert not breaker.available() and not breaker.allow()
+    
+    assert breaker.record_failure()             # Prueba fallida: vuelve a OPEN
+    assert breaker.state == rsi.CircuitState.OPEN
+    clock.now += 30.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == rsi.CircuitState.CLOSED
+    assert breaker.failures == 0
+
+
+def test_failover_to_mirror(engine):
+    pool = engine(FakePool(primary='fail'))
+    status, _, body = fetch()
+    assert (status, body) == (200, b'mirror')
+    assert pool.calls == ['primary', 'mirror']
+    assert rsi.DataEngine.BREAKERS[PRIMARY].failures == 1
+
+
+def test_hedge_to_mirror_when_primary_is_slow(engine):
+    engine(FakePool(primary=1.0))
+    start = time.monotonic()
+    status, _, body = fetch()
+    assert body == b'mirror'
+    assert time.monotonic() - start < 0.5
+
+
+def test_filtered_mirror_keeps_its_half_open_trial(engine, make_clock):
+    clock = make_clock(1000.0)
+    rsi.DataEngine.BREAKERS[MIRROR] = mirror = rsi.CircuitBreaker(reset_timeout=30.0, clock=clock)
+    for _ in range(mirror.failure_threshold):
+        mirror.record_failure()
+    clock.now += 30.0
+    
+    pool = engine(FakePool())
+    for _ in range(3):
+        assert fetch()[2] == b'primary'
+    assert mirror.state == rsi.CircuitState.OPEN    # Nunca contactado: sin prueba reservada
+    
+    pool.behaviour['primary'] = 'fail'
+    assert fetch()[2] == b'mirror'
+    assert mirror.state == rsi.CircuitState.CLOSED
+
+
+def test_all_hosts_open(engine):
+    engine(FakePool())
+    for host in (PRIMARY, MIRROR):
+        breaker = rsi.DataEngine._breaker(host)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+    with pytest.raises(ConnectionError):
+        fetch()
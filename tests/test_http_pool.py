@@ -0,0 +1,41 @@
+import json
+
+import rsi_mean_reversion_master as rsi
+
+
+def test_pool_reuses_keepalive_connection(local_api):
+    pool = rsi.HTTPConnectionPool()
+    url = f"{local_api.base_url}/premiumIndex?symbol=BTCUSDT"
+    try:
+        status, headers, body = pool.request(url)
+        assert status == 200
+        assert headers['content-encoding'] == 'gzip'
+        assert json.loads(body)['symbol'] == 'BTCUSDT'     # Ya descomprimido
+        
+        key = next(iter(pool._idle))
+        first = pool._idle[key][0][0]
+        pool.request(url)
+        assert pool._idle[key][0][0] is first
+    finally:
+        pool.close_all()
+
+
+def test_pool_reconnects_when_idle_socket_was_closed(local_api):
+    pool = rsi.HTTPConnectionPool()
+    url = f"{local_api.base_url}/premiumIndex?symbol=BTCUSDT"
+    try:
+        pool.request(url)
+        key = next(iter(pool._idle))
+        pool._idle[key][0][0].sock.close()      # Servidor cerró el keep-alive
+        status, _, body = pool.request(url)
+        assert status == 200
+        assert json.loads(body)['symbol'] == 'BTCUSDT'
+    finally:
+        pool.close_all()
+
+
+def test_data_engine_klines_through_pool(local_api):
+    candles = rsi.DataEngine.get_klines('BTCUSDT', '15m', 120)
+    assert len(candles) == 120
+    assert list(candles.timestamp) == sorted(candles.timestamp)
+    assert all(t - o == 899_999 for o, t in zip(candles.timestamp, candles.close_time))
@@ -0,0 +1,74 @@
+import gc
+import weakref
+
+import rsi_mean_reversion_master as rsi
+
+
+def test_hit_and_miss_counts():
+    memo = rsi.IndicatorMemo()
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        return len(calls)
+    
+    assert memo.get_or_compute(('a',), compute) == 1
+    assert memo.get_or_compute(('a',), compute) == 1
+    assert memo.get_or_compute(('b',), compute) == 2
+    assert (memo.hits, memo.misses, len(calls)) == (1, 2, 2)
+    
+    memo.clear()
+    assert (memo.hits, memo.misses, len(memo)) == (0, 0, 0)
+
+
+def test_lru_eviction():
+    memo = rsi.IndicatorMemo(maxsize=3)
+    for key in 'abc':
+        memo.get_or_compute((key,), lambda: key)
+    memo.get_or_compute(('a',), lambda: 'stale')    # 'a' pasa a ser el más reciente
+    memo.get_or_compute(('d',), lambda: 'd')         # Expulsa 'b', el menos reciente
+    assert len(memo) == 3
+    
+    misses = memo.misses
+    assert memo.get_or_compute(('a',), lambda: 'new') == 'a'
+    assert memo.get_or_compute(('c',), lambda: 'new') == 'c'
+    assert memo.misses == misses
+    assert memo.get_or_compute(('b',), lambda: 'new') == 'new'
+
+
+def test_keyed_by_data_identity(make_candles):
+    memo = rsi.IndicatorMemo()
+    candles = make_candles(100)
+    corrected = make_candles(100, seed=8)           # Mismos timestamps, otros precios
+    assert corrected.close_time[-1] == candles.close_time[-1]
+    
+    assert memo.get_or_compute(('rsi',), lambda: 1, candles) == 1
+    assert memo.get_or_compute(('rsi',), lambda: 2, corrected) == 2
+    assert memo.get_or_compute(('rsi',), lambda: 3, candles) == 1
+
+
+class Rows(list):
+    """Velas como lista de dicts (admite weakref, Candles usa __slots__)."""
+
+
+def test_entry_pins_its_data(make_candles):
+    memo = rsi.IndicatorMemo(maxsize=1)
+    candles = Rows(make_candles(50).to_dicts())
+    ref = weakref.ref(candles)
+    memo.get_or_compute(('rsi',), lambda: 1, candles)
+    del candles
+    gc.collect()
+    assert ref() is not None        # El id no puede reutilizarse mientras siga en el memo
+    
+    memo.get_or_compute(('other',), lambda: 2)
+    gc.collect()
+    assert ref() is None
+
+
+def test_closed_indicator_sees_corrected_data(make_candles):
+    candles = make_candles(300)
+    corrected = make_candles(300, seed=8)
+    first = rsi.Indicators.closed('rsi_series', 'BTCUSDT', '15m', candles, 21)
+    again = rsi.Indicators.closed('rsi_series', 'BTCUSDT', '15m', corrected, 21)
+    assert first == tuple(rsi.Indicators.rsi_series(candles, 21))
+    assert again == tuple(rsi.Indicators.rsi_series(corrected, 21))
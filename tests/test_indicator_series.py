@@ -0,0 +1,36 @@
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+
+@pytest.mark.parametrize('use_numpy', [False, pytest.param(True, marks=pytest.mark.skipif(
+    not rsi.HAS_NUMPY, reason='NumPy no instalado'))])
+def test_rsi_series_matches_rsi(make_candles, use_numpy):
+    candles = make_candles(400)
+    series = rsi.Indicators.rsi_series(candles, 21, use_numpy=use_numpy)
+    assert len(series) == len(candles)
+    for i in range(len(candles)):
+        expected = rsi.Indicators.rsi(candles[:i + 1], 21)
+        if expected is None:
+            assert series[i] is None
+        else:
+            assert series[i] == pytest.approx(expected, abs=1e-9)
+
+
+def test_rsi_series_flat_prices():
+    candles = rsi.Candles.from_dicts([{'timestamp': i, 'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0,
+                                       'volume': 0.0, 'close_time': i} for i in range(30)])
+    assert rsi.Indicators.rsi_series(candles, 21, use_numpy=False)[-1] == rsi.Indicators.rsi(candles, 21) == 100.0
+
+
+def test_ema_series_matches_ema(make_candles):
+    candles = make_candles(400, seed=5)
+    series = rsi.Indicators.ema_series(candles, 200)
+    for i in range(len(candles)):
+        assert series[i] == rsi.Indicators.ema(candles[:i + 1], 200)
+
+
+def test_rsi_history_uses_series(make_candles):
+    candles = make_candles(120)
+    history = rsi.Indicators.rsi_history(candles, 21, lookback=10)
+    assert history == pytest.approx([rsi.Indicators.rsi(candles[:k], 21) for k in range(111, 121)], abs=1e-9)
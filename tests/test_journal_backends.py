@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+import rsi_mean_reversion_master as rsi
+
+
+def open_journal(backend: str, clock) -> rsi.JournalManager:
+    if backend == 'sqlite':
+        return rsi.SQLiteJournalManager(clock)
+    return rsi.JournalManager(clock)
+
+
+def exercise(journal: rsi.JournalManager, clock):
+    """Misma secuencia de operaciones para cualquier backend (incluye cambio de día)."""
+    for k in range(3):
+        journal.log_signal({'type': 'LONG', 'rsi': 19.0 + k, 'price': 95000.0 + k, 'ema_200': 94000.0})
+        clock.now += timedelta(minutes=15)
+    trade_id = journal.add_trade({'type': 'LONG', 'entry': 95000.0, 'position_size': 500.0})
+    journal.ignore_signal()
+    journal.close_trade(trade_id, -4.0, 'LOSS')
+    journal.add_trade({'type': 'SHORT', 'entry': 96000.0, 'position_size': 500.0})
+    
+    day = journal.load()
+    day['signals_detected'].append({'type': 'SHORT', 'rsi': 81.0, 'price': 96000.0, 'timestamp': 1.0})
+    day['trades'][1]['note'] = 'editado'
+    journal.save(day)
+    journal.flush()
+    
+    clock.now += timedelta(days=1)
+    journal.log_signal({'type': 'SHORT', 'rsi': 80.5, 'price': 97000.0, 'ema_200': 98000.0})
+    journal.close()
+
+
+def read_days(backend: str, dates, clock):
+    journal = open_journal(backend, clock)
+    try:
+        return {date: journal._read_day(date) for date in dates}
+    finally:
+        journal.close()
+
+
+def test_json_and_sqlite_store_the_same_days(tmp_config, make_clock):
+    results = {}
+    for backend in ('json', 'sqlite'):
+        clock = make_clock()
+        exercise(open_journal(backend, clock), clock)
+        results[backend] = read_days(backend, ['2026-03-02', '2026-03-03'], make_clock())
+    
+    assert results['json'] == results['sqlite']
+    first = results['sqlite']['2026-03-02']
+    assert len(first['signals_detected']) == 4
+    assert [t['status'] for t in first['trades']] == ['CLOSED', 'OPEN']
+    assert first['trades'][1]['note'] == 'editado'
+    assert first['stats'] == {'total_trades': 2, 'wins': 0, 'losses': 1, 'total_pnl': -4.0,
+                              'consecutive_losses': 1, 'signals_ignored': 1}
+    assert len(results['sqlite']['2026-03-03']['signals_detected']) == 1
+
+
+def test_sqlite_save_writes_only_changed_rows(tmp_config, make_clock):
+    journal = rsi.SQLiteJournalManager(make_clock())
+    for _ in range(50):
+        journal.log_signal({'type': 'LONG', 'rsi': 19.0, 'price': 95000.0})
+    journal.add_trade({'type': 'LONG', 'entry': 95000.0})
+    journal.flush()
+    
+    statements = []
+    journal._conn.set_trace_callback(statements.append)
+    day = journal.load()
+    day['signals_detected'].append({'type': 'SHORT', 'rsi': 81.0, 'price': 96000.0, 'timestamp': 1.0})
+    day['trades'][0]['note'] = 'x'
+    journal.save(day)
+    journal._conn.set_trace_callback(None)
+    
+    writes = [s.split()[0] for s in statements if s.split()[0] in ('INSERT', 'UPDATE', 'DELETE')]
+    assert writes == ['INSERT', 'UPDATE', 'INSERT']     # Señal, trade, fila de stats
+    assert journal._read_day(day['date']) == journal.load()
+    
+    # Borrar una señal no tiene fila que actualizar: se reemplaza el día
+    day = journal.load()
+    del day['signals_detected'][0]
+    journal.save(day)
+    assert journal._read_day(day['date']) == journal.load()
+    journal.close()
+
+
+def test_migrate_json(tmp_config, make_clock):
+    clock = make_clock()
+    exercise(rsi.JournalManager(clock), clock)
+    expected = read_days('json', ['2026-03-02', '2026-03-03'], make_clock())
+    
+    journal = rsi.SQLiteJournalManager(make_clock())
+    assert journal.migrate_json() == 2
+    assert journal.migrate_json() == 0          # Repetirla es inocua
+    assert {date: journal._read_day(date) for date in expected} == expected
+    closed = journal.closed_trades()
+    assert [t['pnl'] for t in closed] == [-4.0]
+    journal.close()
+
+
+def test_create_uses_configured_backend(tmp_config, make_clock):
+    with rsi.config_override({'JOURNAL_BACKEND': 'json'}):
+        journal = rsi.JournalManager.create(make_clock())
+    assert type(journal) is rsi.JournalManager
+    journal.close()
+    
+    with rsi.config_override({'JOURNAL_BACKEND': 'sqlite'}):
+        journal = rsi.JournalManager.create(make_clock())
+    assert isinstance(journal, rsi.SQLiteJournalManager)
+    journal.close()
@@ -0,0 +1,103 @@
+import gc
+import time
+import weakref
+from datetime import timedelta
+
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+
+class CountingJournal(rsi.JournalManager):
+    WRITE_BEHIND_SEC = 0.05
+    
+    def __init__(self, clock):
+        self.persisted = []
+        self.fail = 0
+        super().__init__(clock)
+    
+    def _persist(self, data, changes):
+        if self.fail:
+            self.fail -= 1
+            raise OSError("disco lleno")
+        self.persisted.append([change[0] for change in changes])
+        super()._persist(data, changes)
+
+
+def stored(clock, date='2026-03-02'):
+    return rsi.JournalManager(clock)._read_day(date)
+
+
+def test_signals_are_coalesced_behind(tmp_config, make_clock):
+    clock = make_clock()
+    journal = CountingJournal(clock)
+    for _ in range(5):
+        journal.log_signal({'type': 'LONG', 'rsi': 19.0, 'price': 95000.0})
+    assert journal.persisted == []
+    assert stored(clock)['signals_detected'] == []
+    
+    time.sleep(0.2)
+    assert journal.persisted == [['signal'] * 5]
+    assert len(stored(clock)['signals_detected']) == 5
+
+
+def test_trades_are_written_immediately(tmp_config, make_clock):
+    clock = make_clock()
+    journal = CountingJournal(clock)
+    journal.log_signal({'type': 'LONG', 'rsi': 19.0, 'price': 95000.0})
+    trade_id = journal.add_trade({'type': 'LONG', 'entry': 95000.0})
+    assert journal.persisted == [['signal', 'trade']]
+    journal.close_trade(trade_id, 3.5, 'WIN')
+    assert journal.persisted[-1] == ['update', 'stats']
+    assert stored(clock)['stats']['wins'] == 1
+    journal.close()
+
+
+def test_failed_write_is_retried(tmp_config, make_clock):
+    clock = make_clock()
+    journal = CountingJournal(clock)
+    journal.fail = 1
+    journal.add_trade({'type': 'LONG', 'entry': 95000.0})
+    assert stored(clock)['trades'] == []
+    journal.flush()
+    assert len(stored(clock)['trades']) == 1
+
+
+def test_rollover_persists_previous_day(tmp_config, make_clock):
+    clock = make_clock()
+    journal = CountingJournal(clock)
+    journal.log_signal({'type': 'LONG', 'rsi': 19.0, 'price': 95000.0})
+    clock.now += timedelta(days=1)
+    assert journal.get_stats()['total_trades'] == 0     # Carga el día nuevo
+    assert len(stored(clock, '2026-03-02')['signals_detected']) == 1
+    assert journal.load()['date'] == '2026-03-03'
+    journal.close()
+
+
+def test_reads_return_copies(tmp_config, make_clock):
+    journal = rsi.JournalManager(make_clock())
+    journal.add_trade({'type': 'LONG', 'entry': 95000.0})
+    
+    journal.get_active_trade()['status'] = 'CLOSED'
+    journal.get_stats()['total_trades'] = 99
+    journal.load()['trades'].clear()
+    assert journal.get_active_trade()['status'] == 'OPEN'
+    assert journal.get_daily_trades_count() == 1
+    
+    day = journal.load()
+    journal.save(day)
+    day['trades'].clear()           # save() guarda su propia copia
+    assert len(journal.load()['trades']) == 1
+    journal.close()
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_close_releases_atexit_reference(tmp_config, make_clock, backend):
+    with rsi.config_override({'JOURNAL_BACKEND': backend}):
+        journal = rsi.JournalManager.create(make_clock())
+    journal.log_signal({'type': 'LONG', 'rsi': 19.0, 'price': 95000.0})
+    journal.close()
+    ref = weakref.ref(journal)
+    del journal
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,91 @@
+import logging
+
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+INTERVAL = 900_000
+
+
+class Source:
+    """Fuente de velas grabadas: devuelve lo existente hasta la vela `now` (en formación)."""
+    
+    def __init__(self, candles, now: int):
+        self.candles = candles
+        self.now = now
+        self.fail = False
+        self.requests = []
+    
+    def time(self) -> float:
+        return (self.candles.timestamp[self.now] + INTERVAL // 2) / 1000
+    
+    def get_klines(self, symbol, interval, limit=100, start_time=None, deadline=None):
+        self.requests.append((limit, start_time))
+        if self.fail:
+            return None
+        visible = self.candles[:self.now + 1]
+        if start_time is None:
+            return visible[-limit:]
+        first = visible.index_of(start_time)
+        return visible[first:first + limit]
+
+
+@pytest.fixture
+def source(make_candles):
+    return Source(make_candles(600), now=300)
+
+
+@pytest.fixture
+def cache(source):
+    return rsi.KlineCache(data=source, clock=source.time)
+
+
+def test_first_get_is_a_full_fetch(cache, source):
+    candles = cache.get('BTCUSDT', '15m', 50)
+    assert candles == source.candles[251:301]
+    assert source.requests == [(50, None)]
+
+
+def test_delta_merge(cache, source):
+    cache.get('BTCUSDT', '15m', 50)
+    source.now += 3
+    candles = cache.get('BTCUSDT', '15m', 50)
+    # Solo desde la vela que estaba en formación, que se reemplaza
+    assert source.requests[-1] == (rsi.KlineCache.DELTA_LIMIT, source.candles.timestamp[300])
+    assert candles == source.candles[254:304]
+    assert candles.close[-1] == source.candles.close[303]
+
+
+def test_gap_larger_than_delta_refetches(cache, source):
+    cache.get('BTCUSDT', '15m', 50)
+    source.now += rsi.KlineCache.DELTA_LIMIT + 10
+    candles = cache.get('BTCUSDT', '15m', 50)
+    assert source.requests[-1] == (50, None)
+    assert candles == source.candles[source.now - 49:source.now + 1]
+
+
+def test_failed_delta_serves_cache_for_one_interval(cache, source, caplog):
+    rsi.LOG.addHandler(caplog.handler)
+    try:
+        cached = cache.get('BTCUSDT', '15m', 50)
+        source.fail = True
+        assert cache.get('BTCUSDT', '15m', 50) == cached
+        assert caplog.records[-1].levelno == logging.WARNING
+        
+        source.now += 1                 # Más de un intervalo sin actualizar
+        assert cache.get('BTCUSDT', '15m', 50) is None
+        assert caplog.records[-1].levelno == logging.WARNING
+        
+        source.fail = False
+        assert cache.get('BTCUSDT', '15m', 50) == source.candles[252:302]
+    finally:
+        rsi.LOG.removeHandler(caplog.handler)
+
+
+def test_stream_apply_counts_as_update(cache, source):
+    cache.get('BTCUSDT', '15m', 50)
+    source.now += 1
+    source.fail = True
+    cache.apply('BTCUSDT', '15m', source.candles[source.now])
+    assert cache.get('BTCUSDT', '15m', 50) == source.candles[252:302]
+
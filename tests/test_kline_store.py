@@ -0,0 +1,61 @@
+import time
+
+import rsi_mean_reversion_master as rsi
+
+
+def test_append_read_roundtrip(tmp_path, make_candles):
+    candles = make_candles(500)
+    with rsi.KlineStore('BTCUSDT', '15m', directory=str(tmp_path)) as store:
+        assert store.append(candles[:300]) == 300
+        assert store.append(candles[250:]) == 200     # Solapadas: solo las nuevas
+        assert store.append(candles) == 0
+        assert len(store) == 500
+        assert store.last_open_time() == candles.timestamp[-1]
+        
+        read = store.read()
+        assert read == candles
+        assert read.close[-1] == candles.close[-1]
+        
+        start, end = candles.timestamp[100], candles.timestamp[200]
+        assert store.read(start, end) == candles[100:200]
+
+
+def test_read_remaps_only_when_file_grows(tmp_path, make_candles):
+    candles = make_candles(200)
+    store = rsi.KlineStore('BTCUSDT', '15m', directory=str(tmp_path))
+    store.append(candles[:100])
+    first = store.read()
+    store.read()
+    assert len(store._maps) == 1
+    
+    store.append(candles)
+    assert len(store.read()) == 200
+    assert len(store._maps) == 2
+    assert first == candles[:100]       # Las vistas anteriores siguen válidas
+    
+    del first
+    store.close()
+    assert store._maps == []
+
+
+def test_backfill_skips_empty_chunk(tmp_path, make_candles, monkeypatch):
+    hour = 3_600_000
+    now_ms = int(time.time() * 1000)
+    end = now_ms - now_ms % hour
+    history = make_candles(5 * 24, interval_ms=hour, start=end - 5 * 24 * hour)
+    # Hueco de 40 h (mantenimiento): el bloque [48, 72) queda vacío
+    gap_start, gap_end = history.timestamp[40], history.timestamp[80]
+    keep = [c for c in history.to_dicts() if not gap_start <= c['timestamp'] < gap_end]
+    served = rsi.Candles.from_dicts(keep)
+    
+    def fake_get_klines(symbol, interval, limit=100, start_time=None, deadline=None, priority=None):
+        lo = served.index_of(start_time)
+        return served[lo:lo + limit]
+    
+    monkeypatch.setattr(rsi.DataEngine, 'get_klines', staticmethod(fake_get_klines))
+    monkeypatch.setattr(rsi.KlineStore, 'CHUNK_CANDLES', 24)
+    
+    with rsi.KlineStore('BTCUSDT', '1h', directory=str(tmp_path)) as store:
+        assert store.backfill(5, workers=2) == len(served)
+        assert store.read() == served
+        assert store.backfill(5) == 0      # Ya al día
@@ -0,0 +1,43 @@
+import json
+import threading
+
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+
+@pytest.fixture
+def restore_log():
+    handlers, level, propagate = rsi.LOG.handlers[:], rsi.LOG.level, rsi.LOG.propagate
+    yield
+    rsi._stop_log_listener()
+    rsi.LOG.handlers[:] = handlers
+    rsi.LOG.setLevel(level)
+    rsi.LOG.propagate = propagate
+
+
+def test_setup_logging_twice_replaces_listener(restore_log, capsys):
+    before = threading.active_count()
+    first = rsi.setup_logging("INFO")
+    second = rsi.setup_logging("DEBUG", json_lines=True)
+    
+    assert first._thread is None                # El anterior quedó detenido
+    assert second._thread.is_alive()
+    assert threading.active_count() == before + 1
+    assert len(rsi.LOG.handlers) == 1
+    
+    rsi.LOG.info("hola", extra={'cycle_ms': 1.5})
+    rsi._stop_log_listener()
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['msg'] for line in lines] == ["hola"]
+    assert json.loads(lines[0])['cycle_ms'] == 1.5
+
+
+def test_sampling_filter_limits_debug(restore_log, capsys):
+    rsi.setup_logging("DEBUG")
+    for _ in range(20):
+        rsi.LOG.debug("ruido", extra={'sample_key': 'test'})
+    rsi.LOG.warning("aviso")
+    rsi._stop_log_listener()
+    out = capsys.readouterr().out
+    assert out.count("ruido") == 5 and out.count("aviso") == 1
@@ -0,0 +1,71 @@
+import time
+import asyncio
+
+import rsi_mean_reversion_master as rsi
+from bench.standin import StandInWebSocketServer
+
+
+def wait_until(predicate, timeout: float = 10.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_frame_roundtrip():
+    async def decode(frame: bytes):
+        reader = asyncio.StreamReader()
+        reader.feed_data(frame)
+        reader.feed_eof()
+        return await rsi.WebSocketClient.read_frame(reader)
+    
+    # Longitudes de 7 bits, 16 bits y 64 bits, con y sin máscara
+    for payload in (b'', b'x' * 125, b'y' * 126, b'z' * 70_000):
+        for mask in (True, False):
+            frame = rsi.WebSocketClient.encode_frame(rsi.WebSocketClient.OP_TEXT, payload, mask=mask)
+            fin, opcode, data = asyncio.run(decode(frame))
+            assert (fin, opcode, data) == (True, rsi.WebSocketClient.OP_TEXT, payload)
+
+
+def test_stream_feeds_cache_and_reconnects(local_api):
+    cache = rsi.KlineCache()
+    with StandInWebSocketServer(local_api, intervals=('15m',)) as ws_server:
+        stream = rsi.BinanceMarketStream(cache, 'BTCUSDT', ['15m'], url=ws_server.url).start()
+        try:
+            assert wait_until(stream.is_live)
+            assert stream.mark_price > 0
+            # Gap-fill por REST al conectar + velas push del stream
+            candles = cache.snapshot('BTCUSDT', '15m', 50)
+            assert candles is not None
+            assert list(candles.timestamp) == sorted(set(candles.timestamp))
+            
+            ws_server.drop_connections()
+            assert wait_until(lambda: stream.reconnects >= 1 and stream.is_live())
+            assert ws_server.connections >= 2
+        finally:
+            stream.stop()
+
+
+def test_unexpected_payload_is_logged_and_skipped(local_api, caplog):
+    cache = rsi.KlineCache()
+    rsi.LOG.addHandler(caplog.handler)
+    with StandInWebSocketServer(local_api, intervals=('15m',)) as ws_server:
+        stream = rsi.BinanceMarketStream(cache, 'BTCUSDT', ['15m'], url=ws_server.url).start()
+        try:
+            assert wait_until(stream.is_live)
+            ws_server.send({'e': 'kline', 'k': {'i': '15m'}})              # KeyError
+            ws_server.send({'e': 'markPriceUpdate', 'p': None})           # TypeError
+            assert wait_until(lambda: len([r for r in caplog.records if r.exc_info]) >= 2)
+            
+            stream.mark_price = None
+            assert wait_until(lambda: stream.mark_price is not None)      # Sigue leyendo
+            assert stream.reconnects == 0 and stream.is_live()
+        finally:
+            stream.stop()
+            rsi.LOG.removeHandler(caplog.handler)
+    
+    errors = [r for r in caplog.records if r.exc_info]
+    assert {r.exc_info[0] for r in errors} >= {KeyError, TypeError}
+    assert all(r.levelname == 'ERROR' for r in errors)
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+GRID = {
+    'RSI_PERIOD': [14, 21],
+    'RSI_OVERSOLD': [30, 33],
+    'RSI_OVERBOUGHT': [67],
+    'strict_session': [True, False],
+}
+
+
+@pytest.fixture
+def store_dir(tmp_path, make_candles):
+    with rsi.KlineStore('BTCUSDT', '15m', directory=str(tmp_path)) as store:
+        store.append(make_candles(40 * 96, seed=13))
+    return str(tmp_path)
+
+
+def summary_without_timing(summary):
+    return {k: v for k, v in summary.items() if k != 'elapsed_ms'}
+
+
+def test_batches_do_not_mix_periods():
+    sweep = rsi.ParameterSweep(GRID)
+    configs = sweep.configs()
+    assert len(configs) == 8
+    batches = sweep.batches(configs)
+    assert sorted(map(json.dumps, (c for b in batches for c in b))) == sorted(map(json.dumps, configs))
+    for batch in batches:
+        assert len({params['RSI_PERIOD'] for params in batch}) == 1
+
+
+def test_unknown_grid_key():
+    with pytest.raises(ValueError):
+        rsi.ParameterSweep({'NOPE': [1]})
+
+
+def test_sweep_rows_match_direct_backtests(store_dir, tmp_path):
+    out = tmp_path / 'sweep.jsonl'
+    sweep = rsi.ParameterSweep(GRID, 'BTCUSDT', '15m', directory=store_dir, use_cache=False)
+    assert sweep.run(str(out), workers=2) == 8
+    
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    candles = rsi.KlineStore('BTCUSDT', '15m', directory=store_dir).read()
+    assert any(row['total_trades'] for row in rows)
+    for row in rows:
+        params = dict(row.pop('params'))
+        strict = params.pop('strict_session')
+        with rsi.config_override(params):
+            expected = rsi.Backtester(candles, strict, 'BTCUSDT', '15m').run().summary()
+        assert summary_without_timing(row) == summary_without_timing(expected)
@@ -0,0 +1,47 @@
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+PERIOD = 21
+
+
+def test_seed_matches_indicator(make_candles):
+    candles = make_candles(300)
+    state = rsi.RSIState.from_candles(candles, PERIOD)
+    assert state.value() == rsi.Indicators.rsi(candles, PERIOD)
+    assert state.last_timestamp == candles.timestamp[-1]
+
+
+def test_update_and_peek_match_indicator(make_candles):
+    candles = make_candles(200)
+    state = rsi.RSIState.from_candles(candles[:60], PERIOD)
+    for i in range(60, 200):
+        assert state.peek(candles.close[i]) == pytest.approx(rsi.Indicators.rsi(candles[:i + 1], PERIOD), abs=1e-9)
+        state.update(candles.close[i], candles.timestamp[i])
+        assert state.value() == pytest.approx(rsi.Indicators.rsi(candles[:i + 1], PERIOD), abs=1e-9)
+
+
+def test_window_series_matches_per_window_rsi(make_candles):
+    candles = make_candles(3000, seed=11)
+    window = rsi.CONFIG.RSI_WINDOW
+    series = rsi.Indicators.rsi_window_series(candles, PERIOD, window)
+    assert series[:window - 1] == [None] * (window - 1)
+    for i in range(window - 1, len(candles)):
+        expected = rsi.Indicators.rsi(candles[i - window + 1:i + 1], PERIOD)
+        assert series[i] == pytest.approx(expected, abs=1e-9)
+
+
+def test_live_window_matches_v13_history(make_candles):
+    """prev/curr del modo en vivo == rsi_history(lookback=2) de v1.3 sobre 50 velas."""
+    candles = make_candles(400, seed=3)
+    window = rsi.CONFIG.RSI_WINDOW
+    detector = rsi.SignalDetector.__new__(rsi.SignalDetector)
+    detector.rsi_state = None
+    detector._rsi_window_key = None
+    with rsi.config_override({'RSI_CONVERGED': False}):
+        for end in range(window, len(candles), 7):
+            last = candles[end - window:end]
+            state = detector._advance_rsi_state(last)
+            prev, curr = [rsi.Indicators.rsi(last[:k], PERIOD) for k in (window - 1, window)]
+            assert state.value() == prev
+            assert state.peek(last.close[-1]) == pytest.approx(curr, abs=1e-9)
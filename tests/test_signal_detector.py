@@ -0,0 +1,21 @@
+import rsi_mean_reversion_master as rsi
+
+
+def test_cycle_time_covers_the_whole_analysis(make_candles):
+    candles = make_candles(1200)
+    clock = rsi.VirtualClock((candles.timestamp[-1] + 300_000) / 1000)
+    detector = rsi.SignalDetector(clock=clock, data=rsi.ReplayDataEngine(candles, clock))
+    
+    analysis = detector.analyze()
+    assert analysis['rsi'] is not None
+    assert analysis['cycle_ms'] >= analysis['fetch_ms'] >= 0
+
+
+def test_cycle_time_is_set_on_data_errors(make_candles):
+    candles = make_candles(10)      # Sin histórico suficiente
+    clock = rsi.VirtualClock((candles.timestamp[-1] + 300_000) / 1000)
+    detector = rsi.SignalDetector(clock=clock, data=rsi.ReplayDataEngine(candles, clock))
+    
+    analysis = detector.analyze()
+    assert analysis['reasons'] == ["Error obteniendo datos 15m"]
+    assert analysis['cycle_ms'] >= analysis['fetch_ms'] >= 0
@@ -0,0 +1,68 @@
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_price_at_inverts_peek(make_candles, seed):
+    candles = make_candles(300, seed=seed)
+    state = rsi.RSIState.from_candles(candles, 21)
+    for level in (5, 20, 35, 50, 65, 80, 95):
+        price = state.price_at(level)
+        if price is None:
+            continue
+        assert state.peek(price) == pytest.approx(level, abs=1e-7)
+        # peek es monótono en el precio: cruzar el precio == cruzar el nivel
+        assert state.peek(price * 1.0001) > level > state.peek(price * 0.9999)
+
+
+def test_price_at_out_of_range(make_candles):
+    state = rsi.RSIState.from_candles(make_candles(100), 21)
+    assert state.price_at(0) is None
+    assert state.price_at(100) is None
+
+
+def test_trigger_hit():
+    analysis = {'trigger_long': 100.0, 'trigger_short': None}
+    assert rsi.SignalDetector.trigger_hit(analysis, 100.0)
+    assert not rsi.SignalDetector.trigger_hit(analysis, 99.9)
+    assert not rsi.SignalDetector.trigger_hit(analysis, None)
+    analysis = {'trigger_long': None, 'trigger_short': 100.0}
+    assert rsi.SignalDetector.trigger_hit(analysis, 99.9)
+
+
+class FixedPrice:
+    """Fuente de datos mínima: solo mark price."""
+    
+    def __init__(self, price: float):
+        self.price = price
+        self.calls = 0
+    
+    def get_current_price(self, symbol, deadline=None, priority=None):
+        self.calls += 1
+        return self.price
+
+
+def test_trigger_latched_until_candle_close(tmp_config):
+    clock = rsi.VirtualClock(1_700_000_000.0)
+    data = FixedPrice(101.0)
+    engine = rsi.RSIMasterEngine(clock, data, rsi.MemoryJournal(clock.now))
+    candle_close_ms = int((clock.time() + 600) * 1000)
+    analysis = {'trigger_long': 100.0, 'trigger_short': None, 'trigger_until': candle_close_ms}
+    
+    start = clock.time()
+    engine._wait_for_trigger(analysis, 60)
+    assert clock.time() - start == pytest.approx(engine.TRIGGER_POLL_SEC)
+    
+    # Mismo disparo sin confirmar al cierre: no se rearma hasta el cierre de la vela
+    calls = data.calls
+    for _ in range(20):
+        engine._wait_for_trigger(analysis, 60)
+    assert data.calls == calls
+    assert clock.time() >= candle_close_ms / 1000
+    
+    # Vela nueva: el disparo vuelve a estar activo
+    analysis = dict(analysis, trigger_until=candle_close_ms + 900_000)
+    start = clock.time()
+    engine._wait_for_trigger(analysis, 60)
+    assert clock.time() - start == pytest.approx(engine.TRIGGER_POLL_SEC)
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import rsi_mean_reversion_master as rsi
+
+
+def test_concurrent_callers_share_one_fetch():
+    cache = rsi.TTLCache()
+    release = threading.Event()
+    calls = []
+    
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'markPrice': '95000'}
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch('premium', 60.0, fetch, timeout=5)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while not calls:
+        time.sleep(0.005)
+    time.sleep(0.05)        # Los demás quedan esperando al líder
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    
+    assert len(calls) == 1
+    assert results == [{'markPrice': '95000'}] * 8
+
+
+def test_expired_entry_is_refetched(make_clock):
+    clock = make_clock(100.0)
+    cache = rsi.TTLCache(clock=clock)
+    values = iter([1, 2])
+    assert cache.get_or_fetch('k', 1.0, lambda: next(values)) == 1
+    clock.now += 0.5
+    assert cache.get_or_fetch('k', 1.0, lambda: next(values)) == 1
+    clock.now += 0.5
+    assert cache.get_or_fetch('k', 1.0, lambda: next(values)) == 2
+
+
+def test_none_is_not_cached():
+    cache = rsi.TTLCache()
+    values = iter([None, 3])
+    assert cache.get_or_fetch('k', 60.0, lambda: next(values)) is None
+    assert cache.get_or_fetch('k', 60.0, lambda: next(values)) == 3
+
+
+def test_failed_fetch_wakes_waiters_and_is_not_cached():
+    cache = rsi.TTLCache()
+    started, release = threading.Event(), threading.Event()
+    
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ConnectionError("caído")
+    
+    errors, waited = [], []
+    
+    def leader():
+        try:
+            cache.get_or_fetch('k', 60.0, failing)
+        except ConnectionError as e:
+            errors.append(e)
+    
+    first = threading.Thread(target=leader)
+    first.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: waited.append(cache.get_or_fetch('k', 60.0, lambda: 'otro', timeout=5)))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    first.join(5)
+    follower.join(5)
+    
+    assert len(errors) == 1                 # El líder ve la excepción
+    assert waited == [None]                 # El seguidor despierta sin quedar colgado
+    assert cache.get_or_fetch('k', 60.0, lambda: 4) == 4
+
+
+def test_clear_drops_entries():
+    cache = rsi.TTLCache()
+    cache.get_or_fetch('k', 60.0, lambda: 1)
+    cache.clear()
+    assert cache.get_or_fetch('k', 60.0, lambda: 2) == 2
+
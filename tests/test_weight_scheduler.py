@@ -0,0 +1,81 @@
+import pytest
+
+import rsi_mean_reversion_master as rsi
+
+P = rsi.RequestPriority
+PREMIUM = "/premiumIndex?symbol=BTCUSDT"        # Peso 1
+
+
+@pytest.fixture
+def clock(make_clock):
+    return make_clock(1000.0)
+
+
+@pytest.fixture
+def scheduler(clock):
+    return rsi.WeightScheduler(limit=100, clock=clock)
+
+
+def drain(scheduler, clock, priority) -> int:
+    """Adquiere peso 1 sin esperar hasta que el scheduler lo niegue."""
+    granted = 0
+    while scheduler.acquire(PREMIUM, priority, deadline=clock()):
+        granted += 1
+    return granted
+
+
+@pytest.mark.parametrize('url, expected', [
+    ("/klines?symbol=BTCUSDT&interval=15m&limit=99", ('klines', 1)),
+    ("/klines?symbol=BTCUSDT&interval=15m&limit=100", ('klines', 2)),
+    ("/klines?symbol=BTCUSDT&interval=15m&limit=1000", ('klines', 5)),
+    ("/klines?symbol=BTCUSDT&interval=15m&limit=1500", ('klines', 10)),
+    ("https://fapi.binance.com/fapi/v1/premiumIndex?symbol=BTCUSDT", ('premiumIndex', 1)),
+    ("/premiumIndex", ('premiumIndex', 10)),
+])
+def test_weight_table(url, expected):
+    assert rsi.WeightScheduler.weight_for(url) == expected
+
+
+def test_priority_floors(scheduler, clock):
+    assert drain(scheduler, clock, P.LOW) == 50         # LOW solo hasta el 50%
+    assert drain(scheduler, clock, P.NORMAL) == 40      # NORMAL hasta el 90%
+    assert drain(scheduler, clock, P.CRITICAL) == 10    # CRITICAL agota el resto
+    assert scheduler.spent_by_endpoint == {'premiumIndex': 100}
+
+
+def test_refill_over_time(scheduler, clock):
+    drain(scheduler, clock, P.CRITICAL)
+    clock.now += 6.0                                    # 100/min -> 10 de peso
+    assert drain(scheduler, clock, P.CRITICAL) == 10
+
+
+def test_higher_priority_waiting_goes_first(scheduler, clock):
+    scheduler._waiting[P.CRITICAL] += 1
+    assert not scheduler.acquire(PREMIUM, P.LOW, deadline=clock())
+    scheduler._waiting[P.CRITICAL] -= 1
+    assert scheduler.acquire(PREMIUM, P.LOW, deadline=clock())
+
+
+def test_retry_after_blocks_every_priority(scheduler, clock):
+    scheduler.update_from_response(429, {'retry-after': '10'})
+    assert scheduler.is_blocked()
+    assert not scheduler.acquire(PREMIUM, P.CRITICAL, deadline=clock())
+    clock.now += 10.0
+    assert not scheduler.is_blocked()
+    assert drain(scheduler, clock, P.CRITICAL) == 16    # Presupuesto a cero + 10s de recarga
+
+
+def test_ban_without_retry_after_uses_default(scheduler, clock):
+    scheduler.update_from_response(418, {})
+    assert scheduler.blocked_until == clock() + rsi.WeightScheduler.DEFAULT_BAN_SEC
+    clock.now += rsi.WeightScheduler.DEFAULT_BAN_SEC - 1
+    assert not scheduler.acquire(PREMIUM, P.CRITICAL, deadline=clock())
+
+
+def test_resync_from_used_weight_header(scheduler, clock):
+    scheduler.update_from_response(200, {'x-mbx-used-weight-1m': '95'})
+    assert scheduler.used_weight_1m == 95
+    assert drain(scheduler, clock, P.CRITICAL) == 5
+    # La cabecera nunca devuelve presupuesto ya gastado localmente
+    scheduler.update_from_response(200, {'x-mbx-used-weight-1m': '0'})
+    assert drain(scheduler, clock, P.CRITICAL) == 0